@@ -0,0 +1,88 @@
+"""
+This program describes a computer-controlled paddle for a game
+reminiscent of 'Breakout', for soak tests and demos. Instead of
+stepping the game forward to see where the ball lands, it works out
+the landing point directly: the ball's path is unfolded (as if the
+side walls weren't there), followed to the paddle's height, and
+folded back across the walls the way handle_wall_collisions()
+bounces it. That's a handful of arithmetic operations, and it's only
+redone when the ball's velocity changes.
+
+The autopilot drives the game the same way the mouse does, by
+sending pointer events to handle_move() (and handle_click() to serve
+a ball at rest).
+"""
+
+
+class PointerEvent:
+    """
+    A stand-in for a campy mouse event, with the pointer's x and y.
+    """
+
+    def __init__(self, x, y=0):
+        self.x = x
+        self.y = y
+
+
+def landing_x(x, y, vx, vy, width, target_y):
+    """
+    Returns the x the ball's left edge will be at when its top
+    reaches target_y, for a ball at (x, y) moving at (vx, vy) that
+    bounces between 0 and width (and off the top, if it's going up).
+    Only uses arithmetic, so it works on NumPy arrays of balls too.
+    The vertical velocity must not be 0.
+    """
+    # Up to the top and back down, or straight down.
+    distance = target_y - y * ((vy > 0) * 2 - 1)
+    unfolded = x + vx * distance / abs(vy)
+    return width - abs(unfolded % (2 * width) - width)
+
+
+class Autopilot:
+
+    def __init__(self, state):
+        self.state = state
+        self.velocity = None   # The ball velocity the target was worked out for
+        self.target = None     # Where the paddle's center should go
+
+    def pointer_x(self):
+        """
+        Returns the x the paddle's center should follow to meet the
+        ball, or None if the ball is at rest.
+        """
+        state = self.state
+        velocity = (state.vx, state.vy)
+        if velocity != self.velocity:
+            self.velocity = velocity
+            if state.vy == 0:
+                self.target = None
+            else:
+                left = landing_x(state.ball.x, state.ball.y, state.vx, state.vy,
+                                 state.width - state.ball.width, state.paddle.y - state.ball.height)
+                self.target = left + state.ball_radius
+        return self.target
+
+    def drive(self, graphics):
+        """
+        Moves the paddle of a BreakoutGraphics through handle_move(),
+        like the user's mouse would, and clicks to serve the ball
+        when it's at rest.
+        """
+        if self.state.vx == 0 and self.state.vy == 0:
+            graphics.handle_click(PointerEvent(self.state.width / 2))
+        x = self.pointer_x()
+        if x is not None:
+            graphics.handle_move(PointerEvent(x))
+
+
+def batch_pointer_x(batch):
+    """
+    Returns the x every paddle of a BatchBreakout should follow to
+    meet its ball (the paddle stays put for balls at rest), to be
+    given to batch.move_paddles().
+    """
+    moving = batch.vy != 0
+    vy = batch.vy + (~moving)   # Balls at rest get a dummy velocity, their result isn't used.
+    left = landing_x(batch.ball_x, batch.ball_y, batch.vx, vy,
+                     batch.width - batch.ball_size, batch.paddle_y - batch.ball_size)
+    return (left + batch.ball_radius) * moving + (batch.paddle_x + batch.paddle_width / 2) * ~moving
@@ -0,0 +1,334 @@
+"""
+This program describes a batch of independent games reminiscent
+of 'Breakout' that are all stepped forward at once with NumPy.
+Each game follows the same rules as a BreakoutState (including the
+extended rules when 'extended' is set), but the balls, velocities
+and counters of every game are stored in arrays and the bricks in a
+(games, rows, cols) boolean array, so one call to step() advances
+thousands of games without touching Python objects per game.
+
+This program requires NumPy. Serves are drawn from a NumPy random
+generator, so a seeded batch is reproducible but does not follow the
+same random sequence as a single BreakoutState.
+"""
+import numpy as np
+from brickregistry import BrickRegistry
+from breakoutstate import BRICK_SPACING, BRICK_WIDTH, BRICK_HEIGHT, BRICK_ROWS, BRICK_COLS, BRICK_OFFSET, \
+    BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_OFFSET, INITIAL_Y_SPEED, MAX_X_SPEED, BATTING_SPEED, NUM_LIVES
+from paddlevelocity import SAMPLES, WINDOW_MS, FRAME_NS
+
+
+class BatchBreakout:
+
+    def __init__(self, games, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH,
+                 paddle_height=PADDLE_HEIGHT, paddle_offset=PADDLE_OFFSET,
+                 brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS,
+                 brick_width=BRICK_WIDTH, brick_height=BRICK_HEIGHT,
+                 brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING,
+                 lives=NUM_LIVES, extended=False, auto_serve=True, seed=None):
+
+        # The size of the playing field (the same as BreakoutState's).
+        self.width = brick_cols * (brick_width + brick_spacing) - brick_spacing
+        self.height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
+
+        self.games = games
+        self.ball_radius = ball_radius
+        self.ball_size = 2 * ball_radius
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.paddle_y = self.height - paddle_offset
+        self.brick_rows = brick_rows
+        self.brick_cols = brick_cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        self.x_step = brick_width + brick_spacing
+        self.y_step = brick_height + brick_spacing
+        self.extended = extended
+        self.auto_serve = auto_serve
+        self.rng = np.random.default_rng(seed)
+        self.index = np.arange(games)
+
+        # Ball, paddle and velocity of every game.
+        self.ball_x = np.full(games, self.width / 2 - ball_radius)
+        self.ball_y = np.full(games, self.height / 2 - ball_radius)
+        self.vx = np.zeros(games)
+        self.vy = np.zeros(games)
+        self.paddle_x = np.full(games, self.width / 2 - paddle_width / 2)
+        self.paddle_speed = np.zeros(games)
+
+        # EXTENSION (Greater Control): the paddle positions of the last SAMPLES moves of every game, a
+        # ring buffer shared by all the games (like a PaddleVelocity each), for the paddle's speed.
+        self.window_ns = int(WINDOW_MS * 1000000)
+        self.sample_times = np.zeros((SAMPLES, games), dtype=np.int64)
+        self.sample_positions = np.zeros((SAMPLES, games))
+        self.sample_count = np.zeros(games, dtype=np.int64)
+        self.newest_sample = SAMPLES - 1
+
+        # Brick liveness and counters of every game.
+        self.bricks = np.ones((games, brick_rows, brick_cols), dtype=bool)
+        self.counter = np.full(games, brick_rows * brick_cols)
+        self.num_lives = lives
+        self.lives = np.full(games, lives)
+        self.frames = np.zeros(games, dtype=np.int64)
+
+        # EXTENSION (Greater Control, Improved Interface Display and The Kicker)
+        self.bounce_counter = np.zeros(games, dtype=np.int64)
+        self.score = np.zeros(games, dtype=np.int64)
+        self.kicker_counter = np.zeros(games, dtype=np.int64)
+        self.points = self.make_points()
+
+        if auto_serve:
+            self.serve()
+
+    def make_points(self):
+        """
+        Returns the points every brick is worth, as a (rows, cols)
+        array taken from the same BrickRegistry as a BreakoutState.
+        """
+        registry = BrickRegistry(self.brick_rows, self.brick_cols)
+        return np.frombuffer(registry.points, dtype=np.uint32).reshape(self.brick_rows, self.brick_cols)
+
+    def serve(self, mask=None):
+        """
+        Gives every game at rest (or only those in mask) a new
+        ball velocity, as if the user clicked.
+
+        EXTENSION HERE (Greater Control).
+        The extended rules never give the ball a horizontal
+        velocity close to 0.
+        """
+        at_rest = (self.vx == 0) & (self.vy == 0) & (self.lives > 0) & (self.counter > 0)
+        if mask is not None:
+            at_rest &= mask
+        n = int(at_rest.sum())
+        if self.extended:
+            vx = self.rng.uniform(1, MAX_X_SPEED, n) * self.rng.choice([-1.0, 1.0], n)
+        else:
+            vx = self.rng.uniform(-MAX_X_SPEED, MAX_X_SPEED, n)
+        self.vx[at_rest] = vx
+        self.vy[at_rest] = INITIAL_Y_SPEED
+
+    def move_paddles(self, x):
+        """
+        Moves the paddle of every game so its center follows x
+        (a single value or one value per game), without moving
+        outside the playing field.
+
+        EXTENSION HERE (Greater Control).
+        The paddle's speed (in pixels per second) is recorded for
+        batting, measured over the same window as in the game (see
+        paddlevelocity.py), at each game's frame.
+        """
+        paddle_x = np.clip(np.asarray(x, dtype=float) - self.paddle_width / 2, 0, self.width - self.paddle_width)
+        self.paddle_x = np.broadcast_to(paddle_x, (self.games,)).copy()
+        if self.extended:
+            self.paddle_speed = self.measure_paddles(self.frames * FRAME_NS)
+
+    def measure_paddles(self, now):
+        """
+        EXTENSION HERE (Greater Control).
+        Adds the paddle positions at time now (in nanoseconds, one
+        value per game) to the samples and returns the paddles'
+        speeds, the same as PaddleVelocity.speed() for each game:
+        how far the paddle moved since the newest sample from before
+        the window (or the first sample), over the time between them
+        (at most the window's length).
+        """
+        self.newest_sample = (self.newest_sample + 1) % SAMPLES
+        self.sample_times[self.newest_sample] = now
+        self.sample_positions[self.newest_sample] = self.paddle_x
+        self.sample_count = np.minimum(self.sample_count + 1, SAMPLES)
+
+        # How many moves ago every slot was sampled, and whether each game has a sample there.
+        ago = (self.newest_sample - np.arange(SAMPLES)) % SAMPLES
+        kept = ago[:, None] < self.sample_count
+        before = kept & (now - self.sample_times >= self.window_ns)
+        start = np.where(before.any(axis=0), np.where(before, ago[:, None], SAMPLES).min(axis=0),
+                         self.sample_count - 1)
+        slot = (self.newest_sample - start) % SAMPLES
+        elapsed = np.minimum(now - self.sample_times[slot, self.index], self.window_ns)
+        moved = self.paddle_x - self.sample_positions[slot, self.index]
+        return np.where(elapsed > 0, moved * 1000000000 / np.maximum(elapsed, 1), 0.0)
+
+    def step(self):
+        """
+        Advances every game that is still being played by one
+        frame. Balls that leave the bottom of the field cost a
+        life and are reset (and served again with auto_serve).
+        Returns a boolean array of the games that are over.
+        """
+        live = (self.lives > 0) & (self.counter > 0)
+        self.frames += live
+
+        # Move the balls.
+        self.ball_x += self.vx
+        self.ball_y += self.vy
+
+        # Bounce off the walls.
+        hit_x = ((self.ball_x <= 0) & (self.vx < 0)) | \
+                ((self.ball_x >= self.width - self.ball_size) & (self.vx > 0))
+        hit_y = ~hit_x & (self.ball_y <= 0) & (self.vy < 0)
+        self.vx = np.where(hit_x, -self.vx, self.vx)
+        self.vy = np.where(hit_y, -self.vy, self.vy)
+        if self.extended:
+            self.check_batting_score(hit_x | hit_y)
+
+        # Bounce off the first paddle or brick found at the ball's corners.
+        hit_brick, hit_paddle, row, col = self.object_collision()
+        hit_paddle &= self.vy > 0
+        if self.extended:
+            self.hit_paddle(hit_paddle)
+        else:
+            self.vy = np.where(hit_paddle, -self.vy, self.vy)
+        self.break_bricks(hit_brick, row, col)
+
+        # Take a life from games whose ball left the field.
+        out = live & (self.ball_y >= self.height)
+        if out.any():
+            self.lives -= out
+            self.reset_balls(out)
+            if self.auto_serve:
+                self.serve(out)
+
+        # Stop the balls of games that were just won.
+        won = (self.counter == 0) & live
+        self.vx[won] = 0
+        self.vy[won] = 0
+        return ~((self.lives > 0) & (self.counter > 0))
+
+    def brick_at(self, x, y):
+        """
+        Returns the row, col and a mask of the games whose point
+        (x, y) is on a brick that is still standing.
+        """
+        col = np.floor(x / self.x_step).astype(np.int64)
+        row = np.floor((y - self.brick_offset) / self.y_step).astype(np.int64)
+        inside = (row >= 0) & (row < self.brick_rows) & (col >= 0) & (col < self.brick_cols)
+        inside &= (x - col * self.x_step <= self.brick_width) & \
+                  (y - self.brick_offset - row * self.y_step <= self.brick_height)
+        row = np.clip(row, 0, self.brick_rows - 1)
+        col = np.clip(col, 0, self.brick_cols - 1)
+        return row, col, inside & self.bricks[self.index, row, col]
+
+    def object_collision(self):
+        """
+        Checks the corners of every ball's bounding box (top left,
+        top right, bottom right, bottom left) and returns masks of
+        the games whose first object found is a brick or the paddle,
+        along with the brick's row and col.
+        """
+        size = self.ball_size
+        found = np.zeros(self.games, dtype=bool)
+        hit_brick = np.zeros(self.games, dtype=bool)
+        hit_paddle = np.zeros(self.games, dtype=bool)
+        hit_row = np.zeros(self.games, dtype=np.int64)
+        hit_col = np.zeros(self.games, dtype=np.int64)
+        for dx, dy in ((0, 0), (size, 0), (size, size), (0, size)):
+            x = self.ball_x + dx
+            y = self.ball_y + dy
+            row, col, brick = self.brick_at(x, y)
+            paddle = (x - self.paddle_x >= 0) & (x - self.paddle_x <= self.paddle_width) & \
+                     (y - self.paddle_y >= 0) & (y - self.paddle_y <= self.paddle_height)
+            brick &= ~found
+            paddle &= ~found & ~brick
+            hit_row = np.where(brick, row, hit_row)
+            hit_col = np.where(brick, col, hit_col)
+            hit_brick |= brick
+            hit_paddle |= paddle
+            found |= brick | paddle
+        return hit_brick, hit_paddle, hit_row, hit_col
+
+    def hit_paddle(self, mask):
+        """
+        EXTENSION HERE (Greater Control).
+        Bounces the balls in mask off their paddles, batting
+        them when the paddle moved fast enough and sending them
+        back the way they came off the far sides of the paddle.
+        """
+        batted = mask & (np.abs(self.paddle_speed) > BATTING_SPEED) & (self.bounce_counter == 0)
+        self.vx = np.where(batted, self.vx * 1.5, self.vx)
+        self.vy = np.where(batted, self.vy * 1.25, self.vy)
+        self.bounce_counter[batted] = 10
+
+        left_point = self.paddle_x + self.ball_radius / 4
+        right_point = self.paddle_x + self.paddle_width - self.ball_radius * 2
+        far_side = mask & (((self.ball_x < left_point) & (self.vx > 0)) |
+                           ((self.ball_x > right_point) & (self.vx < 0)))
+        self.vy = np.where(mask, -self.vy, self.vy)
+        self.vx = np.where(far_side, -self.vx, self.vx)
+        self.check_batting_score(mask & ~far_side)
+
+    def break_bricks(self, mask, row, col):
+        """
+        Bounces the balls in mask off the brick at row, col and
+        breaks that brick.
+
+        EXTENSION HERE (Improved Interface Display and The Kicker).
+        Broken bricks add to the score and count towards the kicker.
+        """
+        self.vy = np.where(mask, -self.vy, self.vy)
+        games = self.index[mask]
+        self.bricks[games, row[mask], col[mask]] = False
+        self.counter -= mask
+        if not self.extended:
+            return
+
+        # Scores are doubled by the killer kicker and by a batted ball.
+        points = self.points[row, col] * (1 + (self.kicker_counter > 50) + (self.bounce_counter > 0))
+        self.score += np.where(mask, points, 0)
+
+        self.kicker_counter += mask
+        normal = mask & (self.kicker_counter == 7)
+        hard = mask & (self.kicker_counter == 14)
+        killer = mask & (self.kicker_counter == 50)
+        self.vx = np.where(normal | killer, self.vx * 2, self.vx)
+        self.vy = np.where(hard, self.vy * 1.5, self.vy)
+        self.vy = np.where(killer, self.vy * 1.75, self.vy)
+        self.check_batting_score(mask)
+
+    def check_batting_score(self, mask):
+        """
+        EXTENSION HERE (Greater Control).
+        Counts a bounce for the batted balls in mask and returns
+        them to their previous speed once they have bounced enough
+        times without being hit by the paddle.
+        """
+        batted = mask & (self.bounce_counter > 0)
+        self.bounce_counter -= batted
+        done = batted & (self.bounce_counter == 0)
+        self.vx = np.where(done, self.vx / 1.5, self.vx)
+        self.vy = np.where(done, self.vy / 1.25, self.vy)
+
+    def reset_games(self, mask):
+        """
+        Starts the games in mask over: every brick standing, all
+        lives back, no score and the ball in the center (served
+        again with auto_serve).
+        """
+        self.bricks[mask] = True
+        self.counter[mask] = self.brick_rows * self.brick_cols
+        self.lives[mask] = self.num_lives
+        self.frames[mask] = 0
+        self.score[mask] = 0
+        self.paddle_x[mask] = self.width / 2 - self.paddle_width / 2
+        self.paddle_speed[mask] = 0
+        self.sample_count[mask] = 0
+        self.reset_balls(mask)
+        if self.auto_serve:
+            self.serve(mask)
+
+    def reset_balls(self, mask):
+        """
+        Puts the balls in mask back in the center of the field
+        at rest.
+
+        EXTENSION HERE (The Kicker).
+        The kicker counter will reset upon the ball's reset.
+        """
+        self.ball_x[mask] = self.width / 2 - self.ball_radius
+        self.ball_y[mask] = self.height / 2 - self.ball_radius
+        self.vx[mask] = 0
+        self.vy[mask] = 0
+        self.kicker_counter[mask] = 0
+        self.bounce_counter[mask] = 0
@@ -0,0 +1,316 @@
+"""
+This program benchmarks the game logic behind both versions of
+'Breakout' (breakoutgraphics.py and extendedbreakoutgraphics.py
+both play their game through a BreakoutState, with the base and
+extended rule sets). Every run is deterministic: the
+ball's serves come from a seeded generator and the paddle is
+moved by a scripted autopilot, so the same code always plays the
+same games.
+
+For each version and board size it reports frames per second,
+brick hit-tests per second and the time taken to clear the board.
+It also times a cold start in a fresh Python process: importing the
+game (through its entry point, which must not load campy until a
+window is made), building the board and stepping the first frame.
+The timings are compared with a baseline saved on the same machine
+(it isn't committed, since timings only mean something on the
+machine that took them), and any that got noticeably slower are
+reported. The games themselves (frames to clear the board, final
+score and bricks left) don't depend on the machine, so they are
+compared exactly with GAMES_PATH, which is committed: a different
+game means the rules changed. Either problem gives a non-zero exit
+status.
+
+Usage:
+    python benchmark.py             # run and compare with the baseline
+    python benchmark.py --save      # run and save the results as the baseline (and the games played)
+    python benchmark.py --startup   # only time cold starts
+    python benchmark.py --continuous --save --baseline continuous.json   # with continuous (swept) collisions
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from breakoutrules import BASE_RULES, EXTENDED_RULES
+from breakoutstate import BreakoutState
+from inputlog import HeadlessDriver
+
+BOARD_SIZES = ['10x10', '50x50', '200x200']  # Brick rows x brick columns.
+VARIANTS = {'breakoutgraphics': BASE_RULES, 'extendedbreakoutgraphics': EXTENDED_RULES}
+SEED = 120
+FRAMES = 20000             # Frames timed for frames per second.
+HIT_TESTS = 200000         # Points looked up for hit-tests per second.
+MAX_CLEAR_FRAMES = 1000000  # A board that isn't cleared within this many frames is reported as not cleared.
+STALL_FRAMES = 5000        # The autopilot lets the ball go (for a new serve) after this many frames without a hit.
+TOLERANCE = 0.25           # Allowed slowdown compared with the baseline before it counts as a regression.
+BASELINE_PATH = 'benchmark_baseline.json'   # This machine's timings (not committed).
+GAMES_PATH = 'benchmark_games.json'         # The games every machine plays (committed).
+GAME_FIELDS = ['clear_frames', 'clear_score', 'bricks_left']
+STARTUP_RUNS = 5           # Cold starts timed for each board size (the fastest one is kept).
+STARTUP_SLACK_MS = 5       # Cold start timings only count as a regression if they're also this much slower.
+
+# Run in a fresh interpreter for each cold start; prints its timings (in milliseconds) as JSON.
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import extendedbreakout
+from breakoutstate import BreakoutState, step
+imported = time.perf_counter()
+state = BreakoutState(brick_rows={rows}, brick_cols={cols}, extended=True)
+built = time.perf_counter()
+state.set_ball_velocity()
+step(state)
+stepped = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - start) * 1000, 'build_ms': (built - imported) * 1000,
+                  'first_frame_ms': (stepped - built) * 1000, 'campy_loaded': 'campy' in sys.modules}}))
+'''
+
+
+def new_game(rules, size, seed, continuous=False):
+    """
+    Returns a served BreakoutState with the given board size
+    ('rows x cols'), whose serves come from a generator seeded
+    with seed. It has a life for every frame that can be played,
+    so only clearing the board ends the game.
+    """
+    rows, cols = (int(n) for n in size.split('x'))
+    state = BreakoutState(brick_rows=rows, brick_cols=cols, rules=rules, continuous=continuous,
+                          rng=random.Random(seed), lives=MAX_CLEAR_FRAMES)
+    state.set_ball_velocity()
+    return state
+
+
+def play(state, frames, script):
+    """
+    Plays up to frames frames, moving the paddle under the ball
+    (shifted by the scripted random offsets). A ball that hasn't
+    broken a brick for STALL_FRAMES frames (e.g. one bouncing
+    straight up and down) is let go, and lost balls are served
+    again, so the game only ends when the board is cleared. Returns
+    the number of frames played.
+    """
+    driver = HeadlessDriver(state, serve=True)
+    played = 0
+    since_hit = 0
+    lives = state.lives
+    while played < frames and driver.check():
+        if state.lives < lives:
+            lives = state.lives
+            since_hit = 0
+        ball_x = state.ball.x + state.ball_radius
+        if since_hit > STALL_FRAMES:
+            ball_x = state.width - ball_x
+        if driver.play_frame(ball_x + script.uniform(-30, 30)):
+            since_hit = 0
+        else:
+            since_hit += 1
+        played += 1
+    return played
+
+
+def bench_frames(rules, size, continuous=False):
+    """
+    Returns the frames per second of a game played for FRAMES frames.
+    """
+    state = new_game(rules, size, SEED, continuous)
+    script = random.Random(SEED)
+    start = time.perf_counter()
+    played = play(state, FRAMES, script)
+    return played / (time.perf_counter() - start)
+
+
+def bench_hit_tests(rules, size):
+    """
+    Returns the number of hit-tests (looking up the object at a
+    point) per second, at points spread over the whole board.
+    """
+    state = new_game(rules, size, SEED)
+    script = random.Random(SEED)
+    points = [(script.uniform(0, state.width), script.uniform(0, state.height)) for n in range(HIT_TESTS)]
+    object_at = state.object_at
+    start = time.perf_counter()
+    for x, y in points:
+        object_at(x, y)
+    return HIT_TESTS / (time.perf_counter() - start)
+
+
+def bench_clear(rules, size, continuous=False):
+    """
+    Returns the seconds and frames taken to clear the board, the
+    final score and the bricks left (the seconds and frames are None
+    if the board wasn't cleared within MAX_CLEAR_FRAMES frames).
+    """
+    state = new_game(rules, size, SEED, continuous)
+    script = random.Random(SEED)
+    start = time.perf_counter()
+    played = play(state, MAX_CLEAR_FRAMES, script)
+    seconds = time.perf_counter() - start
+    if not state.no_more_blocks():
+        seconds = None
+        played = None
+    return seconds, played, state.score, state.counter
+
+
+def bench_startup(size):
+    """
+    Returns the fastest of STARTUP_RUNS cold starts for a board
+    size: milliseconds to import the game, build the board, step the
+    first frame and for the whole process (interpreter start to
+    exit), and whether campy was loaded along the way.
+    """
+    rows, cols = (int(n) for n in size.split('x'))
+    script = STARTUP_SCRIPT.format(rows=rows, cols=cols)
+    best = None
+    for n in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        # The script imports the game by name, so it runs next to it whatever directory the benchmark is run from.
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        result = json.loads(output)
+        result['process_ms'] = (time.perf_counter() - start) * 1000
+        if best is None or result['process_ms'] < best['process_ms']:
+            best = result
+    return {key: round(value, 2) if key != 'campy_loaded' else value for key, value in best.items()}
+
+
+def run_startup(sizes):
+    """
+    Times cold starts at the given board sizes and returns the
+    results, keyed by 'startup size'.
+    """
+    results = {}
+    for size in sizes:
+        result = bench_startup(size)
+        results['startup ' + size] = result
+        print('startup', size, result)
+    return results
+
+
+def run(sizes, continuous=False):
+    """
+    Runs every benchmark for both versions at the given board
+    sizes and returns the results, keyed by 'version size' (or
+    'version continuous size' for continuous collisions).
+    """
+    results = {}
+    for variant, rules in VARIANTS.items():
+        if continuous:
+            variant += ' continuous'
+        for size in sizes:
+            seconds, frames, score, left = bench_clear(rules, size, continuous)
+            result = {'frames_per_sec': round(bench_frames(rules, size, continuous)),
+                      'hit_tests_per_sec': round(bench_hit_tests(rules, size)),
+                      'clear_seconds': None if seconds is None else round(seconds, 3),
+                      'clear_frames': frames,
+                      'clear_score': score,
+                      'bricks_left': left}
+            results[variant + ' ' + size] = result
+            print(variant, size, result)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Returns a list of lines describing every result that is slower
+    than its baseline by more than tolerance.
+    """
+    problems = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if 'process_ms' in result:
+            for key in ('import_ms', 'build_ms', 'first_frame_ms', 'process_ms'):
+                if result[key] > max(old[key] * (1 + tolerance), old[key] + STARTUP_SLACK_MS):
+                    problems.append('{} {}: {} (baseline {})'.format(name, key, result[key], old[key]))
+            continue
+        for key in ('frames_per_sec', 'hit_tests_per_sec'):
+            if result[key] < old[key] * (1 - tolerance):
+                problems.append('{} {}: {} (baseline {})'.format(name, key, result[key], old[key]))
+        if result['clear_seconds'] is not None and old['clear_seconds'] is not None and \
+                result['clear_seconds'] > old['clear_seconds'] * (1 + tolerance):
+            problems.append('{} clear_seconds: {} (baseline {})'.format(name, result['clear_seconds'],
+                                                                        old['clear_seconds']))
+    return problems
+
+
+def games_of(results):
+    """
+    Returns the games played in results (the GAME_FIELDS of every
+    version and board size), which are the same on any machine.
+    """
+    return {name: {key: result[key] for key in GAME_FIELDS}
+            for name, result in results.items() if 'clear_frames' in result}
+
+
+def compare_games(results, games):
+    """
+    Returns a list of lines describing every result that played a
+    different game from the one saved in games (which means the
+    rules changed), or whose cold start loaded campy.
+    """
+    problems = ['{}: importing the game loaded campy'.format(name)
+                for name, result in results.items() if result.get('campy_loaded')]
+    for name, game in games_of(results).items():
+        old = games.get(name)
+        if old is not None and game != old:
+            problems.append('{} played a different game: {} frames, {} points and {} bricks left '
+                            '(expected {}, {} and {})'.format(name, *(game[key] for key in GAME_FIELDS),
+                                                              *(old[key] for key in GAME_FIELDS)))
+    return problems
+
+
+def load(path):
+    """
+    Returns the results saved at path, or None if there are none.
+    """
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Breakout game logic.')
+    parser.add_argument('--save', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file (default: %(default)s)')
+    parser.add_argument('--games', default=GAMES_PATH, help='file of the games played (default: %(default)s)')
+    parser.add_argument('--sizes', nargs='+', default=BOARD_SIZES, help='board sizes as ROWSxCOLS')
+    parser.add_argument('--startup', action='store_true', help='only time cold starts')
+    parser.add_argument('--continuous', action='store_true', help='play with continuous (swept) collisions')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = run_startup(args.sizes)
+    if not args.startup:
+        results.update(run(args.sizes, args.continuous))
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print('Saved baseline to', args.baseline)
+        games = load(args.games) or {}
+        games.update(games_of(results))
+        with open(args.games, 'w') as file:
+            json.dump(games, file, indent=2, sort_keys=True)
+        print('Saved games to', args.games)
+        return
+
+    problems = compare_games(results, load(args.games) or {})
+    baseline = load(args.baseline)
+    if baseline is None:
+        print('No baseline at', args.baseline, '(run with --save to make one)')
+    else:
+        problems += compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print('REGRESSION:', problem)
+    if problems:
+        sys.exit(1)
+    print('No regressions against', args.games if baseline is None else args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,40 +7,93 @@ the bouncing ball. If all the blocks are cleared, the user has
 won. If the user misses the ball with their paddle and the ball
 falls through the bottom of the window, however, the user has
 lost a life, losing the game if 3 lives are lost.
+
+The game is played with the rule set given to main() (the base
+rules here, every extension in extendedbreakout.py), or with the
+rules named in BREAKOUT_RULES (see breakoutrules.py).
+
+Clicking the window's top left corner switches the frame profiler
+on or off while the game is played, and its report is saved when the
+game ends (see frameprofiler.py).
 """
-from campy.gui.events.timer import pause
+import os
+from autopilot import Autopilot
+from frameprofiler import FrameProfiler
+from gameloop import FixedStepLoop
 from breakoutgraphics import BreakoutGraphics
+from breakoutrules import BASE_RULES, parse_rules
+from breakoutstate import NUM_LIVES
 
 FRAME_RATE = 1000 / 120  # 120 frames per second.
-NUM_LIVES = 3
+PROFILE_PATH = os.environ.get('BREAKOUT_PROFILE')  # Profile every frame and save it here (.json or .csv).
+DEFAULT_PROFILE_PATH = 'profile.json'  # Where a profile switched on during the game is saved otherwise.
+RECORD_PATH = os.environ.get('BREAKOUT_RECORD')  # Where to save the game's input log, if anywhere (see inputlog.py).
+AUTOPILOT = bool(os.environ.get('BREAKOUT_AUTOPILOT'))  # Let the computer play (for soak tests and demos).
+SPECTATE = os.environ.get('BREAKOUT_SPECTATE')  # HOST:PORT to stream the game to spectators on, if anywhere.
+LEVEL_PATH = os.environ.get('BREAKOUT_LEVEL')  # A level file to play instead of the usual wall (see levelfile.py).
+RULE_NAMES = os.environ.get('BREAKOUT_RULES')  # Rules to play with instead, e.g. 'extended' or 'control,kicker'.
+CONTINUOUS = bool(os.environ.get('BREAKOUT_CONTINUOUS'))  # Sweep the ball so fast balls can't pass through bricks.
 
 
-def main():
-    graphics = BreakoutGraphics()
-    lives = NUM_LIVES
+def main(rules=BASE_RULES):
+    from campy.gui.events.timer import pause
+    if RULE_NAMES:
+        rules = parse_rules(RULE_NAMES)
+    profiler = FrameProfiler(enabled=PROFILE_PATH is not None)
+    level = None
+    if LEVEL_PATH:
+        from levelfile import load_level
+        level = load_level(LEVEL_PATH)
+    graphics = BreakoutGraphics(lives=NUM_LIVES, profiler=profiler, level=level, rules=rules,
+                                continuous=CONTINUOUS)
+    autopilot = Autopilot(graphics.state) if AUTOPILOT else None
+    spectator = None
+    if SPECTATE:
+        from spectator import SpectatorThread
+        host, _, port = SPECTATE.rpartition(':')
+        spectator = SpectatorThread(graphics.state, host, int(port))
 
-    # Add animation loop here!
-    while True:
+    # Physics runs at a fixed FRAME_RATE, drawing is skipped when the window falls behind.
+    loop = FixedStepLoop(FRAME_RATE, sleep=profiler.timed('pause', pause))
+    loop.run(lambda: play_frame(graphics, autopilot, spectator), profiler.timed('render', graphics.draw_ball))
+    print('{}, {} mouse moves merged into later ones'.format(loop.summary(), graphics.merged_moves))
+    if spectator is not None:
+        spectator.publish()
+        spectator.close()
+    # The profile is saved if the profiler was on at any point (it can be switched on during the game).
+    if profiler.frames > 0:
+        profiler.export(PROFILE_PATH or DEFAULT_PROFILE_PATH)
+    if RECORD_PATH:
+        graphics.recorder.save(RECORD_PATH, graphics.state)
 
-        # Display's a win to the user if all blocks have been
-        if graphics.no_more_blocks():
-            graphics.win()
-            break
 
-        # Resets the ball at the cost of one life or display's a loss if all lives are lost
-        if graphics.ball_out_of_screen():
-            lives -= 1
-            if lives > 0:
-                graphics.reset_ball()
-            else:
-                graphics.lose()
-                break
+def play_frame(graphics, autopilot=None, spectator=None):
+    """
+    Plays one frame of the game, returning False once the
+    game has been won or lost. An autopilot (if given) moves
+    the paddle instead of the user, and the frame is published
+    to a spectator server (if given).
+    """
+    # Display's a win to the user if all blocks have been
+    if graphics.no_more_blocks():
+        graphics.win()
+        return False
 
-        graphics.move_ball()
-        graphics.handle_wall_collisions()
-        graphics.handle_object_collision()
+    # Resets the ball at the cost of one life or display's a loss if all lives are lost
+    if graphics.ball_out_of_screen():
+        lives = graphics.lose_life()
+        if lives > 0:
+            graphics.reset_ball()
+        else:
+            graphics.lose()
+            return False
 
-        pause(FRAME_RATE)
+    if autopilot is not None:
+        autopilot.drive(graphics)
+    graphics.step(draw=False)
+    if spectator is not None:
+        spectator.publish()
+    return True
 
 
 if __name__ == '__main__':
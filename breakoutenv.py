@@ -0,0 +1,359 @@
+"""
+This program describes Gym-style environments for training and
+evaluating paddle-control policies on a game reminiscent of
+'Breakout'. BreakoutEnv plays one game with the same BreakoutState
+rules as the BreakoutGraphics windows (the extended batting and
+kicker rules are switched on with 'extended'), through
+reset(seed) and step(action).
+
+An action is where the pointer goes: the x the paddle's center
+should follow, as a fraction of the field's width (0 is the left
+edge, 1 the right), just like the mouse in the windowed game. The
+ball is served as soon as a game starts or a life is lost. The
+reward of a step is the points scored with the extended rules, or
+the bricks broken with the base rules (which keep no score).
+
+An observation is OBSERVATION_SIZE float32 numbers, see OBSERVATION:
+the ball's position (as fractions of the field), its velocity (in
+pixels per frame), the paddle's center (as a fraction of the
+width), the lives left and the fraction of bricks still standing.
+
+Two vector environments run num_envs games at once and take and
+return NumPy arrays, with games that end started over automatically:
+
+    SubprocVectorEnv  BreakoutEnvs spread over worker processes. The
+                      actions, observations, rewards and info are
+                      shared memory arrays, and the workers are only
+                      sent a one-byte command per step, so nothing
+                      is pickled once they're running.
+    BatchVectorEnv    One BatchBreakout (see batchbreakout.py), so
+                      every game is stepped by the same NumPy
+                      operations. Much faster with many envs, but
+                      its serves don't follow BreakoutState's random
+                      sequence.
+
+Both return (observations, rewards, dones, info) from step(), where
+info has 'score', 'counter' and 'lives' arrays of the games as they
+were at the end of the step (before any of them was started over).
+The arrays returned are reused by the next step.
+
+Usage:
+    python breakoutenv.py                    # steps/sec of every environment
+    python breakoutenv.py --envs 64 --steps 5000 --extended
+"""
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from batchbreakout import BatchBreakout
+from breakoutstate import BreakoutState, NUM_LIVES
+from inputlog import HeadlessDriver
+
+OBSERVATION = ['ball_x', 'ball_y', 'vx', 'vy', 'paddle_x', 'lives', 'bricks_left']
+OBSERVATION_SIZE = len(OBSERVATION)
+MAX_FRAMES = 100000    # A game still going after this many steps is over.
+RESET = b'r'           # Commands sent to the workers of a SubprocVectorEnv.
+STEP = b's'
+CLOSE = b'c'
+
+
+class BreakoutEnv:
+
+    def __init__(self, extended=False, lives=NUM_LIVES, max_frames=MAX_FRAMES, **layout):
+        self.extended = extended
+        self.lives = lives
+        self.max_frames = max_frames
+        self.layout = layout   # Any other BreakoutState arguments (brick_rows, brick_cols...)
+        self.rng = random.Random()
+        self.state = None
+        self.driver = None
+        self.frames = 0
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+
+    def reset(self, seed=None):
+        """
+        Starts a new game (its serves seeded with seed, if given) and
+        returns the first observation and the info.
+        """
+        self.rng.seed(seed)
+        self.state = BreakoutState(lives=self.lives, extended=self.extended, rng=self.rng, **self.layout)
+        self.state.set_ball_velocity()
+        self.driver = HeadlessDriver(self.state, serve=True)
+        self.frames = 0
+        return self.observe(self.observation), self.info()
+
+    def step(self, action):
+        """
+        Moves the paddle to the action's x and plays one frame.
+        Returns the observation, the reward, whether the game is
+        over and the info.
+        """
+        state = self.state
+        score = state.score
+        counter = state.counter
+        self.driver.play_frame(float(action) * state.width)
+        self.frames += 1
+        self.driver.check()
+        reward = state.score - score if self.extended else counter - state.counter
+        return self.observe(self.observation), reward, self.done(), self.info()
+
+    def done(self):
+        """
+        Returns whether the game is over (won, lost or out of frames).
+        """
+        return self.driver.over or self.frames >= self.max_frames
+
+    def info(self):
+        """
+        Returns the score, bricks left and lives of the game.
+        """
+        return {'score': self.state.score, 'counter': self.state.counter, 'lives': self.state.lives}
+
+    def observe(self, out):
+        """
+        Writes the observation of the game to out (an array of
+        OBSERVATION_SIZE numbers, e.g. a row of shared memory) and
+        returns it.
+        """
+        state = self.state
+        out[0] = state.ball.x / state.width
+        out[1] = state.ball.y / state.height
+        out[2] = state.vx
+        out[3] = state.vy
+        out[4] = (state.paddle.x + state.paddle_width / 2) / state.width
+        out[5] = state.lives
+        out[6] = state.counter / (state.brick_rows * state.brick_cols)
+        return out
+
+
+def shared_array(typecode, shape):
+    """
+    Returns a NumPy array of the given shape over new shared
+    memory (without a lock) and the shared memory itself.
+    """
+    size = int(np.prod(shape))
+    memory = multiprocessing.RawArray(typecode, size)
+    return np.frombuffer(memory, dtype=np.dtype(typecode)).reshape(shape), memory
+
+
+SHARED = {'actions': ('d', ()), 'seeds': ('q', ()), 'observations': ('f', (OBSERVATION_SIZE,)),
+          'rewards': ('d', ()), 'dones': ('b', ()), 'score': ('q', ()), 'counter': ('q', ()), 'lives': ('q', ())}
+
+
+def run_worker(connection, memories, first, count, num_envs, kwargs):
+    """
+    Plays envs first to first + count - 1 of a SubprocVectorEnv in
+    a worker process, reading actions and seeds from the shared
+    arrays and writing results back, one command at a time.
+    """
+    arrays = {}
+    for name, (typecode, shape) in SHARED.items():
+        arrays[name] = np.frombuffer(memories[name], dtype=np.dtype(typecode)).reshape((num_envs,) + shape)
+    envs = [BreakoutEnv(**kwargs) for n in range(count)]
+    actions = arrays['actions']
+    observations = arrays['observations']
+    while True:
+        command = connection.recv_bytes()
+        if command == CLOSE:
+            break
+        for n, env in enumerate(envs):
+            i = first + n
+            if command == RESET:
+                seed = int(arrays['seeds'][i])
+                env.reset(seed if seed >= 0 else None)
+                reward, done, info = 0, False, env.info()
+            else:
+                observation, reward, done, info = env.step(actions[i])
+                if done:
+                    # Started over with a seed from the env's own generator, so seeded runs stay reproducible.
+                    env.reset(env.rng.getrandbits(63))
+            env.observe(observations[i])
+            arrays['rewards'][i] = reward
+            arrays['dones'][i] = done
+            arrays['score'][i] = info['score']
+            arrays['counter'][i] = info['counter']
+            arrays['lives'][i] = info['lives']
+        connection.send_bytes(command)
+    connection.close()
+
+
+class SubprocVectorEnv:
+
+    def __init__(self, num_envs, workers=None, **kwargs):
+        self.num_envs = num_envs
+        workers = min(num_envs, workers or os.cpu_count())
+        self.arrays = {}
+        memories = {}
+        for name, (typecode, shape) in SHARED.items():
+            self.arrays[name], memories[name] = shared_array(typecode, (num_envs,) + shape)
+        self.connections = []
+        self.processes = []
+        for n in range(workers):
+            first = n * num_envs // workers
+            count = (n + 1) * num_envs // workers - first
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, daemon=True,
+                                              args=(worker_connection, memories, first, count, num_envs, kwargs))
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def command(self, command):
+        """
+        Sends a command to every worker and waits for all of them
+        to finish it.
+        """
+        for connection in self.connections:
+            connection.send_bytes(command)
+        for connection in self.connections:
+            connection.recv_bytes()
+
+    def reset(self, seed=None):
+        """
+        Starts every game over (env n's serves seeded with seed + n,
+        if a seed is given) and returns the observations and info.
+        """
+        self.arrays['seeds'][:] = -1 if seed is None else seed + np.arange(self.num_envs)
+        self.command(RESET)
+        return self.arrays['observations'], self.info()
+
+    def step(self, actions):
+        """
+        Plays one frame of every game with the given actions (one
+        per env) and returns the observations, rewards, dones and
+        info arrays.
+        """
+        self.arrays['actions'][:] = actions
+        self.command(STEP)
+        return self.arrays['observations'], self.arrays['rewards'], self.arrays['dones'].view(bool), self.info()
+
+    def info(self):
+        """
+        Returns the score, counter and lives arrays.
+        """
+        return {'score': self.arrays['score'], 'counter': self.arrays['counter'], 'lives': self.arrays['lives']}
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        for connection in self.connections:
+            connection.send_bytes(CLOSE)
+        for process in self.processes:
+            process.join()
+
+
+class BatchVectorEnv:
+
+    def __init__(self, num_envs, extended=False, lives=NUM_LIVES, max_frames=MAX_FRAMES, **layout):
+        self.num_envs = num_envs
+        self.extended = extended
+        self.lives = lives
+        self.max_frames = max_frames
+        self.layout = layout
+        self.batch = None
+        self.observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+
+    def reset(self, seed=None):
+        """
+        Starts every game over (with serves from a NumPy generator
+        seeded with seed) and returns the observations and info.
+        """
+        self.batch = BatchBreakout(self.num_envs, lives=self.lives, extended=self.extended, seed=seed, **self.layout)
+        return self.observe(), self.info()
+
+    def step(self, actions):
+        """
+        Plays one frame of every game with the given actions (one
+        per env) and returns the observations, rewards, dones and
+        info arrays.
+        """
+        batch = self.batch
+        score = batch.score.copy()
+        counter = batch.counter.copy()
+        batch.move_paddles(np.asarray(actions) * batch.width)
+        dones = batch.step() | (batch.frames >= self.max_frames)
+        rewards = batch.score - score if self.extended else counter - batch.counter
+        info = self.info()
+        if dones.any():
+            batch.reset_games(dones)
+        return self.observe(), rewards, dones, info
+
+    def info(self):
+        """
+        Returns (copies of) the score, counter and lives arrays.
+        """
+        return {'score': self.batch.score.copy(), 'counter': self.batch.counter.copy(),
+                'lives': self.batch.lives.copy()}
+
+    def observe(self):
+        """
+        Fills the observations array from the batch and returns it.
+        """
+        batch = self.batch
+        out = self.observations
+        out[:, 0] = batch.ball_x / batch.width
+        out[:, 1] = batch.ball_y / batch.height
+        out[:, 2] = batch.vx
+        out[:, 3] = batch.vy
+        out[:, 4] = (batch.paddle_x + batch.paddle_width / 2) / batch.width
+        out[:, 5] = batch.lives
+        out[:, 6] = batch.counter / (batch.brick_rows * batch.brick_cols)
+        return out
+
+    def close(self):
+        """
+        Does nothing (there's nothing to stop), for the same
+        interface as SubprocVectorEnv.
+        """
+
+
+def follow_ball(observations):
+    """
+    Returns the actions of a simple policy that keeps the paddle
+    under the ball (for benchmarks and smoke tests).
+    """
+    return observations[..., 0] + 0.02
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Measure the steps per second of the Breakout environments.')
+    parser.add_argument('--envs', type=int, default=16, help='games played at once by the vector environments')
+    parser.add_argument('--steps', type=int, default=2000, help='steps timed for each environment')
+    parser.add_argument('--extended', action='store_true', help='play with the extended rules')
+    parser.add_argument('--continuous', action='store_true',
+                        help='sweep the ball (continuous collisions; not supported by BatchVectorEnv)')
+    parser.add_argument('--size', default='10x10', help='board size as ROWSxCOLS (default: %(default)s)')
+    args = parser.parse_args()
+    rows, cols = (int(n) for n in args.size.split('x'))
+    kwargs = {'extended': args.extended, 'brick_rows': rows, 'brick_cols': cols}
+    vector_envs = [('SubprocVectorEnv', SubprocVectorEnv)]
+    if args.continuous:
+        kwargs['continuous'] = True
+    else:
+        vector_envs.append(('BatchVectorEnv', BatchVectorEnv))
+
+    env = BreakoutEnv(**kwargs)
+    observation, info = env.reset(0)
+    start = time.perf_counter()
+    for n in range(args.steps):
+        observation, reward, done, info = env.step(follow_ball(observation))
+        if done:
+            observation, info = env.reset()
+    print('BreakoutEnv        {:12.0f} env steps/sec'.format(args.steps / (time.perf_counter() - start)))
+
+    for name, make_env in vector_envs:
+        vector_env = make_env(args.envs, **kwargs)
+        observations, info = vector_env.reset(0)
+        start = time.perf_counter()
+        for n in range(args.steps):
+            observations, rewards, dones, info = vector_env.step(follow_ball(observations))
+        seconds = time.perf_counter() - start
+        vector_env.close()
+        print('{:18} {:12.0f} env steps/sec ({} envs)'.format(name, args.steps * args.envs / seconds, args.envs))
+
+
+if __name__ == '__main__':
+    main()
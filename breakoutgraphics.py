@@ -3,28 +3,28 @@ This program describes a class that sets up and operates
 a game reminiscent of 'Breakout'. Utilizing user input,
 the game starts with a click and follows a ball that bounces
 of blocks and a paddle controlled by the user's mouse.
-"""
-from campy.graphics.gwindow import GWindow
-from campy.graphics.gobjects import GOval, GRect, GLabel
-from campy.gui.events.mouse import onmouseclicked, onmousemoved
-import random
 
-# Color names to cycle through for brick rows.
-COLORS = ['RED', 'ORANGE', 'YELLOW', 'GREEN', 'BLUE']
+The game itself is played by a BreakoutState (breakoutstate.py);
+this class only draws that state in a campy GWindow (through a
+Renderer, which makes each GObject once and then only moves,
+recolors or relabels it).
 
-BRICK_SPACING = 5      # Space between bricks (in pixels). This space is used for horizontal and vertical spacing.
-BRICK_WIDTH = 40       # Height of a brick (in pixels).
-BRICK_HEIGHT = 15      # Height of a brick (in pixels).
-BRICK_ROWS = 10        # Number of rows of bricks.
-BRICK_COLS = 10        # Number of columns of bricks.
-BRICK_OFFSET = 50      # Vertical offset of the topmost brick from the window top (in pixels).
-BALL_RADIUS = 10       # Radius of the ball (in pixels).
-PADDLE_WIDTH = 75      # Width of the paddle (in pixels).
-PADDLE_HEIGHT = 15     # Height of the paddle (in pixels).
-PADDLE_OFFSET = 50     # Vertical offset of the paddle from the window bottom (in pixels).
+The same class plays the base game and the extended one: the rule
+set it's given (see breakoutrules.py) decides which extensions are
+switched on, and what they draw.
+"""
+from breakoutrenderer import Renderer
+from breakoutrules import BASE_RULES, CONTROL, make_rules
+from brickwall import BrickWall
+from breakoutstate import (BreakoutState, step, BRICK_SPACING, BRICK_WIDTH, BRICK_HEIGHT, BRICK_ROWS, BRICK_COLS,
+                           BRICK_OFFSET, BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_OFFSET, NUM_LIVES)
+from frameprofiler import FrameProfiler
+from inputlog import InputRecorder, apply_input, new_seed
+from paddlevelocity import PaddleVelocity, FRAME_NS
+import random
+import time
 
-INITIAL_Y_SPEED = 5.0  # Initial vertical speed for the ball.
-MAX_X_SPEED = 3.5      # Maximum initial horizontal speed for the ball.
+PROFILER_CORNER = 20   # A click this close to the window's top left corner switches the frame profiler on or off.
 
 
 class BreakoutGraphics:
@@ -34,147 +34,287 @@ class BreakoutGraphics:
                  brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS,
                  brick_width=BRICK_WIDTH, brick_height=BRICK_HEIGHT,
                  brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING,
-                 title='Breakout'):
+                 lives=NUM_LIVES, title='Breakout', profiler=None, seed=None, strips=None, level=None,
+                 rules=BASE_RULES, continuous=False):
+
+        # Every serve comes from the game's own seeded generator, so the seed and the input replay the game.
+        self.seed = new_seed() if seed is None else seed
+        self.random = random.Random(self.seed)
+
+        # The game state (with the rules switched on) that is drawn in the window. A continuous game sweeps
+        # the ball along its path, so however fast it moves it never passes through a brick.
+        self.state = BreakoutState(ball_radius=ball_radius, paddle_width=paddle_width,
+                                   paddle_height=paddle_height, paddle_offset=paddle_offset,
+                                   brick_rows=brick_rows, brick_cols=brick_cols,
+                                   brick_width=brick_width, brick_height=brick_height,
+                                   brick_offset=brick_offset, brick_spacing=brick_spacing,
+                                   lives=lives, level=level, rules=rules, continuous=continuous, rng=self.random)
+        # EXTENSION (Greater Control): batting needs the paddle's speed.
+        self.velocity = PaddleVelocity() if CONTROL in self.state.rules else None
+        self.recorder = InputRecorder(self.state, self.seed, self.velocity, level=level)
+
+        # Create a graphical window, with some extra space (campy, and Tk with it, is only loaded here).
+        from campy.graphics.gwindow import GWindow
+        from campy.gui.events.mouse import onmouseclicked, onmousemoved
+        self.window = GWindow(width=self.state.width, height=self.state.height, title=title)
+        self.renderer = Renderer(self.window)
 
-        # Create a graphical window, with some extra space.
-        window_width = brick_cols * (brick_width + brick_spacing) - brick_spacing
-        window_height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
-        self.window = GWindow(width=window_width, height=window_height, title=title)
+        # Times the phases of each frame while it's enabled (see frameprofiler.py).
+        self.profiler = profiler if profiler is not None else FrameProfiler()
 
         # Create a paddle.
-        paddle_x = window_width / 2 - paddle_width / 2
-        self.paddle_y = window_height - paddle_offset
-        self.paddle = GRect(width=paddle_width, height=paddle_height, x=paddle_x, y=self.paddle_y)
-        self.paddle.filled = True
-        self.window.add(self.paddle)
-
-        # Center a filled ball in the graphical window.
-        ball_x = window_width / 2 - ball_radius
-        ball_y = window_height / 2 - ball_radius
-        self.ball = GOval(width=2*ball_radius, height=2*ball_radius, x=ball_x, y=ball_y)
-        self.ball.filled = True
-        self.window.add(self.ball)
-
-        # Default initial velocity for the ball.
-        self.vx = 0
-        self.vy = 0
-
-        # Initialize our mouse listeners.
+        self.paddle_y = self.state.paddle.y
+        self.paddle = self.renderer.rect('paddle', paddle_width, paddle_height,
+                                         self.state.paddle.x, self.paddle_y, 'black')
+
+        # Center a filled ball in the graphical window (each ball in the state is drawn by one GOval).
+        self.ball_keys = set()
+        self.draw_ball()
+        self.ball = self.renderer.get(('ball', self.state.ball.number))
+
+        # Initialize our mouse listeners (mouse moves are applied once per frame).
+        self.pointer_x = None
+        self.clicked = False
+        self.merged_moves = 0
         onmouseclicked(self.handle_click)
         onmousemoved(self.handle_move)
 
-        # Draw bricks.
-        brick_y = brick_offset
-        for n in range(brick_rows):
-            if n > 9:
-                c = n - 10 * (n // 10)
-            else:
-                c = n
-            color = COLORS[c // 2]
-            brick_x = 0
-            for i in range(brick_cols):
-                self.brick = GRect(width=brick_width, height=brick_height, x=brick_x, y=brick_y)
-                self.brick.filled = True
-                self.brick.fill_color = color
-                self.window.add(self.brick)
-                brick_x += brick_width + brick_spacing
-            brick_y += brick_height + brick_spacing
-
-            # Brick Counter
-            self.counter = brick_cols * brick_rows
+        # Draw bricks (one GRect per brick, or per strip of bricks on big walls; see brickwall.py).
+        self.wall = BrickWall(self.renderer, self.state.bricks, self.state.registry, strips)
+
+        # Each rule draws its own part of the window (e.g. the score and lives).
+        self.rules = make_rules(self.state.rules)
+        for rule in self.rules:
+            rule.attach(self)
+
+        # The frame step is put together once, for this rule set and profiler (see make_step()).
+        self.step = self.make_step()
 
     def handle_click(self, event):
         """
-        Starts the game if the user clicks their mouse.
+        Remembers that the user clicked their mouse, which starts
+        the game (if the ball is at rest) in flush_input() at the
+        start of the next frame. A click in the window's top left
+        corner switches the frame profiler on or off instead (see
+        frameprofiler.py).
         """
-        if self.vx == 0 and self.vy == 0:
-            self.set_ball_velocity()
+        if event.x < PROFILER_CORNER and event.y < PROFILER_CORNER:
+            self.profiler.toggle()
+            return
+        self.clicked = True
 
     def set_ball_velocity(self):
         """
         Set's the ball's new velocity upon being called on.
+
+        EXTENSION HERE (Greater Control).
+        Some values have been changed to better the game so that
+        it doesn't become boring with a velocity close to 0.
         """
-        self.vx = random.uniform(-MAX_X_SPEED, MAX_X_SPEED)
-        self.vy = INITIAL_Y_SPEED
+        self.state.set_ball_velocity()
 
     def handle_move(self, event):
         """
-        Moves the paddle based on the center of the user's mouse (Will NOT
-        move outside the window).
+        Remembers the newest position of the user's mouse. The paddle
+        follows it once per frame, in flush_input(), however many mouse
+        events arrive in between (merged_moves counts the skipped ones,
+        and breakout.py prints it with the loop's summary at the end).
+        """
+        if self.pointer_x is not None:
+            self.merged_moves += 1
+        self.pointer_x = event.x
+
+    def flush_input(self):
+        """
+        Starts the game if the user clicked and moves the paddle based
+        on the center of the user's mouse (Will NOT move outside the
+        window). The frame's input is recorded first, so the game can
+        be replayed (see inputlog.py).
+
+        EXTENSION HERE (Greater Control).
+        The paddle's speed over the last few frames is given to
+        the game for batting (it slows down to 0 once the mouse
+        stops).
+
+        EXTENSION HERE (Improved Interface Display).
+        The intro message will be deleted when the user
+        starts the game.
+        """
+        pointer_x = self.recorder.record(self.pointer_x, self.clicked)
+        served = apply_input(self.state, pointer_x, self.clicked, self.velocity, self.recorder.frames * FRAME_NS)
+        self.pointer_x = None
+        self.clicked = False
+        if pointer_x is not None:
+            self.renderer.move('paddle', self.state.paddle.x, self.paddle_y)
+        if served:
+            for rule in self.rules:
+                rule.served(self)
+
+    def make_step(self):
+        """
+        Returns the function that plays one frame, step(draw=True):
+        it applies the newest mouse position, then advances the game
+        by one frame and removes the bricks it broke (if any). The
+        ball is redrawn unless draw is False, which lets a loop that
+        is catching up skip drawing it.
+
+        The function is made once for the game, so each frame only
+        does what the rule set needs (e.g. the frame's collision
+        events are only handed out if a rule subscribed to them).
+        """
+        state = self.state
+        profiler = self.profiler
+        profiled_step = self.profiled_step
+        flush_input = self.flush_input
+        remove = self.wall.remove
+        draw_ball = self.draw_ball
+
+        if not state.events.subscribers:
+            def step_frame(draw=True):
+                if profiler.enabled:
+                    profiled_step(draw)
+                    return
+                flush_input()
+                for brick in step(state):
+                    remove(brick)
+                if draw:
+                    draw_ball()
+            return step_frame
+
+        flush_events = state.events.flush
+
+        def step_frame(draw=True):
+            if profiler.enabled:
+                profiled_step(draw)
+                return
+            flush_input()
+            for brick in step(state):
+                remove(brick)
+            flush_events()
+            if draw:
+                draw_ball()
+        return step_frame
+
+    def profiled_step(self, draw=True):
+        """
+        The same as a step (see make_step()), but the profiler
+        records how long each phase of the frame takes and how many
+        GObjects it creates.
         """
-        self.window.remove(self.paddle)
-        if event.x - PADDLE_WIDTH / 2 <= 0:
-            paddle_x = 0
-        elif event.x + PADDLE_WIDTH / 2 > self.window.width:
-            paddle_x = self.window.width - PADDLE_WIDTH
+        profiler = self.profiler
+        start = time.perf_counter_ns()
+        self.flush_input()
+        now = time.perf_counter_ns()
+        profiler.record('input', now - start)
+
+        if self.state.continuous or len(self.state.balls) > 1:
+            broken = step(self.state)
+            start, now = now, time.perf_counter_ns()
+            profiler.record('move_ball', now - start)
         else:
-            paddle_x = event.x - PADDLE_WIDTH / 2
-        self.paddle = GRect(width=PADDLE_WIDTH, height=PADDLE_HEIGHT, x=paddle_x, y=self.paddle_y)
-        self.paddle.filled = True
-        self.window.add(self.paddle)
+            self.state.move_ball()
+            start, now = now, time.perf_counter_ns()
+            profiler.record('move_ball', now - start)
+            self.state.handle_wall_collisions()
+            start, now = now, time.perf_counter_ns()
+            profiler.record('wall_collisions', now - start)
+            brick = self.state.handle_object_collision()
+            broken = [] if brick is None else [brick]
+            start, now = now, time.perf_counter_ns()
+            profiler.record('object_collision', now - start)
+
+        for brick in broken:
+            self.remove_brick(brick)
+        self.state.events.flush()
+        start, now = now, time.perf_counter_ns()
+        profiler.record('hud', now - start)
+
+        if draw:
+            self.draw_ball()
+            profiler.record('render', time.perf_counter_ns() - now)
+        profiler.end_frame(self.renderer.created)
 
     def handle_wall_collisions(self):
         """
         Change's the ball's velocity according to which window
         boundary it hit (not including the bottom side).
+
+        EXTENSION HERE (Greater Control).
+        The bounce counter decreases by 1 every time the ball
+        bounces off a wall.
         """
-        # Second Boolean needed to prevent ball sticking to right/left wall after rapid bouncing on side bricks
-        if (self.ball.x <= 0 and self.vx < 0) or (self.ball.x >= self.window.width - self.ball.width and self.vx > 0):
-            self.vx = -self.vx
-        # Second Boolean needed to prevent ball sticking to top wall after rapid bouncing on top bricks
-        elif self.ball.y <= 0 and self.vy < 0:
-            self.vy = -self.vy
+        self.state.handle_wall_collisions()
+        self.draw_ball()
 
     def move_ball(self):
         """
         Moves the ball at the set velocity.
         """
-        self.ball.move(self.vx, self.vy)
+        self.state.move_ball()
+        self.draw_ball()
+
+    def draw_ball(self):
+        """
+        Moves the GOval of each ball to its position in the state
+        (showing GOvals for new balls and hiding those of balls
+        that are gone).
+
+        EXTENSION HERE (Greater Control).
+        A ball is red while it's in a "batted" state.
+        """
+        keys = set()
+        for ball in self.state.balls:
+            key = ('ball', ball.number)
+            color = 'red' if ball.bounce_counter > 0 else 'black'
+            self.renderer.oval(key, ball.width, ball.height, ball.x, ball.y, color)
+            keys.add(key)
+        for key in self.ball_keys - keys:
+            self.renderer.hide(key)
+        self.ball_keys = keys
 
     def object_collision(self):
         """
-        Returns the statement that confirms or denies an object's
-        presence at the ball's boundaries at any point in the
-        ball's movement.
-        """
-        n = 0
-        x = self.ball.x
-        y = self.ball.y
-        while n != 4:
-            obj = self.window.get_object_at(x, y)
-            if obj is not None:
-                return obj
-            n += 1
-            if n == 1:
-                x += BALL_RADIUS * 2
-            elif n == 2:
-                y += BALL_RADIUS * 2
-            elif n == 3:
-                x -= BALL_RADIUS * 2
+        Returns the GObject (paddle or brick) found at the ball's
+        boundaries, or None.
+        """
+        obj = self.state.object_collision()
+        if obj is self.state.paddle:
+            return self.paddle
+        if obj is None:
+            return None
+        return self.wall.get(obj)
 
     def handle_object_collision(self):
         """
-        Uses the statement given by object_collision() to
-        bounce the ball off of a given object (and break a
-        brick if needed).
+        Bounces the ball off of the object it touches (and
+        breaks a brick if needed).
+
+        EXTENSION HERE (Greater Control).
+        If the ball hits the far sides of the paddle, it
+        changes both x and y velocities, and moving the paddle
+        quick enough "bats" the ball (see BreakoutState).
+
+        EXTENSION HERE (Improved Interface Display).
+        The HUD is not part of the game state, so the ball
+        can never remove the lives and score.
         """
-        obj = self.object_collision()
-        if obj is None:
-            pass
-        elif obj is self.paddle:
-            if self.vy > 0:
-                self.bounce_ball()
-        else:
-            self.bounce_ball()
-            self.window.remove(obj)
-            self.counter -= 1
+        self.remove_brick(self.state.handle_object_collision())
+        self.state.events.flush()
+        self.draw_ball()
+
+    def remove_brick(self, brick):
+        """
+        Stops drawing a broken brick (see BrickWall.remove()).
+        """
+        if brick is not None:
+            self.wall.remove(brick)
 
     def bounce_ball(self):
         """
         Helper function that causes a ball to bounce off of
         a given object.
         """
-        self.vy = -self.vy
+        self.state.bounce_ball()
 
     def ball_out_of_screen(self):
         """
@@ -182,47 +322,67 @@ class BreakoutGraphics:
         with the scenario that the ball moved outside the
         window (through the bottom of the window).
         """
-        out_of_screen = self.ball.y >= self.window.height
-        return out_of_screen
+        return self.state.ball_out_of_screen()
+
+    def lose_life(self):
+        """
+        Takes a life from the player and returns the number
+        of lives left.
+
+        EXTENSION HERE (Improved Interface Display).
+        The lives shown to the user are updated as well.
+        """
+        lives = self.state.lose_life()
+        for rule in self.rules:
+            rule.life_lost(self)
+        return lives
 
     def reset_ball(self):
         """
         Reset's the ball (and the velocity) back to its original
         position, allowing the user to manually start the ball's
-        movement once more.
+        movement once more (the same GOval is used for every life).
+
+        EXTENSION HERE (The Kicker).
+        The kicker counter will reset upon the ball's reset.
         """
-        ball_x = self.window.width / 2 - BALL_RADIUS
-        ball_y = self.window.height / 2 - BALL_RADIUS
-        self.ball = GOval(width=2 * BALL_RADIUS, height=2 * BALL_RADIUS, x=ball_x, y=ball_y)
-        self.ball.filled = True
-        self.window.add(self.ball)
-        self.vx = 0
-        self.vy = 0
+        self.state.reset_ball()
+        self.draw_ball()
 
     def lose(self):
         """
         Shows the user that they have lost the game, signifying a break
         in the program (break not actually done by this function).
         """
-        display = GLabel('YOU LOSE. GAME OVER!')
-        display_x = self.window.width / 2 - display.width / 2
-        display_y = self.window.height / 2 + display.height / 2
-        self.window.add(display, display_x, display_y)
+        self.show_message('YOU LOSE. GAME OVER!')
 
     def win(self):
         """
         Shows the user that they have won the game, signifying a break
         in the program (break not actually done by this function).
         """
-        self.window.remove(self.ball)
-        display = GLabel('YOU WIN. CONGRATULATIONS!')
+        for key in self.ball_keys:
+            self.renderer.hide(key)
+        self.ball_keys = set()
+        self.show_message('YOU WIN. CONGRATULATIONS!')
+
+    def show_message(self, text):
+        """
+        Shows a message in the center of the window.
+
+        EXTENSION HERE (Improved Interface Display).
+        The final score is shown under it.
+        """
+        display = self.renderer.label('message', text, 0, 0)
         display_x = self.window.width / 2 - display.width / 2
         display_y = self.window.height / 2 + display.height / 2
-        self.window.add(display, display_x, display_y)
+        self.renderer.move('message', display_x, display_y)
+        for rule in self.rules:
+            rule.game_over(self, display)
 
     def no_more_blocks(self):
         """
         Boolean to allow the program to complete an action in the
         scenario that the number of blocks == 0.
         """
-        return self.counter == 0
+        return self.state.no_more_blocks()
@@ -0,0 +1,124 @@
+"""
+This program describes a retained-mode render layer for a game
+reminiscent of 'Breakout'. Every visual (the paddle, the ball,
+each brick, the score...) is named by a key and its GObject is
+created once; after that only its position, text or color is
+changed, and only when the new value differs from the old one.
+Hidden objects are kept in a pool and reused by the next visual
+of the same kind and size, so the window's object list doesn't
+grow as the game goes on.
+
+campy is only imported when the first GObject is made, so the game
+logic can be used without it.
+"""
+
+
+class Renderer:
+
+    def __init__(self, window):
+        self.window = window
+        self.shown = {}    # key -> GObject currently in the window
+        self.pool = {}     # (kind, width, height) -> hidden GObjects ready for reuse
+        self.kinds = {}    # GObject -> the (kind, width, height) it was made as
+        self.colors = {}   # key -> fill color last given (campy normalizes the one it stores)
+        self.created = 0   # Number of GObjects created so far
+
+    def get(self, key):
+        """
+        Returns the GObject shown for a key, or None.
+        """
+        return self.shown.get(key)
+
+    def rect(self, key, width, height, x, y, fill_color=None):
+        """
+        Shows a filled GRect for key at (x, y), creating it only
+        if the key isn't shown yet and the pool has none to reuse.
+        """
+        return self.show(key, ('rect', width, height), x, y, fill_color)
+
+    def oval(self, key, width, height, x, y, fill_color=None):
+        """
+        Shows a filled GOval for key at (x, y) (see rect()).
+        """
+        return self.show(key, ('oval', width, height), x, y, fill_color)
+
+    def label(self, key, text, x, y):
+        """
+        Shows a GLabel for key with the given text at (x, y).
+        """
+        obj = self.show(key, ('label', 0, 0), x, y)
+        self.relabel(key, text)
+        return obj
+
+    def show(self, key, kind, x, y, fill_color=None):
+        """
+        Shows the GObject for key at (x, y), reusing the one already
+        shown or a pooled one of the same kind before making a new one.
+        """
+        obj = self.shown.get(key)
+        if obj is None:
+            pooled = self.pool.get(kind)
+            if pooled:
+                obj = pooled.pop()
+            else:
+                obj = self.make(kind)
+            self.shown[key] = obj
+            self.window.add(obj, x, y)
+        else:
+            self.move(key, x, y)
+        if fill_color is not None:
+            self.recolor(key, fill_color)
+        return obj
+
+    def make(self, kind):
+        """
+        Creates a new GObject of the given (kind, width, height).
+        """
+        from campy.graphics.gobjects import GOval, GRect, GLabel
+        name, width, height = kind
+        if name == 'label':
+            obj = GLabel('')
+        elif name == 'oval':
+            obj = GOval(width, height)
+            obj.filled = True
+        else:
+            obj = GRect(width, height)
+            obj.filled = True
+        self.kinds[obj] = kind
+        self.created += 1
+        return obj
+
+    def move(self, key, x, y):
+        """
+        Moves the GObject for key to (x, y) if it isn't there already.
+        """
+        obj = self.shown[key]
+        if obj.x != x or obj.y != y:
+            obj.location = x, y
+
+    def recolor(self, key, fill_color):
+        """
+        Changes the fill color of the GObject for key if needed.
+        """
+        if self.colors.get(key) != fill_color:
+            self.shown[key].fill_color = fill_color
+            self.colors[key] = fill_color
+
+    def relabel(self, key, text):
+        """
+        Changes the text of the GLabel for key if needed.
+        """
+        obj = self.shown[key]
+        if obj.text != text:
+            obj.text = text
+
+    def hide(self, key):
+        """
+        Removes the GObject for key from the window and keeps it
+        in the pool for reuse.
+        """
+        obj = self.shown.pop(key, None)
+        self.colors.pop(key, None)
+        if obj is not None:
+            self.window.remove(obj)
+            self.pool.setdefault(self.kinds[obj], []).append(obj)
@@ -0,0 +1,252 @@
+"""
+This program describes the rules that can be switched on in a game
+reminiscent of 'Breakout' on top of the base game. Each extension
+is one rule:
+
+EXTENSION: Greater Control (CONTROL)
+- This extension gives the user greater control on the movement
+of the ball, allowing them to use the far sides/corners of the
+paddle to allow the ball to bounce back the direction it came
+from (NOTICE the ball will not bounce back the direction it
+came if it's hit anywhere on the same edge of the paddle it's
+coming from; the ball must hit the corner or far vertical/
+horizontal edges of the paddle to better connect the path of
+the ball to real world physics).
+
+- This extension also edited the velocities so that the game
+never has a velocity close to 0.
+
+- This extension also gives the user the ability to move the
+paddle quickly to cause the ball to move faster, similar to
+a baseball bat hitting a ball (signified with a red ball),
+allowing the user to score even more points (This "batted"
+effect can NOT occur while the ball is in a "batted" state,
+meaning the effect does not stack, so the user can only bat
+a ball while the ball is its normal black color).
+
+
+EXTENSION: Improved Interface Display (INTERFACE)
+- This extension allows the user to easily see their lives as
+well as adds a score to keep the player pushing to do better
+in the game to score higher.
+
+- This extension also introduces an intro message
+to inform the user of the rules and goal of the game,
+before signalling them to simply click to begin.
+
+
+EXTENSION: The Kicker (KICKER)
+-This extension adds some intensity to the game, as when the
+user destroys various amounts of bricks within a single life,
+the ball moves faster and faster. If the user is doing really
+well, they'll have to face the "killer kicker", causing the
+ball to move extremely fast but also doubling the points
+given by any color brick.
+
+
+A game is played with a rule set, a tuple of rule names such as
+BASE_RULES or EXTENDED_RULES. Every rule in the set is installed
+once, when the game is made: into the BreakoutState as rules on its
+event bus (see collisionevents.py), and into the BreakoutGraphics
+window for whatever it draws. A rule that isn't in the set is never
+installed, so it costs nothing while the game is played.
+"""
+from collisionevents import BrickHit, PaddleHit, WallHit
+
+CONTROL = 'control'        # EXTENSION (Greater Control)
+INTERFACE = 'interface'    # EXTENSION (Improved Interface Display)
+KICKER = 'kicker'          # EXTENSION (The Kicker)
+BASE_RULES = ()
+EXTENDED_RULES = (CONTROL, INTERFACE, KICKER)
+RULE_SETS = {'base': BASE_RULES, 'extended': EXTENDED_RULES}
+LIFE_SPACING = 5           # Space between the lives shown at the bottom of the window (in pixels).
+LIFE_COLORS = {1: 'red', 2: 'yellow'}   # Lives are shown green, then yellow and red as they run out.
+
+
+class Rule:
+    """
+    A rule that can be switched on in a game. Each method is
+    called once for the game (install() and attach()) or when
+    something happens that isn't part of every frame; a rule
+    only overrides the ones it needs.
+    """
+    name = None
+
+    def install(self, state):
+        """
+        Adds the rule to a BreakoutState (e.g. as rules on its
+        event bus).
+        """
+
+    def attach(self, graphics):
+        """
+        Adds whatever the rule draws to a BreakoutGraphics window.
+        """
+
+    def served(self, graphics):
+        """
+        Called when the user serves a ball.
+        """
+
+    def life_lost(self, graphics):
+        """
+        Called when the player loses a life.
+        """
+
+    def game_over(self, graphics, message):
+        """
+        Called when the game's final message (a GLabel) is shown.
+        """
+
+
+class GreaterControl(Rule):
+    """
+    EXTENSION (Greater Control).
+    The far sides of the paddle and batting (see
+    BreakoutState.hit_paddle()). The window tracks the paddle's
+    speed for batting and draws batted balls red (see
+    BreakoutGraphics).
+    """
+    name = CONTROL
+
+    def install(self, state):
+        state.events.on(PaddleHit, state.hit_paddle)
+        state.events.on(WallHit, state.count_bounce)
+        state.events.on(BrickHit, state.count_brick_bounce)
+
+
+class InterfaceDisplay(Rule):
+    """
+    EXTENSION (Improved Interface Display).
+    The score, the lives left (one green ball for each of the
+    game's lives) and the intro message.
+    """
+    name = INTERFACE
+
+    def install(self, state):
+        state.events.on(BrickHit, state.score_brick)
+
+    def attach(self, graphics):
+        renderer = graphics.renderer
+        window = graphics.window
+        state = graphics.state
+        ball_radius = state.ball_radius
+        self.intro_number = 1
+        self.intro = renderer.label('intro', "Welcome to Breakout! You have " + str(state.lives) +
+                                    " lives, and the higher" +
+                                    "\nthe color of the brick, the more points it's worth. If" +
+                                    "\nyou can break enough bricks in one life the bricks' point" +
+                                    "\nvalue will double, at a cost...Click anywhere to begin!", 0, 0)
+        renderer.move('intro', window.width / 2 - self.intro.width / 8, window.height * 0.7)
+
+        self.score_y = window.height - 1
+        self.score_display = renderer.label('score', 'SCORE: ' + str(state.score), 0, self.score_y)
+        self.score_x = window.width - self.score_display.width - 1
+        renderer.move('score', self.score_x, self.score_y)
+        # The score is redrawn at most once per frame, from the frame's brick hits.
+        self.graphics = graphics
+        state.events.subscribe(self.update_score, BrickHit)
+
+        self.lives = renderer.label('lives', 'LIVES:', 1, window.height - 1)
+
+        self.life_counter = state.lives
+        self.life_x = self.lives.width + ball_radius
+        self.life_y = window.height - 2 * ball_radius - 1
+
+        color = LIFE_COLORS.get(self.life_counter, 'green')
+        for life in range(1, self.life_counter + 1):
+            renderer.oval(('life', life), 2 * ball_radius, 2 * ball_radius, self.life_x, self.life_y, color)
+            self.life_x += ball_radius * 2 + LIFE_SPACING
+
+    def served(self, graphics):
+        """
+        The intro message will be deleted when the user
+        starts the game.
+        """
+        if self.intro_number == 1:
+            self.intro_number -= 1
+            graphics.renderer.hide('intro')
+
+    def life_lost(self, graphics):
+        """
+        Reduces the number of lives shown to the user
+        while changing the color scheme of the lives.
+        """
+        renderer = graphics.renderer
+        self.life_counter -= 1
+        renderer.hide(('life', self.life_counter + 1))
+        if self.life_counter in LIFE_COLORS:
+            for life in range(1, self.life_counter + 1):
+                renderer.recolor(('life', life), LIFE_COLORS[self.life_counter])
+
+    def game_over(self, graphics, message):
+        """
+        Shows the final score under the final message.
+        """
+        renderer = graphics.renderer
+        renderer.hide('score')
+        real_score = renderer.label('final score', 'Your Final Score is: ' + str(graphics.state.score), 0, 0)
+        display_x = graphics.window.width / 2 - real_score.width / 2
+        display_y = message.y + message.height + 5
+        renderer.move('final score', display_x, display_y)
+
+    def update_score(self, hits):
+        """
+        Called once per frame with the frame's brick hits, and
+        updates the score shown to the user if any of them broke
+        a brick.
+        """
+        for hit in hits:
+            if hit.broken:
+                self.add_in_score()
+                return
+
+    def add_in_score(self):
+        """
+        Updates the score based upon the block that was
+        hit.
+        """
+        graphics = self.graphics
+        graphics.renderer.relabel('score', 'SCORE: ' + str(graphics.state.score))
+        self.score_x = graphics.window.width - self.score_display.width - 1
+        graphics.renderer.move('score', self.score_x, self.score_y)
+
+
+class Kicker(Rule):
+    """
+    EXTENSION (The Kicker).
+    Broken bricks count towards the kicker (see
+    BreakoutState.kicker_activator()).
+    """
+    name = KICKER
+
+    def install(self, state):
+        state.events.on(BrickHit, state.count_kick)
+
+
+# Rules are installed in this order, which is the order their rules run in for the same event:
+# a broken brick is scored before it counts towards the kicker and ends a batted ball's speed.
+RULES = (InterfaceDisplay, Kicker, GreaterControl)
+
+
+def make_rules(names):
+    """
+    Returns a new Rule for each rule named in names, in the order
+    they're installed in (unknown names raise a ValueError).
+    """
+    unknown = set(names) - {rule.name for rule in RULES}
+    if unknown:
+        raise ValueError('unknown rules: ' + ', '.join(sorted(unknown)))
+    return [rule() for rule in RULES if rule.name in names]
+
+
+def parse_rules(text):
+    """
+    Returns the rule set named by text: a name from RULE_SETS, or
+    rule names separated by commas (e.g. 'control,kicker').
+    """
+    if text in RULE_SETS:
+        return RULE_SETS[text]
+    names = tuple(name.strip() for name in text.split(',') if name.strip())
+    make_rules(names)
+    return names
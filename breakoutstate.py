@@ -0,0 +1,848 @@
+"""
+This program describes the pure-data state of a game
+reminiscent of 'Breakout'. The ball, paddle and bricks are
+plain rectangles, so the game can be stepped forward without
+a campy GWindow (e.g. on a server with no display), while the
+BreakoutGraphics classes draw this state on top of a window.
+
+The extended rules (Greater Control, Improved Interface Display
+and The Kicker) are switched on by the game's rule set (see
+breakoutrules.py), or all at once with the 'extended' flag.
+
+The game can have any number of balls (e.g. for a multi-ball
+power-up, see add_ball()). Each ball carries its own velocity,
+score and batting and kicker counters. The methods that move or
+bounce "the ball" work on the ball being stepped, so ball, vx, vy,
+bounce_counter and kicker_counter are those of the current ball
+(the first one between steps).
+"""
+import math
+import random
+from brickgrid import BrickGrid
+from brickregistry import BrickRegistry
+from breakoutrules import BASE_RULES, CONTROL, EXTENDED_RULES, make_rules
+from collisionevents import EventBus, BrickHit, PaddleHit, WallHit
+
+BRICK_SPACING = 5      # Space between bricks (in pixels). This space is used for horizontal and vertical spacing.
+BRICK_WIDTH = 40       # Width of a brick (in pixels).
+BRICK_HEIGHT = 15      # Height of a brick (in pixels).
+BRICK_ROWS = 10        # Number of rows of bricks.
+BRICK_COLS = 10        # Number of columns of bricks.
+BRICK_OFFSET = 50      # Vertical offset of the topmost brick from the window top (in pixels).
+BALL_RADIUS = 10       # Radius of the ball (in pixels).
+PADDLE_WIDTH = 75      # Width of the paddle (in pixels).
+PADDLE_HEIGHT = 15     # Height of the paddle (in pixels).
+PADDLE_OFFSET = 50     # Vertical offset of the paddle from the window bottom (in pixels).
+
+INITIAL_Y_SPEED = 5.0  # Initial vertical speed for the ball.
+MAX_X_SPEED = 3.5      # Maximum initial horizontal speed for the ball.
+BATTING_SPEED = 2000   # Paddle speed (in pixels per second, see paddlevelocity.py) needed to "bat" the ball.
+KICKER_NORMAL = 7      # Bricks broken in one life before the normal kicker.
+KICKER_HARD = 14       # Bricks broken in one life before the hard kicker.
+KICKER_KILLER = 50     # Bricks broken in one life before the killer kicker.
+NUM_LIVES = 3          # Number of lives the player starts with.
+MAX_CONTACTS = 8       # Most contacts resolved in one continuous (swept) step.
+
+
+class Box:
+    """
+    A plain rectangle with the same x, y, width and height
+    attributes as a campy GRect/GOval.
+    """
+
+    def __init__(self, width, height, x=0, y=0):
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+
+    def move(self, dx, dy):
+        """
+        Moves the box by the given offsets.
+        """
+        self.x += dx
+        self.y += dy
+
+    def contains(self, x, y):
+        """
+        Returns whether the point (x, y) lies inside the box
+        (edges included, the same as campy's GRect).
+        """
+        return 0 <= x - self.x <= self.width and 0 <= y - self.y <= self.height
+
+
+class Brick(Box):
+    """
+    A brick, which also knows the row and column of the
+    grid cell it was built in.
+    """
+
+    def __init__(self, width, height, x=0, y=0, row=0, col=0):
+        super().__init__(width, height, x=x, y=y)
+        self.row = row
+        self.col = col
+
+
+class Ball(Box):
+    """
+    A ball, which also carries its own velocity and (for the
+    extended rules) its own batting and kicker counters and the
+    points it scored.
+    """
+
+    def __init__(self, radius, x=0, y=0, number=0):
+        super().__init__(2 * radius, 2 * radius, x=x, y=y)
+        self.number = number     # Tells the balls of one game apart (e.g. to draw each one)
+        self.vx = 0
+        self.vy = 0
+        self.bounce_counter = 0
+        self.kicker_counter = 0
+        self.score = 0
+        self.last_hit = -1       # Grid cell of the brick the ball last hit, until it's clear of it (-1 for none)
+
+
+class BreakoutState:
+
+    def __init__(self, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH,
+                 paddle_height=PADDLE_HEIGHT, paddle_offset=PADDLE_OFFSET,
+                 brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS,
+                 brick_width=BRICK_WIDTH, brick_height=BRICK_HEIGHT,
+                 brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING,
+                 lives=NUM_LIVES, extended=False, continuous=False, ball_collisions=False,
+                 initial_y_speed=INITIAL_Y_SPEED, max_x_speed=MAX_X_SPEED, batting_speed=BATTING_SPEED,
+                 kicker_normal=KICKER_NORMAL, kicker_hard=KICKER_HARD, kicker_killer=KICKER_KILLER, rng=None,
+                 level=None, rules=None):
+
+        # A level (see levelfile.py) decides the number of rows and columns of bricks.
+        if level is not None:
+            brick_rows, brick_cols = level.rows, level.cols
+
+        # The size of the playing field (the same as the window's size).
+        self.width = brick_cols * (brick_width + brick_spacing) - brick_spacing
+        self.height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
+
+        self.ball_radius = ball_radius
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.paddle_offset = paddle_offset
+        self.brick_rows = brick_rows
+        self.brick_cols = brick_cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        self.brick_spacing = brick_spacing
+        # The rules switched on (see breakoutrules.py); extended is the same as EXTENDED_RULES.
+        if rules is None:
+            rules = EXTENDED_RULES if extended else BASE_RULES
+        self.rules = tuple(rules)
+        self.extended = set(self.rules) == set(EXTENDED_RULES)
+        self.continuous = continuous
+        self.ball_collisions = ball_collisions
+
+        # Gameplay tuning (see sweep.py).
+        self.initial_y_speed = initial_y_speed
+        self.max_x_speed = max_x_speed
+        self.batting_speed = batting_speed
+        self.kicker_normal = kicker_normal
+        self.kicker_hard = kicker_hard
+        self.kicker_killer = kicker_killer
+
+        # Serves are drawn from rng (a random.Random), or from the random module if there's none.
+        self.random = random if rng is None else rng
+
+        # Create a paddle.
+        paddle_x = self.width / 2 - paddle_width / 2
+        paddle_y = self.height - paddle_offset
+        self.paddle = Box(paddle_width, paddle_height, x=paddle_x, y=paddle_y)
+
+        # Center the ball in the playing field, at rest (more balls can be added with add_ball()).
+        self.balls_made = 0
+        self.balls = [self.make_ball()]
+        self.current = self.balls[0]
+        self.center_ball()
+
+        # Create bricks (row by row, top to bottom), indexed by their grid cell (only where a level has them).
+        self.bricks = BrickGrid(brick_rows, brick_cols, brick_width, brick_height, brick_offset, brick_spacing)
+        for n in range(brick_rows):
+            for i in range(brick_cols):
+                if level is None or level.has_brick(n, i):
+                    self.bricks.add(self.make_brick(n, i))
+
+        # The color, points and hit points of every brick (see brickregistry.py).
+        self.registry = BrickRegistry(brick_rows, brick_cols) if level is None else level.registry()
+
+        self.lives = lives
+
+        # EXTENSION (Greater Control)
+        self.paddle_speed = 0
+
+        # EXTENSION (Improved Interface Display)
+        self.score = 0
+
+        # Collisions are published here (see collisionevents.py), and each rule in the set adds its rules to it.
+        self.events = EventBus()
+        for rule in make_rules(self.rules):
+            rule.install(self)
+
+    @property
+    def ball(self):
+        """
+        The ball being stepped (the first ball between steps).
+        """
+        return self.current
+
+    @property
+    def counter(self):
+        """
+        The number of bricks left (a popcount of the grid's bit
+        masks of standing bricks).
+        """
+        return len(self.bricks)
+
+    @property
+    def vx(self):
+        return self.current.vx
+
+    @vx.setter
+    def vx(self, vx):
+        self.current.vx = vx
+
+    @property
+    def vy(self):
+        return self.current.vy
+
+    @vy.setter
+    def vy(self, vy):
+        self.current.vy = vy
+
+    @property
+    def bounce_counter(self):
+        return self.current.bounce_counter
+
+    @bounce_counter.setter
+    def bounce_counter(self, bounce_counter):
+        self.current.bounce_counter = bounce_counter
+
+    @property
+    def kicker_counter(self):
+        return self.current.kicker_counter
+
+    @kicker_counter.setter
+    def kicker_counter(self, kicker_counter):
+        self.current.kicker_counter = kicker_counter
+
+    def make_ball(self):
+        """
+        Returns a new ball at rest, numbered after the balls made
+        before it.
+        """
+        ball = Ball(self.ball_radius, number=self.balls_made)
+        self.balls_made += 1
+        return ball
+
+    def add_ball(self, vx, vy):
+        """
+        Adds a ball where the current ball is, moving at (vx, vy)
+        (e.g. for a multi-ball power-up), and returns it.
+        """
+        ball = self.make_ball()
+        ball.x = self.ball.x
+        ball.y = self.ball.y
+        ball.vx = vx
+        ball.vy = vy
+        self.balls.append(ball)
+        return ball
+
+    def drop_lost_balls(self):
+        """
+        Removes the balls that left through the bottom of the
+        field while other balls are still in play (the last ball
+        left costs a life instead, see ball_out_of_screen()).
+        """
+        kept = [ball for ball in self.balls if ball.y < self.height]
+        self.balls = kept if kept else self.balls[:1]
+        self.current = self.balls[0]
+
+    def collide_balls(self):
+        """
+        Bounces every pair of touching balls off each other. The
+        balls have equal masses, so they swap the parts of their
+        velocities along the line between their centers. Pairs are
+        found by sweep and prune: once the balls are sorted by x,
+        each one only needs checking against the balls after it
+        that start within one ball's width.
+        """
+        size = 2 * self.ball_radius
+        balls = sorted(self.balls, key=lambda ball: ball.x)
+        for i, a in enumerate(balls):
+            for b in balls[i + 1:]:
+                dx = b.x - a.x
+                if dx > size:
+                    break
+                dy = b.y - a.y
+                distance = dx * dx + dy * dy
+                if distance > size * size or distance == 0:
+                    continue
+                # Only balls moving towards each other bounce (so touching balls don't stick).
+                approach = (b.vx - a.vx) * dx + (b.vy - a.vy) * dy
+                if approach >= 0:
+                    continue
+                k = approach / distance
+                a.vx += k * dx
+                a.vy += k * dy
+                b.vx -= k * dx
+                b.vy -= k * dy
+
+    def make_brick(self, row, col):
+        """
+        Returns a new brick for the grid cell at row, col.
+        """
+        brick_x = col * (self.brick_width + self.brick_spacing)
+        brick_y = self.brick_offset + row * (self.brick_height + self.brick_spacing)
+        return Brick(self.brick_width, self.brick_height, x=brick_x, y=brick_y, row=row, col=col)
+
+    def center_ball(self):
+        """
+        Moves the ball back to the center of the playing field.
+        """
+        self.ball.x = self.width / 2 - self.ball_radius
+        self.ball.y = self.height / 2 - self.ball_radius
+
+    def set_ball_velocity(self):
+        """
+        Set's the ball's new velocity upon being called on.
+
+        EXTENSION HERE (Greater Control).
+        Greater Control never gives the ball a horizontal
+        velocity close to 0.
+        """
+        if CONTROL in self.rules:
+            x_speed = [self.random.uniform(-self.max_x_speed, -1), self.random.uniform(1, self.max_x_speed)]
+            self.vx = self.random.choice(x_speed)
+        else:
+            self.vx = self.random.uniform(-self.max_x_speed, self.max_x_speed)
+        self.vy = self.initial_y_speed
+
+    def paddle_x_for(self, x):
+        """
+        Returns the paddle's x coordinate when its center follows
+        x (Will NOT be outside the playing field).
+        """
+        if x - self.paddle_width / 2 <= 0:
+            return 0
+        elif x + self.paddle_width / 2 > self.width:
+            return self.width - self.paddle_width
+        return x - self.paddle_width / 2
+
+    def move_paddle(self, x):
+        """
+        Moves the paddle so its center follows x (Will NOT move
+        outside the playing field).
+
+        EXTENSION HERE (Greater Control).
+        Whoever moves the paddle also sets paddle_speed (in pixels
+        per second), which is used for batting.
+        """
+        self.paddle.x = self.paddle_x_for(x)
+
+    def move_ball(self, dt=1):
+        """
+        Moves the ball at the set velocity (for dt frames).
+        """
+        ball = self.current
+        ball.move(ball.vx * dt, ball.vy * dt)
+
+    def handle_wall_collisions(self):
+        """
+        Change's the ball's velocity according to which wall
+        it hit (not including the bottom side).
+
+        EXTENSION HERE (Greater Control).
+        The bounce counter decreases by 1 every time the ball
+        bounces off a wall.
+        """
+        ball = self.current
+        # Second Boolean needed to prevent ball sticking to right/left wall after rapid bouncing on side bricks
+        if (ball.x <= 0 and ball.vx < 0) or (ball.x >= self.width - ball.width and ball.vx > 0):
+            ball.vx = -ball.vx
+            self.events.publish(WallHit(ball, 'x'))
+        # Second Boolean needed to prevent ball sticking to top wall after rapid bouncing on top bricks
+        elif ball.y <= 0 and ball.vy < 0:
+            ball.vy = -ball.vy
+            self.events.publish(WallHit(ball, 'y'))
+
+    def object_at(self, x, y):
+        """
+        Returns the paddle or brick at the point (x, y), or None
+        if there is nothing there.
+        """
+        brick = self.bricks.brick_at(x, y)
+        if brick is not None:
+            return brick
+        if self.paddle.contains(x, y):
+            return self.paddle
+        return None
+
+    def object_collision(self):
+        """
+        Returns the first object found at the corners of the
+        ball's bounding box (top left, top right, bottom right,
+        bottom left), or None.
+        """
+        x = self.current.x
+        y = self.current.y
+        size = self.ball_radius * 2
+        for corner_x, corner_y in ((x, y), (x + size, y), (x + size, y + size), (x, y + size)):
+            obj = self.object_at(corner_x, corner_y)
+            if obj is not None:
+                return obj
+        return None
+
+    def handle_object_collision(self):
+        """
+        Uses the object given by object_collision() to bounce
+        the ball off of it, breaking it if it's a brick. Returns
+        the broken brick, or None. A brick that takes several hits
+        is only hit once by one contact: the ball skips the brick it
+        last hit until it's clear of it or moving into it again.
+
+        EXTENSION HERE (Greater Control).
+        The far sides of the paddle send the ball back the way
+        it came, and moving the paddle quickly "bats" the ball.
+
+        EXTENSION HERE (Improved Interface Display).
+        Broken bricks add to the score.
+
+        EXTENSION HERE (The Kicker).
+        Broken bricks count towards the kicker.
+        """
+        obj = self.object_collision()
+        ball = self.current
+        if obj is None:
+            ball.last_hit = -1
+            return None
+        if obj is self.paddle:
+            ball.last_hit = -1
+            if self.vy > 0:
+                self.paddle_bounce()
+            return None
+        cell = obj.row * self.brick_cols + obj.col
+        # Still inside the brick it just bounced off, and moving out of it.
+        if cell == ball.last_hit and (obj.y + obj.height / 2 - ball.y - ball.height / 2) * ball.vy <= 0:
+            return None
+        ball.last_hit = cell
+        self.bounce_ball()
+        if self.hit_brick(obj):
+            return obj
+        return None
+
+    def sweep_ball(self, dt=1):
+        """
+        Moves the ball for dt frames, treating it as a circle swept
+        along its path, so it can never pass through a brick or the
+        paddle however fast it moves. Each contact is resolved in
+        order of time, reflecting the ball on the axis it hit.
+        Returns a list of the bricks broken on the way.
+        """
+        broken = []
+        time_left = dt
+        last = None
+        for n in range(MAX_CONTACTS):
+            dx = self.vx * time_left
+            dy = self.vy * time_left
+            contact = self.first_contact(dx, dy, last)
+            if contact is None:
+                self.ball.move(dx, dy)
+                break
+            t, axis, obj = contact
+            self.ball.move(dx * t, dy * t)
+            time_left -= time_left * t
+            last = obj
+            if obj == 'wall':
+                if axis == 'x':
+                    self.vx = -self.vx
+                else:
+                    self.vy = -self.vy
+                self.events.publish(WallHit(self.current, axis))
+            elif axis == 'x':
+                self.vx = -self.vx
+                if obj is not self.paddle and self.hit_brick(obj):
+                    broken.append(obj)
+            elif obj is self.paddle:
+                self.paddle_bounce()
+            else:
+                self.bounce_ball()
+                if self.hit_brick(obj):
+                    broken.append(obj)
+        return broken
+
+    def first_contact(self, dx, dy, last=None):
+        """
+        Returns (t, axis, obj) for the earliest contact of the ball
+        moving by (dx, dy), where t is the fraction of the move made
+        before the contact, axis is 'x' or 'y' and obj is 'wall',
+        the paddle or a brick. Returns None if there is no contact.
+        """
+        r = self.ball_radius
+        cx = self.ball.x + r
+        cy = self.ball.y + r
+        best = None
+
+        # The left, right and top walls.
+        if dx < 0:
+            best = (max((r - cx) / dx, 0), 'x', 'wall')
+        elif dx > 0:
+            best = (max((self.width - r - cx) / dx, 0), 'x', 'wall')
+        if dy < 0:
+            t = max((r - cy) / dy, 0)
+            if best is None or t < best[0]:
+                best = (t, 'y', 'wall')
+        if best is not None and best[0] > 1:
+            best = None
+
+        # The paddle (only its top stops a falling ball, like object_collision()).
+        if last is not self.paddle:
+            contact = swept_contact(cx, cy, dx, dy, r, self.paddle)
+            if contact is not None and (contact[1] == 'x' or dy > 0):
+                if best is None or contact[0] < best[0]:
+                    best = (contact[0], contact[1], self.paddle)
+
+        # Every brick near the path of the ball.
+        left = min(cx, cx + dx) - r
+        top = min(cy, cy + dy) - r
+        for brick in self.bricks.overlapping(left, top, abs(dx) + 2 * r, abs(dy) + 2 * r):
+            if brick is not last:
+                contact = swept_contact(cx, cy, dx, dy, r, brick)
+                if contact is not None and (best is None or contact[0] < best[0]):
+                    best = (contact[0], contact[1], brick)
+        return best
+
+    def paddle_bounce(self):
+        """
+        Bounces the ball off the top of the paddle (Greater
+        Control changes the bounce in hit_paddle()).
+        """
+        self.bounce_ball()
+        self.events.publish(PaddleHit(self.current))
+
+    def hit_brick(self, brick):
+        """
+        Counts a hit of the ball on a brick, breaking the brick
+        once it has taken as many hits as its hit points (one,
+        unless the registry says otherwise), and publishes the hit.
+        Returns whether the brick broke.
+        """
+        broken = self.registry.hit(brick)
+        if broken:
+            self.break_brick(brick)
+        self.events.publish(BrickHit(self.current, brick, broken))
+        return broken
+
+    def break_brick(self, brick):
+        """
+        Removes a brick hit by the ball from the game (the
+        rules score it, see breakoutrules.py).
+        """
+        self.bricks.remove(brick)
+
+    def score_brick(self, event):
+        """
+        EXTENSION HERE (Improved Interface Display).
+        A rule run for every BrickHit: a broken brick's points
+        are added to the score.
+        """
+        if event.broken:
+            self.score_calculator(event.brick)
+
+    def count_kick(self, event):
+        """
+        EXTENSION HERE (The Kicker).
+        A rule run for every BrickHit: a broken brick counts
+        towards the kicker.
+        """
+        if event.broken:
+            self.kicker_activator()
+
+    def count_bounce(self, event):
+        """
+        EXTENSION HERE (Greater Control).
+        A rule run for every WallHit: a bounce off a wall counts
+        towards the end of a batted ball's faster speed.
+        """
+        self.check_batting_score()
+
+    def count_brick_bounce(self, event):
+        """
+        EXTENSION HERE (Greater Control).
+        A rule run for every BrickHit: breaking a brick counts
+        as a bounce of a batted ball.
+        """
+        if event.broken:
+            self.check_batting_score()
+
+    def hit_paddle(self, event):
+        """
+        EXTENSION HERE (Greater Control).
+        A rule run for every PaddleHit, after the ball bounced
+        off the paddle: it's sent back the way it came if it hit
+        the far side of the paddle, and moving the paddle quickly
+        "bats" it.
+
+        Due to the way the ball's corners are inspected, the
+        length of left_point must be smaller than the length
+        of right_point.
+        """
+        left_point = self.paddle.x + self.ball_radius / 4
+        right_point = self.paddle.x + self.paddle_width - self.ball_radius * 2
+        self.batting_paddle()
+        if self.ball.x < left_point and self.vx > 0:
+            self.vx = -self.vx
+        elif self.ball.x > right_point and self.vx < 0:
+            self.vx = -self.vx
+        else:
+            self.check_batting_score()
+
+    def bounce_ball(self):
+        """
+        Helper function that causes a ball to bounce off of
+        a given object.
+        """
+        self.vy = -self.vy
+
+    def ball_out_of_screen(self):
+        """
+        Returns whether the ball moved through the bottom of
+        the playing field.
+        """
+        return self.ball.y >= self.height
+
+    def lose_life(self):
+        """
+        Takes a life from the player and returns the number
+        of lives left.
+        """
+        self.lives -= 1
+        return self.lives
+
+    def reset_ball(self):
+        """
+        Reset's the ball (and the velocity) back to its original
+        position, allowing the user to manually start the ball's
+        movement once more.
+
+        EXTENSION HERE (The Kicker).
+        The kicker counter will reset upon the ball's reset.
+        """
+        self.balls = self.balls[:1]
+        self.current = self.balls[0]
+        self.center_ball()
+        self.vx = 0
+        self.vy = 0
+        self.kicker_counter = 0
+        self.bounce_counter = 0
+
+    def no_more_blocks(self):
+        """
+        Boolean to allow the program to complete an action in the
+        scenario that the number of blocks == 0 (checked on the
+        grid's bit masks of standing bricks).
+        """
+        return self.bricks.is_empty()
+
+    def snapshot(self):
+        """
+        Returns a copy of everything that changes while the game
+        is played (the ball, velocities, paddle, standing bricks
+        and the hits they've taken, counters and lives), which
+        restore() can go back to.
+        """
+        balls = [(ball.x, ball.y, ball.vx, ball.vy, ball.bounce_counter, ball.kicker_counter, ball.score,
+                  ball.number, ball.last_hit) for ball in self.balls]
+        return {'balls': balls, 'balls_made': self.balls_made,
+                'paddle_x': self.paddle.x, 'paddle_speed': self.paddle_speed,
+                'bricks': self.bricks.masks(), 'lives': self.lives,
+                'score': self.score, 'damage': self.registry.snapshot()}
+
+    def restore(self, snapshot):
+        """
+        Puts the game back the way it was when snapshot() was
+        called (the layout of the game must be the same).
+        """
+        self.balls = []
+        for x, y, vx, vy, bounce_counter, kicker_counter, score, number, last_hit in snapshot['balls']:
+            ball = Ball(self.ball_radius, x=x, y=y, number=number)
+            ball.last_hit = last_hit
+            ball.vx = vx
+            ball.vy = vy
+            ball.bounce_counter = bounce_counter
+            ball.kicker_counter = kicker_counter
+            ball.score = score
+            self.balls.append(ball)
+        self.current = self.balls[0]
+        self.balls_made = snapshot['balls_made']
+        self.paddle.x = snapshot['paddle_x']
+        self.paddle_speed = snapshot['paddle_speed']
+        self.bricks.restore(snapshot['bricks'], self.make_brick)
+        self.lives = snapshot['lives']
+        self.score = snapshot['score']
+        self.registry.restore(snapshot.get('damage', b''))
+
+    def score_calculator(self, brick):
+        """
+        EXTENSION HERE (Improved Interface Display).
+        Adds the points of a broken brick to the score. The
+        points of every brick (set by its color) are looked up
+        in the registry, so any number of rows scores right.
+        """
+        self.color_calculator(self.registry.points_of(brick))
+
+    def color_calculator(self, color):
+        """
+        EXTENSION HERE (Greater Control).
+        The point value for each brick will double
+        while the ball has been "batted".
+
+        EXTENSION HERE (The Kicker).
+        Once the kicker_counter passes kicker_killer (50), each brick
+        will have double its original point value for
+        the duration of that life.
+        """
+        points = color
+        # Used 2 if statements to allow combined "batted" & "killer kicker" ball to score 3x as many points
+        if self.kicker_counter > self.kicker_killer:
+            points += color
+        if self.bounce_counter > 0:
+            points += color
+        self.score += points
+        self.ball.score += points
+
+    def kicker_activator(self):
+        """
+        EXTENSION HERE (The Kicker).
+        Activates the normal kicker when the kicker_counter
+        reaches kicker_normal (7), the hard kicker at kicker_hard
+        (14), and the killer kicker at kicker_killer (50).
+        """
+        self.kicker_counter += 1
+        if self.kicker_counter == self.kicker_normal:
+            self.vx *= 2
+        elif self.kicker_counter == self.kicker_hard:
+            self.vy *= 1.5
+        elif self.kicker_counter == self.kicker_killer:
+            self.vx *= 2
+            self.vy *= 1.75
+
+    def batting_paddle(self):
+        """
+        EXTENSION HERE (Greater Control).
+        Sets the changes and the condition for the ball
+        to move quicker when it's hit by the paddle rapidly
+        (Can only occur if the ball is not in a "batted" state).
+        """
+        if abs(self.paddle_speed) > self.batting_speed and self.bounce_counter == 0:
+            self.vx *= 1.5
+            self.vy *= 1.25
+            self.bounce_counter = 10
+
+    def check_batting_score(self):
+        """
+        EXTENSION HERE (Greater Control).
+        Checks the batting score for every bounce and
+        resets the ball to its previous speed if it
+        has bounced enough times without being hit by
+        the paddle.
+        """
+        if self.bounce_counter > 0:
+            self.bounce_counter -= 1
+            if self.bounce_counter == 0:
+                self.vx /= 1.5
+                self.vy /= 1.25
+
+
+def swept_contact(cx, cy, dx, dy, radius, box):
+    """
+    Returns (t, axis) for the first contact of a circle centered
+    at (cx, cy) moving by (dx, dy) with a box, where t is the
+    fraction of the move made before the contact and axis is the
+    axis ('x' or 'y') to reflect the circle on. Returns None if
+    the circle doesn't reach the box (or already overlaps it).
+    """
+    left = box.x
+    right = box.x + box.width
+    top = box.y
+    bottom = box.y + box.height
+
+    # Enter the box grown by the radius, one axis at a time.
+    t_enter = -math.inf
+    t_exit = math.inf
+    axis = None
+    for p, d, low, high, name in ((cx, dx, left - radius, right + radius, 'x'),
+                                  (cy, dy, top - radius, bottom + radius, 'y')):
+        if d == 0:
+            if p < low or p > high:
+                return None
+            continue
+        t0 = (low - p) / d
+        t1 = (high - p) / d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+            axis = name
+        t_exit = min(t_exit, t1)
+    if axis is None or t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+
+    # Past a corner of the box, the circle has to reach the corner itself.
+    x = cx + dx * max(t_enter, 0)
+    y = cy + dy * max(t_enter, 0)
+    corner_x = left if x < left else right if x > right else None
+    corner_y = top if y < top else bottom if y > bottom else None
+    if corner_x is None or corner_y is None:
+        if t_enter < 0:
+            return None
+        return t_enter, axis
+    fx = cx - corner_x
+    fy = cy - corner_y
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius * radius
+    if c < 0:
+        return None
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    if t < 0 or t > 1:
+        return None
+    nx = fx + dx * t
+    ny = fy + dy * t
+    return t, 'x' if abs(nx) > abs(ny) else 'y'
+
+
+def step(state, dt=1):
+    """
+    Advances the game by dt frames (one by default): moves each ball,
+    then bounces it off the walls and off any paddle or brick it
+    touches. A continuous state sweeps the balls instead, so dt can
+    be larger without a ball skipping over anything. With several
+    balls, they bounce off each other (if ball_collisions is set)
+    and balls lost through the bottom are dropped.
+    Returns a list of the bricks broken during the step.
+    """
+    broken = []
+    for ball in state.balls:
+        state.current = ball
+        if state.continuous:
+            broken += state.sweep_ball(dt)
+        else:
+            state.move_ball(dt)
+            state.handle_wall_collisions()
+            brick = state.handle_object_collision()
+            if brick is not None:
+                broken.append(brick)
+    if len(state.balls) > 1:
+        if state.ball_collisions:
+            state.collide_balls()
+        state.drop_lost_balls()
+    return broken
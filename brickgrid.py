@@ -0,0 +1,136 @@
+"""
+This program describes a uniform grid that indexes the bricks
+of a game reminiscent of 'Breakout' by their row and column.
+Since every brick sits in a fixed cell, finding the brick under
+a point (or every brick under the ball) only takes a couple of
+divisions instead of a scan through every object in the game.
+
+Which bricks are still standing is also kept as one bit mask per
+row (bit col of a row's mask is set while that brick stands). The
+masks are the only record of it: counting the bricks left is a
+popcount of the masks, and copying the state of the whole board
+only copies one integer per row.
+"""
+
+
+class BrickGrid:
+
+    def __init__(self, rows, cols, brick_width, brick_height, brick_offset, brick_spacing):
+        self.rows = rows
+        self.cols = cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        self.x_step = brick_width + brick_spacing
+        self.y_step = brick_height + brick_spacing
+
+        # cells[row][col] holds the brick in that cell, or None once it's broken.
+        self.cells = [[None] * cols for n in range(rows)]
+        self.standing = [0] * rows   # One bit mask of standing bricks per row
+
+    def __len__(self):
+        return sum(mask.bit_count() for mask in self.standing)
+
+    def __iter__(self):
+        """
+        Yields the remaining bricks, row by row from the top.
+        """
+        for row in self.cells:
+            for brick in row:
+                if brick is not None:
+                    yield brick
+
+    def add(self, brick):
+        """
+        Puts a brick in the cell given by its row and col.
+        """
+        self.cells[brick.row][brick.col] = brick
+        self.standing[brick.row] |= 1 << brick.col
+
+    def remove(self, brick):
+        """
+        Empties the cell of a broken brick.
+        """
+        if self.cells[brick.row][brick.col] is brick:
+            self.cells[brick.row][brick.col] = None
+            self.standing[brick.row] &= ~(1 << brick.col)
+
+    def is_empty(self):
+        """
+        Returns whether every brick has been broken (every row's
+        mask is 0).
+        """
+        return not any(self.standing)
+
+    def row_count(self, row):
+        """
+        Returns the number of bricks still standing in a row.
+        """
+        return self.standing[row].bit_count()
+
+    def is_standing(self, row, col):
+        """
+        Returns whether the brick in the cell at row, col is
+        still standing.
+        """
+        return self.standing[row] >> col & 1 == 1
+
+    def masks(self):
+        """
+        Returns a copy of the bit masks of standing bricks (one
+        integer per row).
+        """
+        return list(self.standing)
+
+    def restore(self, masks, make_brick):
+        """
+        Changes the standing bricks to the ones in masks (as given
+        by masks()), using make_brick(row, col) to build any brick
+        that has to stand again. Only the rows that differ are
+        looked at, and only their changed cells are touched.
+        """
+        for row, mask in enumerate(masks):
+            changed = self.standing[row] ^ mask
+            while changed:
+                bit = changed & -changed
+                col = bit.bit_length() - 1
+                if mask & bit:
+                    self.cells[row][col] = make_brick(row, col)
+                else:
+                    self.cells[row][col] = None
+                changed ^= bit
+            self.standing[row] = mask
+
+    def brick_at(self, x, y):
+        """
+        Returns the brick at the point (x, y) (edges included),
+        or None if the point is in a gap or an empty cell.
+        """
+        col = int(x // self.x_step)
+        row = int((y - self.brick_offset) // self.y_step)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            if x - col * self.x_step <= self.brick_width and \
+                    y - self.brick_offset - row * self.y_step <= self.brick_height:
+                return self.cells[row][col]
+        return None
+
+    def overlapping(self, x, y, width, height):
+        """
+        Returns a list of every brick overlapping the box at
+        (x, y) with the given size (edges included).
+        """
+        first_col = max(int(x // self.x_step), 0)
+        last_col = min(int((x + width) // self.x_step), self.cols - 1)
+        first_row = max(int((y - self.brick_offset) // self.y_step), 0)
+        last_row = min(int((y + height - self.brick_offset) // self.y_step), self.rows - 1)
+        found = []
+        for row in range(first_row, last_row + 1):
+            brick_y = self.brick_offset + row * self.y_step
+            if brick_y > y + height or brick_y + self.brick_height < y:
+                continue
+            for col in range(first_col, last_col + 1):
+                brick = self.cells[row][col]
+                if brick is not None and col * self.x_step <= x + width and \
+                        col * self.x_step + self.brick_width >= x:
+                    found.append(brick)
+        return found
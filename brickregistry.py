@@ -0,0 +1,101 @@
+"""
+This program describes a registry of what every brick of a game
+reminiscent of 'Breakout' is like: its color, the points it's worth
+and how many hits it takes to break. The registry is filled once
+when the game is set up, with one small entry per grid cell (kept
+in flat arrays indexed by row * cols + col), so scoring a broken
+brick is a single lookup whatever the layout of the wall.
+
+By default bricks change color every ROWS_PER_COLOR rows (cycling
+through COLORS), are worth the POINTS of their color and break on
+the first hit. set_brick() changes any of these for one brick, e.g.
+for silver bricks that take several hits.
+"""
+from array import array
+
+COLORS = ['RED', 'ORANGE', 'YELLOW', 'GREEN', 'BLUE']
+POINTS = [16, 8, 4, 2, 1]  # Points of a brick of each of the COLORS.
+ROWS_PER_COLOR = 2     # Rows of bricks of each color.
+
+
+class BrickRegistry:
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.palette = list(COLORS)     # Color names; each brick stores an index into this list
+        self.colors = bytearray()
+        self.points = array('I')
+        self.hit_points = bytearray()   # Hits each brick takes to break
+        for row in range(rows):
+            color = row // ROWS_PER_COLOR % len(COLORS)
+            self.colors += bytes([color]) * cols
+            self.points += array('I', [POINTS[color]]) * cols
+        self.hit_points = bytearray([1]) * (rows * cols)
+        self.damage = bytearray(rows * cols)   # Hits each brick has taken
+        self.multi_hit = False
+
+    def load(self, palette, colors, points, hit_points):
+        """
+        Replaces the color (an index into palette), points and hit
+        points of every brick, e.g. with those of a level (see
+        levelfile.py).
+        """
+        self.palette = list(palette)
+        self.colors = bytearray(colors)
+        self.points = array('I', points)
+        self.hit_points = bytearray(hit_points)
+        self.damage = bytearray(self.rows * self.cols)
+        self.multi_hit = any(hits > 1 for hits in self.hit_points)
+
+    def color(self, row, col):
+        """
+        Returns the color name of the brick at row, col.
+        """
+        return self.palette[self.colors[row * self.cols + col]]
+
+    def points_of(self, brick):
+        """
+        Returns the points a brick is worth.
+        """
+        return self.points[brick.row * self.cols + brick.col]
+
+    def set_brick(self, row, col, color=None, points=None, hit_points=None):
+        """
+        Changes the color, points or hit points of the brick at
+        row, col (the ones left as None are kept).
+        """
+        cell = row * self.cols + col
+        if color is not None:
+            if color not in self.palette:
+                self.palette.append(color)
+            self.colors[cell] = self.palette.index(color)
+        if points is not None:
+            self.points[cell] = points
+        if hit_points is not None:
+            self.hit_points[cell] = hit_points
+            if hit_points > 1:
+                self.multi_hit = True
+
+    def hit(self, brick):
+        """
+        Counts a hit on a brick and returns whether that broke it.
+        """
+        cell = brick.row * self.cols + brick.col
+        self.damage[cell] += 1
+        return self.damage[cell] >= self.hit_points[cell]
+
+    def snapshot(self):
+        """
+        Returns a copy of the hits taken by every brick (empty
+        when every brick breaks on its first hit, since a standing
+        brick then can't have taken any).
+        """
+        return bytes(self.damage) if self.multi_hit else b''
+
+    def restore(self, damage):
+        """
+        Puts back the hits taken by every brick, as returned by
+        snapshot().
+        """
+        self.damage = bytearray(damage) if damage else bytearray(self.rows * self.cols)
@@ -0,0 +1,116 @@
+"""
+This program describes how the wall of bricks of a game reminiscent
+of 'Breakout' is drawn through a Renderer. Small walls draw each
+brick as its own GRect. Big walls are drawn as strips instead: each
+row starts out as a single GRect, and a strip is only cut in two
+around a brick when that brick is broken. The number of GObjects
+then grows with the damage done to the wall, not with its size, so
+huge walls are quick to set up and to redraw. Bricks are colored
+as the BrickRegistry says, and a strip never spans two colors.
+"""
+
+STRIP_BRICKS = 400     # Walls with more bricks than this are drawn as strips.
+
+
+def runs(mask):
+    """
+    Yields the (first, last) columns of every run of set bits
+    in mask, from the left.
+    """
+    col = 0
+    while mask:
+        while not mask & 1:
+            mask >>= 1
+            col += 1
+        first = col
+        while mask & 1:
+            mask >>= 1
+            col += 1
+        yield first, col - 1
+
+
+class BrickWall:
+
+    def __init__(self, renderer, grid, registry, strips=None):
+        self.renderer = renderer
+        self.grid = grid
+        self.registry = registry
+        self.strips = grid.rows * grid.cols > STRIP_BRICKS if strips is None else strips
+
+        # row_strips[row] maps the first column of each strip drawn in that row to its last column.
+        self.row_strips = [{} for n in range(grid.rows)]
+        if self.strips:
+            for row, mask in enumerate(grid.standing):
+                for first, last in runs(mask):
+                    for start, end in self.color_runs(row, first, last):
+                        self.draw_strip(row, start, end)
+        else:
+            for brick in grid:
+                self.renderer.rect(('brick', brick.row, brick.col), brick.width, brick.height,
+                                   brick.x, brick.y, registry.color(brick.row, brick.col))
+
+    def color_runs(self, row, first, last):
+        """
+        Yields the (first, last) columns of every run of bricks of
+        the same color in a row, from column first to column last.
+        """
+        colors = self.registry.colors
+        start = row * self.grid.cols
+        for col in range(first + 1, last + 1):
+            if colors[start + col] != colors[start + first]:
+                yield first, col - 1
+                first = col
+        yield first, last
+
+    def draw_strip(self, row, first, last):
+        """
+        Draws the bricks of a row from column first to column last
+        (both included) as one GRect.
+        """
+        grid = self.grid
+        width = (last - first + 1) * grid.x_step - (grid.x_step - grid.brick_width)
+        self.renderer.rect(('strip', row, first), width, grid.brick_height, first * grid.x_step,
+                           grid.brick_offset + row * grid.y_step, self.registry.color(row, first))
+        self.row_strips[row][first] = last
+
+    def strip_of(self, brick):
+        """
+        Returns the (first, last) columns of the strip that draws
+        a brick, or None.
+        """
+        for first, last in self.row_strips[brick.row].items():
+            if first <= brick.col <= last:
+                return first, last
+        return None
+
+    def get(self, brick):
+        """
+        Returns the GObject that draws a brick (its strip, when
+        the wall is drawn as strips), or None.
+        """
+        if not self.strips:
+            return self.renderer.get(('brick', brick.row, brick.col))
+        strip = self.strip_of(brick)
+        if strip is None:
+            return None
+        return self.renderer.get(('strip', brick.row, strip[0]))
+
+    def remove(self, brick):
+        """
+        Stops drawing a broken brick. When the wall is drawn as
+        strips, the brick's strip is replaced by the pieces on
+        either side of it.
+        """
+        if not self.strips:
+            self.renderer.hide(('brick', brick.row, brick.col))
+            return
+        strip = self.strip_of(brick)
+        if strip is None:
+            return
+        first, last = strip
+        self.renderer.hide(('strip', brick.row, first))
+        del self.row_strips[brick.row][first]
+        if first < brick.col:
+            self.draw_strip(brick.row, first, brick.col - 1)
+        if brick.col < last:
+            self.draw_strip(brick.row, brick.col + 1, last)
@@ -0,0 +1,102 @@
+"""
+This program describes the collision events of a game reminiscent
+of 'Breakout' and the bus they're published on. The game publishes
+an event whenever a ball hits a brick, the paddle or a wall, instead
+of calling every rule and display that cares about it.
+
+There are two kinds of subscribers:
+
+    rules        (on()) are called with each event as it happens,
+                 for rules that change the game (the extended
+                 scoring, kicker and batting rules are rules).
+    subscribers  (subscribe()) are called once per frame, from
+                 flush(), with the list of that frame's events, for
+                 things like the HUD that only need to catch up
+                 once however many bricks a fast ball broke.
+
+Events are only kept for flush() while something has subscribed to
+them, so a game with no subscribers doesn't need to flush.
+"""
+
+
+class BrickHit:
+    """
+    A ball hit a brick (broken is whether that broke it).
+    """
+    __slots__ = ('ball', 'brick', 'broken')
+
+    def __init__(self, ball, brick, broken):
+        self.ball = ball
+        self.brick = brick
+        self.broken = broken
+
+
+class PaddleHit:
+    """
+    A ball bounced off the paddle.
+    """
+    __slots__ = ('ball',)
+
+    def __init__(self, ball):
+        self.ball = ball
+
+
+class WallHit:
+    """
+    A ball bounced off a side wall (axis 'x') or the top ('y').
+    """
+    __slots__ = ('ball', 'axis')
+
+    def __init__(self, ball, axis):
+        self.ball = ball
+        self.axis = axis
+
+
+class EventBus:
+
+    def __init__(self):
+        self.rules = {}         # event type -> functions called with each event
+        self.subscribers = []   # (function, event types) called with each frame's events
+        self.kept = set()       # Event types kept for the subscribers
+        self.pending = []       # This frame's events, in the order they happened
+
+    def on(self, event_type, rule):
+        """
+        Calls rule with every event of event_type as soon as it's
+        published.
+        """
+        self.rules.setdefault(event_type, []).append(rule)
+
+    def subscribe(self, subscriber, *event_types):
+        """
+        Calls subscriber once per frame (from flush()) with the list
+        of that frame's events of the given types, if there were any.
+        """
+        self.subscribers.append((subscriber, event_types))
+        self.kept.update(event_types)
+
+    def publish(self, event):
+        """
+        Runs the rules for an event and keeps it for the subscribers.
+        """
+        event_type = type(event)
+        rules = self.rules.get(event_type)
+        if rules is not None:
+            for rule in rules:
+                rule(event)
+        if event_type in self.kept:
+            self.pending.append(event)
+
+    def flush(self):
+        """
+        Hands the frame's events to the subscribers and starts the
+        next frame.
+        """
+        if not self.pending:
+            return
+        events = self.pending
+        self.pending = []
+        for subscriber, event_types in self.subscribers:
+            batch = [event for event in events if isinstance(event, event_types)]
+            if batch:
+                subscriber(batch)
@@ -0,0 +1,168 @@
+"""
+This program describes a profiler for the frames of a game
+reminiscent of 'Breakout'. Each frame is split into phases (input,
+moving the ball, wall and object collisions, HUD updates, drawing
+and pausing) and the time of every phase goes into a log-scale
+histogram, so the p50/p99/max of each phase can be exported as
+JSON or CSV when the game ends. The number of GObjects created in
+each frame is counted as well.
+
+The profiler can be switched on and off at any time with toggle(),
+which the game calls when the user clicks the window's top left
+corner (see breakoutgraphics.py), or with its 'enabled' attribute.
+While it's off the game skips it entirely (a single attribute check
+per frame). Only the frames played while it was on are counted.
+"""
+import math
+import time
+
+PHASES = ['input', 'move_ball', 'wall_collisions', 'object_collision', 'hud', 'render', 'pause']
+BUCKETS_PER_DOUBLING = 8   # Resolution of the histograms (about 9% per bucket).
+
+
+class LatencyHistogram:
+    """
+    A histogram of durations (in nanoseconds) with buckets
+    growing exponentially, so recording is O(1) and the memory
+    used doesn't grow with the number of frames.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, duration):
+        """
+        Adds one duration (in nanoseconds).
+        """
+        bucket = int(math.log2(duration) * BUCKETS_PER_DOUBLING) if duration > 0 else -1
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def percentile(self, p):
+        """
+        Returns the duration (in nanoseconds) below which p percent
+        of the recorded durations fall (to within one bucket).
+        """
+        if self.count == 0:
+            return 0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                if bucket < 0:
+                    return 0
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING), self.max)
+        return self.max
+
+
+class FrameProfiler:
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = {phase: LatencyHistogram() for phase in PHASES}
+        self.frames = 0
+        self.allocations = {}   # GObjects created in a frame -> number of such frames
+        self.last_created = None
+
+    def toggle(self):
+        """
+        Switches the profiler on or off.
+        """
+        self.enabled = not self.enabled
+        self.last_created = None
+
+    def record(self, phase, duration):
+        """
+        Adds the duration (in nanoseconds) of one phase of a frame.
+        """
+        if phase not in self.phases:
+            self.phases[phase] = LatencyHistogram()
+        self.phases[phase].record(duration)
+
+    def end_frame(self, created):
+        """
+        Marks the end of a frame, given the total number of GObjects
+        created so far (the difference from the last frame is the
+        number created during this one).
+        """
+        self.frames += 1
+        if self.last_created is not None:
+            allocated = created - self.last_created
+            self.allocations[allocated] = self.allocations.get(allocated, 0) + 1
+        self.last_created = created
+
+    def timed(self, phase, function):
+        """
+        Returns a version of function that records its duration
+        under phase while the profiler is enabled.
+        """
+        def timed_function(*args):
+            if not self.enabled:
+                return function(*args)
+            start = time.perf_counter_ns()
+            result = function(*args)
+            self.record(phase, time.perf_counter_ns() - start)
+            return result
+        return timed_function
+
+    def summary(self):
+        """
+        Returns a list of dictionaries with the count, total time
+        and p50/p99/max (in microseconds) of every phase, followed
+        by the GObjects created per frame.
+        """
+        rows = []
+        for phase, histogram in self.phases.items():
+            rows.append({'phase': phase, 'count': histogram.count,
+                         'total_ms': round(histogram.total / 1e6, 3),
+                         'p50_us': round(histogram.percentile(50) / 1e3, 3),
+                         'p99_us': round(histogram.percentile(99) / 1e3, 3),
+                         'max_us': round(histogram.max / 1e3, 3)})
+        counted = sum(self.allocations.values())
+        allocated = sorted(self.allocations)
+        rows.append({'phase': 'allocations_per_frame', 'count': counted,
+                     'total': sum(n * frames for n, frames in self.allocations.items()),
+                     'p50': self.allocation_percentile(allocated, counted, 50),
+                     'p99': self.allocation_percentile(allocated, counted, 99),
+                     'max': allocated[-1] if allocated else 0})
+        return rows
+
+    def allocation_percentile(self, allocated, counted, p):
+        """
+        Returns the number of GObjects created per frame that p
+        percent of frames stay at or below.
+        """
+        rank = math.ceil(counted * p / 100)
+        seen = 0
+        for n in allocated:
+            seen += self.allocations[n]
+            if seen >= rank:
+                return n
+        return 0
+
+    def export(self, path):
+        """
+        Writes the summary to path, as JSON if the path ends with
+        '.json' and as CSV otherwise.
+        """
+        rows = self.summary()
+        with open(path, 'w', newline='') as file:
+            # Imported here, as most games never export (and these slow down starting the game).
+            if path.endswith('.json'):
+                import json
+                json.dump({'frames': self.frames, 'phases': rows}, file, indent=2)
+            else:
+                fields = []
+                for row in rows:
+                    fields += [field for field in row if field not in fields]
+                import csv
+                writer = csv.DictWriter(file, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
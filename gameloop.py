@@ -0,0 +1,87 @@
+"""
+This program describes a fixed-timestep loop for running a game
+reminiscent of 'Breakout'. Instead of pausing for a whole frame
+after each frame's work (which makes the game slower whenever the
+machine is busy), the loop measures the real time that has passed
+with a monotonic clock and runs however many fixed-length physics
+frames are owed before drawing once. When drawing falls behind,
+frames are caught up without drawing in between, so the speed of
+the game stays the same on slow or busy machines.
+"""
+import time
+
+MAX_CATCH_UP = 8       # Most physics frames run between two renders before the lost time is dropped.
+
+
+def sleep_ms(milliseconds):
+    """
+    Sleeps for the given number of milliseconds (the same units
+    as campy's pause()).
+    """
+    time.sleep(milliseconds / 1000)
+
+
+class FixedStepLoop:
+
+    def __init__(self, frame_rate, max_catch_up=MAX_CATCH_UP, sleep=sleep_ms, clock=time.perf_counter):
+        # frame_rate is the length of one physics frame in milliseconds (e.g. 1000 / 120).
+        self.frame_rate = frame_rate
+        self.max_catch_up = max_catch_up
+        self.sleep = sleep
+        self.clock = clock
+
+        # Statistics about the last run.
+        self.frames = 0
+        self.renders = 0
+        self.skipped_renders = 0
+        self.dropped_ms = 0.0
+        self.longest_catch_up = 0
+
+    def run(self, update, render=None):
+        """
+        Calls update() once per physics frame until it returns False,
+        and render() (if given) once after each batch of frames (but
+        not after the frame that returned False).
+        """
+        period = self.frame_rate / 1000
+        previous = self.clock()
+        lag = 0.0
+        while True:
+            now = self.clock()
+            lag += now - previous
+            previous = now
+
+            # Run every frame that is owed (up to max_catch_up of them).
+            steps = 0
+            while lag >= period and steps < self.max_catch_up:
+                if not update():
+                    # The frame that ends the game draws its own last screen, so it isn't rendered over.
+                    self.frames += steps + 1
+                    return
+                lag -= period
+                steps += 1
+            self.frames += steps
+
+            # Too far behind to catch up: forget the rest of the lost time.
+            if lag >= period:
+                self.dropped_ms += (lag - lag % period) * 1000
+                lag %= period
+
+            if steps > 0:
+                self.skipped_renders += steps - 1
+                self.longest_catch_up = max(self.longest_catch_up, steps - 1)
+                if render is not None:
+                    render()
+                    self.renders += 1
+
+            # Wait (and let the window handle its events) until the next frame is due.
+            self.sleep((period - lag) * 1000)
+
+    def summary(self):
+        """
+        Returns a line describing how much catching up the last
+        run had to do.
+        """
+        return ('{} frames, {} renders, {} renders skipped to catch up (at most {} in a row), '
+                '{:.1f} ms dropped'.format(self.frames, self.renders, self.skipped_renders,
+                                           self.longest_catch_up, self.dropped_ms))
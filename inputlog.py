@@ -0,0 +1,433 @@
+"""
+This program describes a compact recording of a game of 'Breakout'
+and a replayer for it. A session is stored as the seed of the
+game's random generator (which decides every serve) and, for every
+frame, the pointer's x position and whether the user clicked (a
+game played on a level file also stores the level, compiled, in
+its header, see levelfile.py). Positions are stored as the change
+from the last one, as a zigzag varint packed together with the two
+flags, so most frames take one or two bytes.
+
+A game is only recorded to a file when BREAKOUT_RECORD names one
+(see breakout.py).
+
+The replayer feeds a recording back through a BreakoutState with
+no window and no pause() between frames, as fast as the CPU allows,
+and checks that it ends with the same score, bricks left and lives.
+Keyframes of the whole game are saved next to the recording (see
+keyframeindex.py), so a replay can jump to any frame quickly.
+
+Usage:
+    python inputlog.py session.breakout               # replay a session once
+    python inputlog.py session.breakout --repeat 100  # replay it as a load test
+    python inputlog.py session.breakout --seek 50000  # show the game at frame 50000
+"""
+import os
+import random
+import sys
+import time
+from breakoutrules import CONTROL, INTERFACE, KICKER, EXTENDED_RULES
+from breakoutstate import BreakoutState, step
+from keyframeindex import KeyframeIndex, KEYFRAME_INTERVAL
+from levelfile import Level
+from paddlevelocity import PaddleVelocity, FRAME_NS
+
+MAGIC = b'BRKLOG'
+VERSION = 1
+LAYOUT = ['ball_radius', 'paddle_width', 'paddle_height', 'paddle_offset', 'brick_rows', 'brick_cols',
+          'brick_width', 'brick_height', 'brick_offset', 'brick_spacing']
+MOVED = 1              # Flag bit of a frame in which the pointer moved.
+CLICKED = 2            # Flag bit of a frame in which the user clicked.
+EXTENDED = 1           # Header flag bit of a game played with the extended rules.
+CONTINUOUS = 2         # Header flag bit of a game played with continuous collisions.
+RULE_FLAGS = {CONTROL: 4, INTERFACE: 8, KICKER: 16}   # Header flag bits of the rules of a game without all of them.
+LEVEL = 32             # Header flag bit of a game played on a level (stored after the header).
+KEYFRAMES_SUFFIX = '.keys'   # Added to a recording's path for its keyframes.
+
+
+def write_varint(data, n):
+    """
+    Appends the non-negative integer n to the bytearray data,
+    7 bits per byte (the high bit marks that more bytes follow).
+    """
+    while n > 0x7f:
+        data.append(n & 0x7f | 0x80)
+        n >>= 7
+    data.append(n)
+
+
+def read_varint(data, i):
+    """
+    Returns the integer stored at position i of data and the
+    position just after it.
+    """
+    n = 0
+    shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, i
+        shift += 7
+
+
+def zigzag(n):
+    """
+    Maps a signed integer to a non-negative one (0, -1, 1, -2...
+    become 0, 1, 2, 3...), so small changes either way stay small.
+    """
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def unzigzag(n):
+    """
+    Undoes zigzag().
+    """
+    return n >> 1 if n % 2 == 0 else -(n + 1) // 2
+
+
+def new_seed():
+    """
+    Returns a fresh seed for a game that is being recorded.
+    """
+    return random.SystemRandom().randrange(1 << 32)
+
+
+def apply_input(state, pointer_x, clicked, velocity=None, now=0):
+    """
+    Applies one frame of input to the state: a click serves a
+    ball at rest and the paddle follows pointer_x (None if the
+    mouse didn't move). Returns whether the ball was served.
+
+    EXTENSION HERE (Greater Control).
+    With a PaddleVelocity, the paddle's position is recorded at
+    game time now (in nanoseconds) and its speed is given to the
+    game for batting.
+    """
+    served = clicked and state.vx == 0 and state.vy == 0
+    if served:
+        state.set_ball_velocity()
+    if pointer_x is not None:
+        state.move_paddle(pointer_x)
+        if velocity is not None:
+            velocity.add(state.paddle.x, now)
+    if velocity is not None:
+        state.paddle_speed = velocity.speed(now)
+    return served
+
+
+class HeadlessDriver:
+    """
+    Plays a BreakoutState frame by frame with no window, following
+    the same steps as play_frame() in breakout.py: check() does what
+    happens between two frames and play_frame() applies one frame of
+    input (see apply_input()) and steps the game. With serve set, a
+    ball that's reset after a lost life is served again at once, as
+    if the user clicked.
+
+    EXTENSION HERE (Greater Control).
+    The paddle's speed for batting is measured in game time, the
+    same way as in the window (see paddlevelocity.py).
+    """
+
+    def __init__(self, state, serve=False):
+        self.state = state
+        self.serve = serve
+        self.velocity = PaddleVelocity() if CONTROL in state.rules else None
+        self.frame = 0
+        self.over = False
+
+    def check(self):
+        """
+        Does what happens between two frames: the game is over once
+        it's won, and a ball out of the field costs a life and is
+        reset (or ends the game). Returns whether the game goes on.
+        """
+        state = self.state
+        if state.no_more_blocks():
+            self.over = True
+        elif state.ball_out_of_screen():
+            if state.lose_life() > 0:
+                state.reset_ball()
+                if self.serve:
+                    state.set_ball_velocity()
+            else:
+                self.over = True
+        return not self.over
+
+    def play_frame(self, pointer_x, clicked=False):
+        """
+        Plays one frame with the pointer at pointer_x (None if it
+        didn't move) and returns the bricks broken during it.
+        """
+        self.frame += 1
+        apply_input(self.state, pointer_x, clicked, self.velocity, self.frame * FRAME_NS)
+        return step(self.state)
+
+
+def rule_flags(rules):
+    """
+    Returns the header flag bits of a rule set (EXTENDED for all of
+    the extended rules, as in logs from before rule sets).
+    """
+    if set(rules) == set(EXTENDED_RULES):
+        return EXTENDED
+    flags = 0
+    for name in rules:
+        flags |= RULE_FLAGS[name]
+    return flags
+
+
+def make_keyframe(frame, position, last_x, state, velocity=None):
+    """
+    Returns a keyframe of the game after frame frames, where the
+    next frame's input starts at position in the recorded input
+    (with the pointer last at last_x).
+    """
+    return {'frame': frame, 'position': position, 'last_x': last_x, 'state': state.snapshot(),
+            'random': state.random.getstate(), 'velocity': None if velocity is None else velocity.snapshot()}
+
+
+class InputRecorder:
+    """
+    Records the input of every frame of a game as it's played,
+    with a keyframe every interval frames. A game played on a
+    level (see levelfile.py) is given the level, so the recording
+    replays on the same bricks.
+    """
+
+    def __init__(self, state, seed, velocity=None, interval=KEYFRAME_INTERVAL, level=None):
+        self.state = state
+        self.velocity = velocity
+        self.seed = seed
+        self.level = level
+        self.flags = rule_flags(state.rules) | CONTINUOUS * state.continuous | LEVEL * (level is not None)
+        self.layout = [getattr(state, name) for name in LAYOUT]
+        self.lives = state.lives
+        self.data = bytearray()
+        self.frames = 0
+        self.last_x = 0
+        self.keyframes = KeyframeIndex(state.brick_rows, state.brick_cols, interval)
+
+    def record(self, pointer_x, clicked):
+        """
+        Records one frame of input (before it's applied) and returns
+        the pointer x as recorded (rounded to a whole pixel, or None),
+        which is the one the game should use so a replay matches it
+        exactly.
+        """
+        if self.frames % self.keyframes.interval == 0:
+            self.keyframes.add(make_keyframe(self.frames, len(self.data), self.last_x, self.state, self.velocity))
+        value = CLICKED if clicked else 0
+        if pointer_x is not None:
+            pointer_x = round(pointer_x)
+            value |= MOVED | zigzag(pointer_x - self.last_x) << 2
+            self.last_x = pointer_x
+        write_varint(self.data, value)
+        self.frames += 1
+        return pointer_x
+
+    def save(self, path, state):
+        """
+        Writes the recording to path, along with the score, bricks
+        left and lives the game ended with (and the level, if any),
+        and its keyframes to path + KEYFRAMES_SUFFIX.
+        """
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        for n in [self.flags, self.seed] + self.layout + [self.lives, self.frames,
+                                                          state.score, state.counter, state.lives]:
+            write_varint(header, n)
+        if self.level is not None:
+            level = self.level.to_bytes()
+            write_varint(header, len(level))
+            header += level
+        with open(path, 'wb') as file:
+            file.write(header)
+            file.write(self.data)
+        self.keyframes.save(path + KEYFRAMES_SUFFIX)
+
+
+class InputLog:
+    """
+    A recording read back from a file (see InputRecorder).
+    """
+
+    def __init__(self, data):
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+            raise ValueError('not a Breakout input log (version ' + str(VERSION) + ')')
+        i = len(MAGIC) + 1
+        header = []
+        for n in range(len(LAYOUT) + 7):
+            value, i = read_varint(data, i)
+            header.append(value)
+        self.flags, self.seed = header[:2]
+        self.layout = dict(zip(LAYOUT, header[2:-5]))
+        self.lives, self.frames, self.score, self.counter, self.lives_left = header[-5:]
+        self.level = None
+        if self.flags & LEVEL:
+            size, i = read_varint(data, i)
+            self.level = Level.from_bytes(data[i:i + size])
+            if self.level is None:
+                raise ValueError('the level stored in the input log is damaged')
+            i += size
+        self.data = data
+        self.start = i
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads the recording saved at path.
+        """
+        with open(path, 'rb') as file:
+            return cls(file.read())
+
+    def new_state(self):
+        """
+        Returns a new BreakoutState set up like the recorded game
+        (on the recorded level, if there is one), whose serves come
+        from a generator seeded with the recorded seed.
+        """
+        return BreakoutState(lives=self.lives, rules=self.rules(), level=self.level, rng=random.Random(self.seed),
+                             continuous=bool(self.flags & CONTINUOUS), **self.layout)
+
+    def rules(self):
+        """
+        Returns the rule set of the recorded game.
+        """
+        if self.flags & EXTENDED:
+            return EXTENDED_RULES
+        return tuple(name for name in EXTENDED_RULES if self.flags & RULE_FLAGS[name])
+
+    def grid_size(self):
+        """
+        Returns the number of brick rows and cols of the recorded game.
+        """
+        return self.layout['brick_rows'], self.layout['brick_cols']
+
+
+class Replayer(HeadlessDriver):
+    """
+    Plays a recording back with no window and no pausing between
+    frames (see HeadlessDriver). A replayer can be stopped at any
+    frame, and restored from a keyframe.
+    """
+
+    def __init__(self, log):
+        super().__init__(log.new_state())
+        self.log = log
+        self.position = log.start   # Where the next frame's input starts in the log
+        self.last_x = 0
+        self.check()
+
+    def play(self, until=None):
+        """
+        Plays frames until frame until (or until the game or the
+        recording is over) and returns the BreakoutState.
+        """
+        data = self.log.data
+        while not self.over and (until is None or self.frame < until):
+            if self.position >= len(data):
+                self.over = True
+                break
+            value, self.position = read_varint(data, self.position)
+            pointer_x = None
+            if value & MOVED:
+                self.last_x += unzigzag(value >> 2)
+                pointer_x = self.last_x
+            self.play_frame(pointer_x, value & CLICKED)
+            self.check()
+        return self.state
+
+    def keyframe(self):
+        """
+        Returns a keyframe of the game at the current frame.
+        """
+        return make_keyframe(self.frame, self.position - self.log.start, self.last_x, self.state, self.velocity)
+
+    def restore(self, keyframe):
+        """
+        Jumps to the frame of a keyframe from the same recording.
+        """
+        self.frame = keyframe['frame']
+        self.position = self.log.start + keyframe['position']
+        self.last_x = keyframe['last_x']
+        self.state.restore(keyframe['state'])
+        self.state.random.setstate(keyframe['random'])
+        if self.velocity is not None:
+            self.velocity.restore(keyframe['velocity'])
+        self.over = False
+        self.check()
+
+
+def replay(log):
+    """
+    Plays a whole recording back and returns the final BreakoutState.
+    """
+    return Replayer(log).play()
+
+
+def build_keyframes(log, interval=KEYFRAME_INTERVAL):
+    """
+    Returns a KeyframeIndex for a recording by replaying it (for
+    recordings whose keyframes are missing).
+    """
+    replayer = Replayer(log)
+    keyframes = KeyframeIndex(*log.grid_size(), interval)
+    while not replayer.over:
+        keyframes.add(replayer.keyframe())
+        replayer.play(replayer.frame + interval)
+        if replayer.frame % interval != 0:
+            break
+    return keyframes
+
+
+def seek(log, keyframes, frame):
+    """
+    Returns a Replayer stopped at frame, restored from the nearest
+    keyframe before it so only the frames after the keyframe are
+    played.
+    """
+    replayer = Replayer(log)
+    keyframe = keyframes.nearest(frame)
+    if keyframe is not None:
+        replayer.restore(keyframe)
+    replayer.play(frame)
+    return replayer
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Replay a recorded game of Breakout without a window.')
+    parser.add_argument('path', help='recorded session')
+    parser.add_argument('--repeat', type=int, default=1, help='number of times to replay it (default: %(default)s)')
+    parser.add_argument('--seek', type=int, help='only show the game at this frame')
+    args = parser.parse_args()
+
+    log = InputLog.load(args.path)
+    print('Recorded {} frames in {} bytes: score {}, {} bricks left, {} lives'.format(
+        log.frames, len(log.data) - log.start, log.score, log.counter, log.lives_left))
+    if args.seek is not None:
+        keys_path = args.path + KEYFRAMES_SUFFIX
+        keyframes = KeyframeIndex.load(keys_path) if os.path.exists(keys_path) else build_keyframes(log)
+        start = time.perf_counter()
+        replayer = seek(log, keyframes, args.seek)
+        state = replayer.state
+        print('Frame {} ({:.1f} ms): ball at ({:.1f}, {:.1f}) moving ({:.2f}, {:.2f}), score {}, {} bricks left, '
+              '{} lives'.format(replayer.frame, (time.perf_counter() - start) * 1000, state.ball.x, state.ball.y,
+                                state.vx, state.vy, state.score, state.counter, state.lives))
+        return
+    start = time.perf_counter()
+    for n in range(args.repeat):
+        state = replay(log)
+    seconds = time.perf_counter() - start
+    print('Replayed: score {}, {} bricks left, {} lives ({:.0f} frames per second)'.format(
+        state.score, state.counter, state.lives, log.frames * args.repeat / seconds))
+    if (state.score, state.counter, state.lives) != (log.score, log.counter, log.lives_left):
+        print('The replay does not match the recording!')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
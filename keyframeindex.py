@@ -0,0 +1,166 @@
+"""
+This program describes the keyframes saved alongside a recorded
+game of 'Breakout' (see inputlog.py). A keyframe is a full snapshot
+of the game every KEYFRAME_INTERVAL frames: every ball with its
+velocity, score, kicker and bounce counters and the brick it last
+hit, the paddle, standing bricks and the hits they've taken, score,
+lives, the game's random generator and the paddle's speed samples, along with
+where the next frame's input starts in the log.
+
+The file starts with a table of where each keyframe is stored, so
+seeking to any frame only decodes the keyframe just before it and
+plays the (at most KEYFRAME_INTERVAL) frames after it, however long
+the game was.
+"""
+import struct
+
+MAGIC = b'BRKKEY'
+VERSION = 5
+KEYFRAME_INTERVAL = 3600   # Frames between keyframes (30 seconds at 120 frames per second).
+
+HEADER = struct.Struct('<4q')     # interval, brick rows, brick cols, number of keyframes
+POSITION = struct.Struct('<3q')   # frame, input log position, last pointer x
+STATE = struct.Struct('<2d4q')    # paddle x and speed, lives, score, balls made and number of balls
+BALL = struct.Struct('<4d5q')     # x, y, vx, vy, bounce and kicker counters, score, number and last brick hit of a ball
+RANDOM = struct.Struct('<i625I?d')  # the random generator's version, Mersenne Twister state and gauss_next
+DAMAGE = struct.Struct('<q')      # number of bytes of hits taken by bricks (0 if every brick breaks in one hit)
+SAMPLES = struct.Struct('<?3q')   # whether there are paddle speed samples, how many, count and newest
+
+
+def pack_keyframe(keyframe, cols):
+    """
+    Returns the bytes of a keyframe (a dictionary like the one made
+    by inputlog.make_keyframe()) for a game with cols brick columns.
+    """
+    state = keyframe['state']
+    data = bytearray(POSITION.pack(keyframe['frame'], keyframe['position'], keyframe['last_x']))
+    data += STATE.pack(state['paddle_x'], state['paddle_speed'], state['lives'],
+                       state['score'], state['balls_made'], len(state['balls']))
+    for ball in state['balls']:
+        data += BALL.pack(*ball)
+    row_bytes = (cols + 7) // 8
+    for mask in state['bricks']:
+        data += mask.to_bytes(row_bytes, 'little')
+    data += DAMAGE.pack(len(state['damage'])) + state['damage']
+    version, internal, gauss_next = keyframe['random']
+    data += RANDOM.pack(version, *internal, gauss_next is not None, gauss_next or 0.0)
+    velocity = keyframe['velocity']
+    if velocity is None:
+        data += SAMPLES.pack(False, 0, 0, 0)
+    else:
+        times, positions, count, newest = velocity
+        data += SAMPLES.pack(True, len(times), count, newest)
+        data += struct.pack('<{}q{}d'.format(len(times), len(positions)), *times, *positions)
+    return bytes(data)
+
+
+def unpack_keyframe(data, rows, cols):
+    """
+    Returns the keyframe stored in data (see pack_keyframe()).
+    """
+    frame, position, last_x = POSITION.unpack_from(data, 0)
+    i = POSITION.size
+    paddle_x, paddle_speed, lives, score, balls_made, count = STATE.unpack_from(data, i)
+    i += STATE.size
+    balls = []
+    for n in range(count):
+        balls.append(BALL.unpack_from(data, i))
+        i += BALL.size
+    row_bytes = (cols + 7) // 8
+    bricks = []
+    for row in range(rows):
+        bricks.append(int.from_bytes(data[i:i + row_bytes], 'little'))
+        i += row_bytes
+    size, = DAMAGE.unpack_from(data, i)
+    i += DAMAGE.size
+    damage = bytes(data[i:i + size])
+    i += size
+    state = {'balls': balls, 'balls_made': balls_made, 'paddle_x': paddle_x, 'paddle_speed': paddle_speed,
+             'bricks': bricks, 'lives': lives, 'score': score,
+             'damage': damage}
+    values = RANDOM.unpack_from(data, i)
+    i += RANDOM.size
+    gauss_next = values[-1] if values[-2] else None
+    random_state = (values[0], tuple(values[1:-2]), gauss_next)
+    has_samples, samples, count, newest = SAMPLES.unpack_from(data, i)
+    i += SAMPLES.size
+    velocity = None
+    if has_samples:
+        values = struct.unpack_from('<{}q{}d'.format(samples, samples), data, i)
+        velocity = (list(values[:samples]), list(values[samples:]), count, newest)
+    return {'frame': frame, 'position': position, 'last_x': last_x, 'state': state,
+            'random': random_state, 'velocity': velocity}
+
+
+class KeyframeIndex:
+    """
+    The keyframes of one recorded game, taken every interval
+    frames (keyframe n is the game after n * interval frames).
+    """
+
+    def __init__(self, rows, cols, interval=KEYFRAME_INTERVAL):
+        self.rows = rows
+        self.cols = cols
+        self.interval = interval
+        self.records = []   # Packed keyframes, only unpacked when they're needed
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, keyframe):
+        """
+        Adds the next keyframe.
+        """
+        self.records.append(pack_keyframe(keyframe, self.cols))
+
+    def keyframe(self, n):
+        """
+        Returns keyframe n.
+        """
+        return unpack_keyframe(self.records[n], self.rows, self.cols)
+
+    def nearest(self, frame):
+        """
+        Returns the last keyframe at or before frame (found without
+        a search, since keyframes are evenly spaced), or None if
+        there are no keyframes.
+        """
+        if not self.records:
+            return None
+        return self.keyframe(min(frame // self.interval, len(self.records) - 1))
+
+    def save(self, path):
+        """
+        Writes the keyframes to path, after a table of where each
+        one starts.
+        """
+        offsets = []
+        offset = len(MAGIC) + 1 + HEADER.size + 8 * len(self.records)
+        for record in self.records:
+            offsets.append(offset)
+            offset += len(record)
+        with open(path, 'wb') as file:
+            file.write(MAGIC + bytes([VERSION]))
+            file.write(HEADER.pack(self.interval, self.rows, self.cols, len(self.records)))
+            file.write(struct.pack('<{}q'.format(len(offsets)), *offsets))
+            for record in self.records:
+                file.write(record)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads the keyframes saved at path (each one is only
+        decoded when it's asked for).
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+            raise ValueError('not a Breakout keyframe index (version ' + str(VERSION) + ')')
+        i = len(MAGIC) + 1
+        interval, rows, cols, count = HEADER.unpack_from(data, i)
+        i += HEADER.size
+        offsets = list(struct.unpack_from('<{}q'.format(count), data, i)) + [len(data)]
+        index = cls(rows, cols, interval)
+        view = memoryview(data)
+        index.records = [view[offsets[n]:offsets[n + 1]] for n in range(count)]
+        return index
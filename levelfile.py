@@ -0,0 +1,276 @@
+"""
+This program describes level files for a game reminiscent of
+'Breakout': custom walls of bricks with holes, colors, point values
+and bricks that take several hits. A level is written as text, one
+line per row of bricks and one character per brick:
+
+    # A wall with a silver middle row and a hole in it.
+    R R R R R R
+    S S . . S S
+    B B B B B B
+
+'.', '-' and spaces are holes and '#' starts a comment, except that
+a row with a space after every brick (like the ones above) is read
+without those spaces. Each row is read on its own, so the two ways
+of writing rows can be mixed. The characters of DEFAULT_LEGEND (the
+first letter of each of the default colors, and S for silver) can be
+changed, or new ones added, with legend lines:
+
+    X = PURPLE 25 3     # color, points and (optionally) hit points
+
+A level can also be JSON, with the same rows and legend:
+
+    {"legend": {"X": {"color": "PURPLE", "points": 25, "hits": 3}},
+     "rows": ["RRRRRR", "SS..SS", "BBBBBB"]}
+
+Parsing a big level takes a while, so load_level() compiles it to a
+binary cache next to it (the path plus CACHE_SUFFIX) the first time,
+and after that reads the cache instead, as long as the
+SHA-256 of the level it was compiled from still matches.
+
+Usage:
+    python levelfile.py level.txt                     # load a level (compiling it if needed) and time it
+    python levelfile.py --generate 300x334 big.txt    # write a random level, e.g. to time a 100k brick one
+"""
+import hashlib
+import json
+import struct
+import time
+from array import array
+from brickregistry import BrickRegistry, COLORS, POINTS
+
+HOLES = '.- '
+DEFAULT_LEGEND = {color[0]: (color, points, 1) for color, points in zip(COLORS, POINTS)}
+DEFAULT_LEGEND['S'] = ('SILVER', 50, 2)
+CACHE_SUFFIX = '.cache'
+MAGIC = b'BRKLVL'
+VERSION = 1
+HEADER = struct.Struct('<32s3q')  # SHA-256 of the source, rows, cols, number of palette colors
+
+
+class Level:
+    """
+    A parsed level: which cells have a brick (a bit mask per row,
+    like a BrickGrid's) and the color, points and hit points of
+    every cell (flat, indexed by row * cols + col, like a
+    BrickRegistry's).
+    """
+
+    def __init__(self, rows, cols, masks, palette, colors, points, hit_points):
+        self.rows = rows
+        self.cols = cols
+        self.masks = masks
+        self.palette = palette
+        self.colors = colors
+        self.points = points
+        self.hit_points = hit_points
+
+    def count(self):
+        """
+        Returns the number of bricks in the level.
+        """
+        return sum(mask.bit_count() for mask in self.masks)
+
+    def has_brick(self, row, col):
+        """
+        Returns whether the level has a brick at row, col.
+        """
+        return self.masks[row] >> col & 1 == 1
+
+    def registry(self):
+        """
+        Returns a BrickRegistry with the level's colors, points
+        and hit points.
+        """
+        registry = BrickRegistry(self.rows, self.cols)
+        registry.load(self.palette, self.colors, self.points, self.hit_points)
+        return registry
+
+    @classmethod
+    def parse(cls, rows, legend=None):
+        """
+        Returns the level drawn by rows (a list of strings, one
+        character per brick) with the characters of legend (a
+        dictionary of char -> (color, points, hits)) added to or
+        replacing DEFAULT_LEGEND.
+        """
+        legend = dict(DEFAULT_LEGEND, **(legend or {}))
+        # A row written with a space between bricks has its spaces dropped.
+        rows = [row[::2] if len(row) > 1 and row[1::2].strip() == '' else row for row in rows]
+        cols = max((len(row) for row in rows), default=0)
+        palette = []
+        kinds = {}     # char -> (color index, points, hits)
+        for char, (color, points, hits) in legend.items():
+            if color not in palette:
+                palette.append(color)
+            kinds[char] = (palette.index(color), points, hits)
+
+        masks = []
+        colors = bytearray(len(rows) * cols)
+        points = array('I', bytes(4 * len(rows) * cols))
+        hit_points = bytearray(len(rows) * cols)
+        for r, line in enumerate(rows):
+            mask = 0
+            for c, char in enumerate(line):
+                if char in HOLES:
+                    continue
+                kind = kinds.get(char)
+                if kind is None:
+                    raise ValueError('row {}, column {}: {!r} is not in the legend'.format(r + 1, c + 1, char))
+                cell = r * cols + c
+                colors[cell], points[cell], hit_points[cell] = kind
+                mask |= 1 << c
+            masks.append(mask)
+        return cls(len(rows), cols, masks, palette, colors, points, hit_points)
+
+    @classmethod
+    def parse_text(cls, text):
+        """
+        Returns the level written in text (see the top of this file).
+        """
+        rows = []
+        legend = {}
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].rstrip()
+            if '=' in line:
+                char, _, kind = line.partition('=')
+                values = kind.split()
+                legend[char.strip()] = (values[0], int(values[1]), int(values[2]) if len(values) > 2 else 1)
+            elif line.strip():
+                rows.append(line)
+        return cls.parse(rows, legend)
+
+    @classmethod
+    def parse_json(cls, text):
+        """
+        Returns the level written in JSON text.
+        """
+        data = json.loads(text)
+        legend = {char: (kind['color'], kind['points'], kind.get('hits', 1))
+                  for char, kind in data.get('legend', {}).items()}
+        return cls.parse(data['rows'], legend)
+
+    def to_bytes(self, digest=bytes(32)):
+        """
+        Returns the compiled level, for the level source whose
+        SHA-256 is digest (none, e.g. for a level stored in an input
+        log, see inputlog.py).
+        """
+        data = bytearray(MAGIC + bytes([VERSION]))
+        data += HEADER.pack(digest, self.rows, self.cols, len(self.palette))
+        for color in self.palette:
+            name = color.encode()
+            data += bytes([len(name)]) + name
+        row_bytes = (self.cols + 7) // 8
+        for mask in self.masks:
+            data += mask.to_bytes(row_bytes, 'little')
+        data += self.colors
+        data += self.hit_points
+        data += self.points.tobytes()
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, digest=None):
+        """
+        Returns the level compiled in data (bytes or any other
+        buffer), or None if it isn't a compiled level or it was
+        compiled from a source whose SHA-256 isn't digest.
+        """
+        start = len(MAGIC) + 1
+        if len(data) < start + HEADER.size or bytes(data[:len(MAGIC)]) != MAGIC or data[len(MAGIC)] != VERSION:
+            return None
+        source, rows, cols, colors = HEADER.unpack_from(data, start)
+        if digest is not None and source != digest:
+            return None
+        i = start + HEADER.size
+        palette = []
+        for n in range(colors):
+            size = data[i]
+            palette.append(bytes(data[i + 1:i + 1 + size]).decode())
+            i += 1 + size
+        row_bytes = (cols + 7) // 8
+        masks = [int.from_bytes(data[i + r * row_bytes:i + (r + 1) * row_bytes], 'little') for r in range(rows)]
+        i += rows * row_bytes
+        cells = rows * cols
+        color_index = bytearray(data[i:i + cells])
+        hit_points = bytearray(data[i + cells:i + 2 * cells])
+        points = array('I')
+        points.frombytes(data[i + 2 * cells:i + 6 * cells])
+        return cls(rows, cols, masks, palette, color_index, points, hit_points)
+
+
+def read_cache(path, digest):
+    """
+    Returns the level compiled at path for the source with SHA-256
+    digest, or None if there's no such cache.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return Level.from_bytes(file.read(), digest)
+    except (OSError, ValueError):
+        return None
+
+
+def load_level(path, cache=True):
+    """
+    Returns the level in the text or JSON (.json) file at path,
+    from its compiled cache when it's up to date. Otherwise the
+    level is parsed and (if cache is set) compiled for next time.
+    """
+    with open(path, 'rb') as file:
+        source = file.read()
+    digest = hashlib.sha256(source).digest()
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        level = read_cache(cache_path, digest)
+        if level is not None:
+            return level
+    text = source.decode()
+    level = Level.parse_json(text) if path.endswith('.json') else Level.parse_text(text)
+    if cache:
+        try:
+            with open(cache_path, 'wb') as file:
+                file.write(level.to_bytes(digest))
+        except OSError:
+            pass   # e.g. a read-only directory; the level is parsed again next time.
+    return level
+
+
+def generate(rows, cols, path, seed=0):
+    """
+    Writes a random level of rows x cols cells to path, with holes
+    and every kind of brick in DEFAULT_LEGEND.
+    """
+    import random
+    rng = random.Random(seed)
+    chars = list(DEFAULT_LEGEND) + ['.']
+    with open(path, 'w') as file:
+        for row in range(rows):
+            file.write(''.join(rng.choice(chars) for col in range(cols)) + '\n')
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Load (and compile) a Breakout level, or make a random one.')
+    parser.add_argument('path', help='level file (.txt or .json)')
+    parser.add_argument('--generate', metavar='ROWSxCOLS', help='write a random level of this size to path first')
+    args = parser.parse_args()
+    if args.generate:
+        rows, cols = (int(n) for n in args.generate.split('x'))
+        generate(rows, cols, args.path)
+
+    with open(args.path) as file:
+        text = file.read()
+    start = time.perf_counter()
+    level = Level.parse_json(text) if args.path.endswith('.json') else Level.parse_text(text)
+    parsed = time.perf_counter() - start
+    load_level(args.path)
+    start = time.perf_counter()
+    load_level(args.path)
+    cached = time.perf_counter() - start
+    print('{}x{} level with {} bricks: parsed in {:.1f} ms, loaded from its cache in {:.1f} ms'.format(
+        level.rows, level.cols, level.count(), parsed * 1000, cached * 1000))
+
+
+if __name__ == '__main__':
+    main()
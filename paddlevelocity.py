@@ -0,0 +1,91 @@
+"""
+This program describes a small ring buffer of timestamped paddle
+positions, used to tell how fast the user is moving the paddle
+(for the "batting" mechanic of the extended game). Each frame in
+which the paddle moved stores one sample in a fixed-size buffer, and
+the speed is the distance the paddle covered over a short time
+window divided by the window's length, so it's smooth and costs the
+same however often the mouse reports its position.
+
+Samples are timestamped in game time (the frame number times
+FRAME_NS) rather than wall-clock time, so a recorded game measures
+the same speeds when it's replayed (see inputlog.py).
+"""
+import time
+
+SAMPLES = 16           # Number of paddle positions kept.
+WINDOW_MS = 100        # Only positions from the last WINDOW_MS milliseconds are used for the speed.
+FRAME_NS = 1000000000 // 120   # Game time of one frame (at 120 frames per second) in nanoseconds.
+
+
+class PaddleVelocity:
+
+    def __init__(self, samples=SAMPLES, window_ms=WINDOW_MS):
+        self.samples = samples
+        self.window_ns = int(window_ms * 1000000)
+        self.times = [0] * samples
+        self.positions = [0.0] * samples
+        self.count = 0
+        self.newest = samples - 1
+
+    def add(self, x, now=None):
+        """
+        Records the paddle's x position at time now (in
+        nanoseconds, perf_counter_ns() by default).
+        """
+        if now is None:
+            now = time.perf_counter_ns()
+        self.newest = (self.newest + 1) % self.samples
+        self.times[self.newest] = now
+        self.positions[self.newest] = x
+        if self.count < self.samples:
+            self.count += 1
+
+    def speed(self, now=None):
+        """
+        Returns the paddle's average speed (in pixels per second,
+        negative to the left) over the window ending at now (the
+        newest sample by default): how far it moved since the
+        window started, over the window's length (or over the time
+        since the first sample, if that's shorter). A paddle that
+        stopped sending positions slows down to 0 as now moves on.
+        """
+        if self.count == 0:
+            return 0.0
+        end = self.times[self.newest]
+        if now is not None and now > end:
+            end = now
+
+        # The paddle stays where a sample put it until the next one, so the newest sample from before the
+        # window is where the paddle was when the window started (skip the older ones, at most 'samples').
+        oldest = (self.newest - self.count + 1) % self.samples
+        while oldest != self.newest:
+            following = (oldest + 1) % self.samples
+            if end - self.times[following] < self.window_ns:
+                break
+            oldest = following
+        elapsed = min(end - self.times[oldest], self.window_ns)
+        if elapsed <= 0:
+            return 0.0
+        return (self.positions[self.newest] - self.positions[oldest]) * 1000000000 / elapsed
+
+    def snapshot(self):
+        """
+        Returns a copy of the recorded positions, which restore()
+        can go back to.
+        """
+        return list(self.times), list(self.positions), self.count, self.newest
+
+    def restore(self, snapshot):
+        """
+        Puts back the positions recorded when snapshot() was called.
+        """
+        times, positions, self.count, self.newest = snapshot
+        self.times = list(times)
+        self.positions = list(positions)
+
+    def clear(self):
+        """
+        Forgets every recorded position.
+        """
+        self.count = 0
@@ -0,0 +1,293 @@
+"""
+This program describes a software renderer for a game reminiscent
+of 'Breakout' that draws a BreakoutState into a NumPy array instead
+of a campy window, for pixel-based agents, thumbnails and video on
+machines with no display. The frame is a height x width x 3 uint8
+array (RGB) of the same size as the BreakoutGraphics window, drawn
+the same way: black paddle, black balls (red while batted, with
+Greater Control), bricks in their colors and, with Improved
+Interface Display, the score and lives at the bottom.
+
+The bricks and the score and lives are kept in a cached background.
+A brick is only cleared from it when it breaks, and the score and
+lives only redrawn when they change, so each frame only puts back
+the background under the paddle and balls of the last frame and
+draws them where they are now.
+
+Usage:
+    python rasterizer.py                              # frames per second of an autopiloted game
+    python rasterizer.py --size 20x20 --save last.ppm  # also save the last frame as an image
+    python rasterizer.py --video game.rgb             # save every frame (raw RGB, e.g. for ffmpeg)
+"""
+import random
+import time
+import numpy as np
+from breakoutrules import INTERFACE, LIFE_COLORS, LIFE_SPACING
+from breakoutstate import BreakoutState
+
+# RGB of the color names used by the game (the same as Tk's).
+RGB = {'WHITE': (255, 255, 255), 'BLACK': (0, 0, 0), 'RED': (255, 0, 0), 'ORANGE': (255, 165, 0),
+       'YELLOW': (255, 255, 0), 'GREEN': (0, 255, 0), 'BLUE': (0, 0, 255), 'SILVER': (192, 192, 192)}
+UNKNOWN_RGB = (128, 128, 128)   # For color names not in RGB.
+FONT_SCALE = 2         # Pixels per dot of the font.
+SEED = 120
+
+# A 3x5 dot font with the characters the score and lives need.
+FONT = {
+    '0': '111101101101111', '1': '010110010010111', '2': '111001111100111', '3': '111001111001111',
+    '4': '101101111001001', '5': '111100111001111', '6': '111100111101111', '7': '111001001001001',
+    '8': '111101111101111', '9': '111101111001111', 'S': '111100111001111', 'C': '111100100100111',
+    'O': '111101101101111', 'R': '110101110101101', 'E': '111100110100111', 'L': '100100100100111',
+    'I': '111010010010111', 'V': '101101101101010', ':': '000010000010000', ' ': '000000000000000',
+    '-': '000000111000000',
+}
+
+
+def glyph(char):
+    """
+    Returns the dots of a character as a boolean array, scaled by
+    FONT_SCALE.
+    """
+    dots = np.array([dot == '1' for dot in FONT.get(char, FONT[' '])]).reshape(5, 3)
+    return np.kron(dots, np.ones((FONT_SCALE, FONT_SCALE), dtype=bool))
+
+
+def disc(diameter):
+    """
+    Returns a boolean array of a filled circle of the given diameter.
+    """
+    center = (diameter - 1) / 2
+    y, x = np.ogrid[:diameter, :diameter]
+    return (x - center) ** 2 + (y - center) ** 2 <= (diameter / 2) ** 2
+
+
+class Rasterizer:
+
+    def __init__(self, state):
+        self.state = state
+        self.width = int(state.width)
+        self.height = int(state.height)
+        self.frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.background = np.empty_like(self.frame)
+        self.glyphs = {char: glyph(char) for char in FONT}
+        self.ball_disc = disc(2 * state.ball_radius)
+        self.x_step = state.brick_width + state.brick_spacing
+        self.y_step = state.brick_height + state.brick_spacing
+        self.masks = state.bricks.masks()
+        self.hud = None        # The (score, lives) drawn in the background
+        self.hud_rects = []    # Where the score and lives are drawn
+        self.dirty = []        # Where the paddle and balls were drawn in the last frame
+        self.draw_bricks()
+        self.draw_hud()
+        self.frame[:] = self.background
+
+    def draw_bricks(self):
+        """
+        Draws the standing bricks in their colors on a white
+        background, for the whole window at once.
+        """
+        state = self.state
+        registry = state.registry
+        rows, cols = state.brick_rows, state.brick_cols
+
+        # The brick column under each x and brick row under each y (-1 in the gaps between bricks).
+        x = np.arange(self.width)
+        col = x // self.x_step
+        col[(x % self.x_step >= state.brick_width) | (col >= cols)] = -1
+        y = np.arange(self.height) - state.brick_offset
+        row = y // self.y_step
+        row[(y < 0) | (y % self.y_step >= state.brick_height) | (row >= rows)] = -1
+
+        row_bytes = (cols + 7) // 8
+        packed = np.frombuffer(b''.join(mask.to_bytes(row_bytes, 'little') for mask in self.masks), dtype=np.uint8)
+        standing = np.unpackbits(packed.reshape(rows, row_bytes), axis=1, bitorder='little')[:, :cols].astype(bool)
+        colors = np.frombuffer(bytes(registry.colors), dtype=np.uint8).reshape(rows, cols)
+        palette = np.array([RGB.get(name.upper(), UNKNOWN_RGB) for name in registry.palette], dtype=np.uint8)
+
+        self.background[:] = RGB['WHITE']
+        y_inside = row >= 0
+        x_inside = col >= 0
+        cells = np.ix_(row[y_inside], col[x_inside])
+        area = self.background[y_inside][:, x_inside]
+        brick = standing[cells]
+        area[brick] = palette[colors[cells][brick]]
+        self.background[np.ix_(y_inside, x_inside)] = area
+
+    def break_bricks(self):
+        """
+        Clears the bricks broken since the last frame from the
+        background and the frame.
+        """
+        masks = self.state.bricks.masks()
+        if masks == self.masks:
+            return
+        state = self.state
+        for row, (before, after) in enumerate(zip(self.masks, masks)):
+            broken = before & ~after
+            col = 0
+            while broken:
+                if broken & 1:
+                    y = state.brick_offset + row * self.y_step
+                    x = col * self.x_step
+                    self.background[y:y + state.brick_height, x:x + state.brick_width] = RGB['WHITE']
+                    self.frame[y:y + state.brick_height, x:x + state.brick_width] = RGB['WHITE']
+                broken >>= 1
+                col += 1
+            if after & ~before:
+                # Bricks came back (e.g. a restored game), so the whole wall is drawn again.
+                self.masks = masks
+                self.draw_bricks()
+                self.hud = None
+                self.draw_hud()
+                self.frame[:] = self.background
+                self.dirty = []
+                return
+        self.masks = masks
+
+    def draw_hud(self):
+        """
+        EXTENSION HERE (Improved Interface Display).
+        Draws the score (bottom right) and lives (bottom left) in
+        the background and the frame when they've changed.
+        """
+        state = self.state
+        if INTERFACE not in state.rules or self.hud == (state.score, state.lives):
+            return
+        self.hud = (state.score, state.lives)
+        for top, bottom, left, right in self.hud_rects:
+            self.background[top:bottom, left:right] = RGB['WHITE']
+            self.frame[top:bottom, left:right] = RGB['WHITE']
+        self.hud_rects = []
+
+        text_height = 5 * FONT_SCALE
+        score = 'SCORE: ' + str(state.score)
+        x = self.width - 1 - len(score) * 4 * FONT_SCALE
+        self.hud_rects.append(self.draw_text(score, x, self.height - 1 - text_height))
+        self.hud_rects.append(self.draw_text('LIVES:', 1, self.height - 1 - text_height))
+        diameter = 2 * state.ball_radius
+        x = 6 * 4 * FONT_SCALE + state.ball_radius
+        color = RGB[LIFE_COLORS.get(state.lives, 'green').upper()]
+        for life in range(state.lives):
+            rect = self.stamp(self.background, self.ball_disc, x, self.height - diameter - 1, color)
+            if rect is not None:
+                self.hud_rects.append(rect)
+            x += diameter + LIFE_SPACING
+        for top, bottom, left, right in self.hud_rects:
+            self.frame[top:bottom, left:right] = self.background[top:bottom, left:right]
+
+    def draw_text(self, text, x, y):
+        """
+        Draws text in black in the background with its top left
+        corner at (x, y), returning the rectangle it covers.
+        """
+        rect = None
+        for char in text:
+            drawn = self.stamp(self.background, self.glyphs[char], x, y, RGB['BLACK'])
+            if drawn is not None:
+                rect = drawn if rect is None else (min(rect[0], drawn[0]), max(rect[1], drawn[1]),
+                                                   min(rect[2], drawn[2]), max(rect[3], drawn[3]))
+            x += 4 * FONT_SCALE
+        return rect if rect is not None else (0, 0, 0, 0)
+
+    def stamp(self, image, shape, x, y, color):
+        """
+        Fills the True pixels of shape (a boolean array) with color,
+        with its top left corner at (x, y) and clipped to the image.
+        Returns the (top, bottom, left, right) rectangle changed, or
+        None if it's all outside the image.
+        """
+        height, width = shape.shape
+        x = int(round(x))
+        y = int(round(y))
+        top, bottom = max(y, 0), min(y + height, self.height)
+        left, right = max(x, 0), min(x + width, self.width)
+        if top >= bottom or left >= right:
+            return None
+        image[top:bottom, left:right][shape[top - y:bottom - y, left - x:right - x]] = color
+        return top, bottom, left, right
+
+    def fill(self, image, width, height, x, y, color):
+        """
+        Fills a rectangle with color, clipped to the image, and
+        returns the rectangle changed (see stamp()).
+        """
+        x = int(round(x))
+        y = int(round(y))
+        top, bottom = max(y, 0), min(y + int(height), self.height)
+        left, right = max(x, 0), min(x + int(width), self.width)
+        if top >= bottom or left >= right:
+            return None
+        image[top:bottom, left:right] = color
+        return top, bottom, left, right
+
+    def render(self):
+        """
+        Draws the game as it is now and returns the frame (the same
+        array every time, so copy it to keep it).
+        """
+        state = self.state
+        frame = self.frame
+        for top, bottom, left, right in self.dirty:
+            frame[top:bottom, left:right] = self.background[top:bottom, left:right]
+        self.dirty = []
+        self.break_bricks()
+        self.draw_hud()
+
+        paddle = state.paddle
+        rects = [self.fill(frame, paddle.width, paddle.height, paddle.x, paddle.y, RGB['BLACK'])]
+        for ball in state.balls:
+            color = RGB['RED'] if ball.bounce_counter > 0 else RGB['BLACK']
+            rects.append(self.stamp(frame, self.ball_disc, ball.x, ball.y, color))
+        self.dirty = [rect for rect in rects if rect is not None]
+        return frame
+
+
+def save_ppm(frame, path):
+    """
+    Saves a frame as a binary PPM image.
+    """
+    with open(path, 'wb') as file:
+        file.write('P6 {} {} 255\n'.format(frame.shape[1], frame.shape[0]).encode())
+        file.write(frame.tobytes())
+
+
+def main():
+    import argparse
+    from autopilot import Autopilot
+    from inputlog import HeadlessDriver
+    parser = argparse.ArgumentParser(description='Render an autopiloted game of Breakout without a window.')
+    parser.add_argument('--size', default='10x10', help='board size as ROWSxCOLS (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=5000, help='most frames played (default: %(default)s)')
+    parser.add_argument('--base', action='store_true', help='play with the base rules (no score or lives shown)')
+    parser.add_argument('--save', help='save the last frame to this .ppm file')
+    parser.add_argument('--video', help='save every frame to this file as raw RGB')
+    args = parser.parse_args()
+
+    rows, cols = (int(n) for n in args.size.split('x'))
+    state = BreakoutState(brick_rows=rows, brick_cols=cols, extended=not args.base, rng=random.Random(SEED))
+    autopilot = Autopilot(state)
+    driver = HeadlessDriver(state)
+    rasterizer = Rasterizer(state)
+    video = open(args.video, 'wb') if args.video else None
+    frames = 0
+    seconds = 0
+    while frames < args.frames and driver.check():
+        driver.play_frame(autopilot.pointer_x(), True)
+        start = time.perf_counter()
+        frame = rasterizer.render()
+        seconds += time.perf_counter() - start
+        if video is not None:
+            video.write(frame.tobytes())
+        frames += 1
+    if video is not None:
+        video.close()
+        print('Saved {} frames of {}x{} to {}'.format(frames, rasterizer.width, rasterizer.height, args.video))
+    if args.save:
+        save_ppm(rasterizer.render(), args.save)
+        print('Saved the last frame to', args.save)
+    print('{}x{} window: {} frames rendered at {:.0f} frames/sec'.format(
+        rasterizer.width, rasterizer.height, frames, frames / max(seconds, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,494 @@
+"""
+This program describes a spectator server for a game reminiscent
+of 'Breakout', so a game can be watched live from other machines
+(or from a test on the same one). It runs on asyncio: a spectator
+that connects gets a snapshot of the whole game, and after that only
+what changed each frame: the paddle and balls (as the change in
+their position, in 1/POSITION_SCALE pixels), the bricks that were
+broken and the change in score and lives. Numbers are zigzag varints
+(see inputlog.py), so a frame takes a few bytes however big the wall
+is.
+
+The game publishes its state once per frame. Each spectator has its
+own writer, and while a spectator is still being sent an update the
+frames published meanwhile are merged into its next one, so a slow
+spectator gets fewer, bigger updates instead of slowing the game or
+the other spectators down.
+
+The windowed games publish to spectators when BREAKOUT_SPECTATE is
+set to HOST:PORT (see breakout.py).
+
+Usage:
+    python spectator.py localhost:5120      # watch a game
+    python spectator.py --demo --size 50x50  # play a game against a local spectator and show the bandwidth
+"""
+import asyncio
+import random
+import threading
+import time
+from autopilot import Autopilot
+from breakoutstate import BreakoutState
+from brickwall import runs
+from inputlog import HeadlessDriver, write_varint, read_varint, zigzag, unzigzag
+
+HOST = 'localhost'
+PORT = 5120
+POSITION_SCALE = 8     # Positions are sent in 1/POSITION_SCALE pixels.
+SNAPSHOT = 1           # Message type of a snapshot of the whole game.
+DELTA = 2              # Message type of the changes since the last message.
+PADDLE = 1             # Flag bit of a delta in which the paddle moved.
+BALLS = 2              # Flag bit of a delta in which the balls moved.
+BALL_SET = 4           # Flag bit of a delta in which balls were added or lost (all balls are sent again).
+BRICKS = 8             # Flag bit of a delta in which bricks were broken.
+SCORE = 16             # Flag bit of a delta in which the score changed.
+LIVES = 32             # Flag bit of a delta in which the lives changed.
+SEED = 120
+CLOSE_TIMEOUT = 2      # Seconds close() waits for spectators to be sent the last frame.
+
+
+def capture(state):
+    """
+    Returns what spectators see of a game: the paddle and balls
+    (in 1/POSITION_SCALE pixels), standing bricks, score and lives.
+    """
+    return {'paddle': round(state.paddle.x * POSITION_SCALE),
+            'balls': [(ball.number, round(ball.x * POSITION_SCALE), round(ball.y * POSITION_SCALE))
+                      for ball in state.balls],
+            'masks': state.bricks.masks(), 'score': state.score, 'lives': state.lives}
+
+
+def framed(payload):
+    """
+    Returns a message ready to be sent: its length, then payload.
+    """
+    data = bytearray()
+    write_varint(data, len(payload))
+    return bytes(data + payload)
+
+
+def write_balls(data, balls):
+    """
+    Appends the number and position of every ball to data.
+    """
+    write_varint(data, len(balls))
+    for number, x, y in balls:
+        write_varint(data, number)
+        write_varint(data, zigzag(x))
+        write_varint(data, zigzag(y))
+
+
+def encode_snapshot(frame, rows, cols, view):
+    """
+    Returns a message with the whole view of the game at frame.
+    """
+    data = bytearray([SNAPSHOT])
+    for n in (frame, rows, cols, view['score'], view['lives']):
+        write_varint(data, n)
+    write_varint(data, zigzag(view['paddle']))
+    write_balls(data, view['balls'])
+    row_bytes = (cols + 7) // 8
+    for mask in view['masks']:
+        data += mask.to_bytes(row_bytes, 'little')
+    return framed(data)
+
+
+def encode_delta(frames, old, new, broken):
+    """
+    Returns a message with the changes from the old view to the
+    new one, frames frames later, with the cells (row * cols + col)
+    of the bricks broken in between.
+    """
+    data = bytearray([DELTA])
+    write_varint(data, frames)
+    flags = 0
+    body = bytearray()
+    if new['paddle'] != old['paddle']:
+        flags |= PADDLE
+        write_varint(body, zigzag(new['paddle'] - old['paddle']))
+    if [ball[0] for ball in new['balls']] != [ball[0] for ball in old['balls']]:
+        flags |= BALL_SET
+        write_balls(body, new['balls'])
+    elif new['balls'] != old['balls']:
+        flags |= BALLS
+        for (number, x, y), (number, old_x, old_y) in zip(new['balls'], old['balls']):
+            write_varint(body, zigzag(x - old_x))
+            write_varint(body, zigzag(y - old_y))
+    if broken:
+        # Cells are sent in order, each as the gap from the one before.
+        flags |= BRICKS
+        write_varint(body, len(broken))
+        last = 0
+        for cell in sorted(broken):
+            write_varint(body, cell - last)
+            last = cell
+    if new['score'] != old['score']:
+        flags |= SCORE
+        write_varint(body, zigzag(new['score'] - old['score']))
+    if new['lives'] != old['lives']:
+        flags |= LIVES
+        write_varint(body, zigzag(new['lives'] - old['lives']))
+    data.append(flags)
+    return framed(data + body)
+
+
+class Spectator:
+    """
+    What the server knows about one connected spectator: the view
+    it was last sent and the bricks broken since then.
+    """
+
+    def __init__(self):
+        self.sent = None       # The view the spectator has
+        self.frame = 0         # The frame of that view
+        self.broken = []       # Cells of the bricks broken since
+        self.resync = False    # Whether bricks came back (e.g. a restored game), so it needs a snapshot
+        self.closed = False
+        self.ready = asyncio.Event()   # Set when there's something new to send
+
+
+class SpectatorServer:
+
+    def __init__(self, state):
+        self.state = state
+        self.rows = state.brick_rows
+        self.cols = state.brick_cols
+        self.frame = 0
+        self.view = capture(state)
+        self.spectators = set()
+        self.handlers = set()   # The tasks streaming to each spectator
+        self.bytes_sent = 0
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        """
+        Starts accepting spectators and returns the (host, port)
+        the server listens on (port 0 picks a free one).
+        """
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    def publish(self):
+        """
+        Publishes the game as it is now, as the next frame. Must be
+        called from the server's event loop (see SpectatorThread for
+        games that don't run on one).
+        """
+        self.update(capture(self.state))
+
+    def update(self, view):
+        """
+        Makes view the next frame and lets every spectator know,
+        adding the bricks broken since the last frame to what each
+        spectator is still to be sent.
+        """
+        self.frame += 1
+        broken = []
+        restored = False
+        if view['masks'] != self.view['masks']:
+            for row, (before, after) in enumerate(zip(self.view['masks'], view['masks'])):
+                if after & ~before:
+                    restored = True
+                for first, last in runs(before & ~after):
+                    broken.extend(range(row * self.cols + first, row * self.cols + last + 1))
+        self.view = view
+        for spectator in self.spectators:
+            spectator.broken += broken
+            spectator.resync |= restored
+            spectator.ready.set()
+
+    def send(self, writer, spectator):
+        """
+        Writes what's new since the spectator's last update (a
+        snapshot, if it has none or needs one).
+        """
+        if spectator.sent is None or spectator.resync:
+            message = encode_snapshot(self.frame, self.rows, self.cols, self.view)
+        else:
+            message = encode_delta(self.frame - spectator.frame, spectator.sent, self.view, spectator.broken)
+        writer.write(message)
+        self.bytes_sent += len(message)
+        spectator.sent = self.view
+        spectator.frame = self.frame
+        spectator.broken = []
+        spectator.resync = False
+
+    async def handle(self, reader, writer):
+        """
+        Streams the game to one spectator until it disconnects or
+        the server is closed (after sending it the last frame, e.g.
+        the end of the game). Frames published while waiting for the
+        spectator's connection to drain are merged into one update.
+        """
+        spectator = Spectator()
+        self.spectators.add(spectator)
+        self.handlers.add(asyncio.current_task())
+        try:
+            while not spectator.closed:
+                if spectator.sent is None or spectator.frame != self.frame:
+                    self.send(writer, spectator)
+                    await writer.drain()
+                await spectator.ready.wait()
+                spectator.ready.clear()
+            if spectator.frame != self.frame:
+                self.send(writer, spectator)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.spectators.discard(spectator)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def close(self):
+        """
+        Stops accepting spectators and disconnects the ones left,
+        once they've been sent the last frame (or CLOSE_TIMEOUT
+        seconds have passed).
+        """
+        self.server.close()
+        for spectator in self.spectators:
+            spectator.closed = True
+            spectator.ready.set()
+        if self.handlers:
+            await asyncio.wait(list(self.handlers), timeout=CLOSE_TIMEOUT)
+        await self.server.wait_closed()
+
+
+class SpectatorThread:
+    """
+    Runs a SpectatorServer on its own event loop in a background
+    thread, for games whose main loop isn't asyncio (like the
+    campy windows).
+    """
+
+    def __init__(self, state, host=HOST, port=PORT):
+        self.state = state
+        self.server = SpectatorServer(state)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.address = asyncio.run_coroutine_threadsafe(self.server.start(host, port), self.loop).result()
+
+    def publish(self):
+        """
+        Publishes the game as it is now. The view is captured in the
+        game's thread (so it's never read halfway through a step)
+        and handed to the server's loop.
+        """
+        self.loop.call_soon_threadsafe(self.server.update, capture(self.state))
+
+    def close(self):
+        """
+        Closes the server and stops its thread.
+        """
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class SpectatorClient:
+    """
+    A spectator's copy of the game, kept up to date from the
+    messages of a SpectatorServer.
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.rows = 0
+        self.cols = 0
+        self.paddle = 0        # Paddle x, in 1/POSITION_SCALE pixels
+        self.balls = []        # (number, x, y) of every ball, in 1/POSITION_SCALE pixels
+        self.masks = []        # Standing bricks, one bit mask per row
+        self.score = 0
+        self.lives = 0
+        self.messages = 0
+        self.bytes_received = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host=HOST, port=PORT):
+        """
+        Connects to a server and reads its snapshot of the game.
+        """
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        await self.receive()
+
+    async def receive(self):
+        """
+        Waits for the next message and applies it. Raises
+        asyncio.IncompleteReadError once the server is gone.
+        """
+        header = bytearray(await self.reader.readexactly(1))
+        while header[-1] & 0x80:
+            header += await self.reader.readexactly(1)
+        size, i = read_varint(header, 0)
+        payload = await self.reader.readexactly(size)
+        self.apply(payload)
+        self.messages += 1
+        self.bytes_received += len(header) + size
+
+    def apply(self, data):
+        """
+        Applies one message (a snapshot or a delta) to the copy.
+        """
+        if data[0] == SNAPSHOT:
+            values = []
+            i = 1
+            for n in range(5):
+                value, i = read_varint(data, i)
+                values.append(value)
+            self.frame, self.rows, self.cols, self.score, self.lives = values
+            paddle, i = read_varint(data, i)
+            self.paddle = unzigzag(paddle)
+            i = self.read_balls(data, i)
+            row_bytes = (self.cols + 7) // 8
+            self.masks = [int.from_bytes(data[i + row * row_bytes:i + (row + 1) * row_bytes], 'little')
+                          for row in range(self.rows)]
+            return
+
+        frames, i = read_varint(data, 1)
+        self.frame += frames
+        flags = data[i]
+        i += 1
+        if flags & PADDLE:
+            change, i = read_varint(data, i)
+            self.paddle += unzigzag(change)
+        if flags & BALL_SET:
+            i = self.read_balls(data, i)
+        if flags & BALLS:
+            balls = []
+            for number, x, y in self.balls:
+                dx, i = read_varint(data, i)
+                dy, i = read_varint(data, i)
+                balls.append((number, x + unzigzag(dx), y + unzigzag(dy)))
+            self.balls = balls
+        if flags & BRICKS:
+            count, i = read_varint(data, i)
+            cell = 0
+            for n in range(count):
+                gap, i = read_varint(data, i)
+                cell += gap
+                self.masks[cell // self.cols] &= ~(1 << cell % self.cols)
+        if flags & SCORE:
+            change, i = read_varint(data, i)
+            self.score += unzigzag(change)
+        if flags & LIVES:
+            change, i = read_varint(data, i)
+            self.lives += unzigzag(change)
+
+    def read_balls(self, data, i):
+        """
+        Reads every ball written by write_balls() at position i of
+        data, returning the position after them.
+        """
+        count, i = read_varint(data, i)
+        self.balls = []
+        for n in range(count):
+            number, i = read_varint(data, i)
+            x, i = read_varint(data, i)
+            y, i = read_varint(data, i)
+            self.balls.append((number, unzigzag(x), unzigzag(y)))
+        return i
+
+    def bricks_left(self):
+        """
+        Returns the number of standing bricks.
+        """
+        return sum(mask.bit_count() for mask in self.masks)
+
+    def close(self):
+        """
+        Disconnects from the server.
+        """
+        self.writer.close()
+
+
+async def watch(host, port):
+    """
+    Follows a game, printing it and the bandwidth once a second.
+    """
+    client = SpectatorClient()
+    await client.connect(host, port)
+    last_time = time.perf_counter()
+    last_frame = client.frame
+    last_bytes = client.bytes_received
+    try:
+        while True:
+            await client.receive()
+            now = time.perf_counter()
+            if now - last_time >= 1:
+                frames = max(1, client.frame - last_frame)
+                print('frame {}  score {}  lives {}  bricks left {}  {:.1f} bytes/frame'.format(
+                    client.frame, client.score, client.lives, client.bricks_left(),
+                    (client.bytes_received - last_bytes) / frames))
+                last_time, last_frame, last_bytes = now, client.frame, client.bytes_received
+    except asyncio.IncompleteReadError:
+        print('Game over: score {}, lives {}, bricks left {}'.format(client.score, client.lives, client.bricks_left()))
+
+
+async def demo(size, frames):
+    """
+    Plays an autopiloted game published to a local spectator, then
+    checks the spectator's copy matches the game and shows the
+    bandwidth used.
+    """
+    rows, cols = size
+    state = BreakoutState(brick_rows=rows, brick_cols=cols, extended=True, rng=random.Random(SEED))
+    autopilot = Autopilot(state)
+    driver = HeadlessDriver(state)
+    server = SpectatorServer(state)
+    host, port = await server.start('127.0.0.1', 0)
+    client = SpectatorClient()
+    await client.connect(host, port)
+    snapshot_bytes = client.bytes_received
+
+    async def follow():
+        try:
+            while True:
+                await client.receive()
+        except asyncio.IncompleteReadError:
+            pass
+
+    follower = asyncio.create_task(follow())
+    played = 0
+    while played < frames and driver.check():
+        driver.play_frame(autopilot.pointer_x(), True)
+        server.publish()
+        played += 1
+        await asyncio.sleep(0)
+    if state.lives == 0:
+        server.publish()   # The life that ended the game.
+    await server.close()
+    await follower
+
+    view = capture(state)
+    matches = (client.frame == server.frame and client.paddle == view['paddle'] and client.balls == view['balls']
+               and client.masks == view['masks'] and client.score == view['score'] and client.lives == view['lives'])
+    print('{}x{}: {} frames in {} messages, snapshot {} bytes, then {:.2f} bytes/frame; copy matches: {}'.format(
+        rows, cols, played, client.messages, snapshot_bytes,
+        (client.bytes_received - snapshot_bytes) / max(1, played), matches))
+    return matches
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Watch a game of Breakout being played elsewhere.')
+    parser.add_argument('address', nargs='?', default='{}:{}'.format(HOST, PORT), help='HOST:PORT of the game')
+    parser.add_argument('--demo', action='store_true', help='play a game against a local spectator instead')
+    parser.add_argument('--size', default='10x10', help='board size for --demo as ROWSxCOLS (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=20000, help='most frames played by --demo')
+    args = parser.parse_args()
+    if args.demo:
+        size = tuple(int(n) for n in args.size.split('x'))
+        if not asyncio.run(demo(size, args.frames)):
+            raise SystemExit(1)
+        return
+    host, _, port = args.address.rpartition(':')
+    try:
+        asyncio.run(watch(host, int(port)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
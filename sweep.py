@@ -0,0 +1,245 @@
+"""
+This program sweeps the gameplay constants of 'Breakout' (the
+ball's initial speeds, the kicker thresholds and the batting speed)
+over many headless games played by an autopilot, so they can be
+tuned without playing by hand. Every parameter combination is
+played with the same seeds, and the games are spread over all cores
+with a ProcessPoolExecutor. The result of every game (score, lives
+lost, frames played and frames to clear the board) is written to a
+CSV file (or a Parquet file, which needs pyarrow) as it comes in,
+and an average of each combination is printed at the end.
+
+Usage:
+    python sweep.py                                       # sweep DEFAULT_GRID
+    python sweep.py --param max_x_speed=2,3.5,5 --param kicker_killer=30,50
+    python sweep.py --random 200 --param initial_y_speed=3:8 --param batting_speed=500:5000
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from breakoutstate import BreakoutState
+from inputlog import HeadlessDriver
+
+PARAMETERS = ['initial_y_speed', 'max_x_speed', 'kicker_normal', 'kicker_hard', 'kicker_killer', 'batting_speed']
+INTEGER_PARAMETERS = ['kicker_normal', 'kicker_hard', 'kicker_killer']
+DEFAULT_GRID = {'initial_y_speed': [4.0, 5.0, 6.0], 'max_x_speed': [2.5, 3.5, 4.5], 'batting_speed': [1000, 2000, 4000]}
+GAMES = 8              # Games (seeds) played for every combination.
+SEED = 120
+MAX_FRAMES = 100000    # A game still going after this many frames is stopped.
+PADDLE_STEP = 12       # Most pixels the autopilot moves the paddle per frame (so fast balls can be missed).
+JITTER = 30            # The autopilot aims at a random point up to JITTER pixels from the ball's center.
+FIELDS = ['point'] + PARAMETERS + ['seed', 'score', 'lives_lost', 'frames', 'cleared', 'frames_to_clear']
+
+
+def parse_param(text):
+    """
+    Returns the name and values of a '--param' argument, which is
+    either name=v1,v2,... (values for a grid) or name=low:high
+    (a range for a random sweep, given as a tuple).
+    """
+    name, _, values = text.partition('=')
+    if name not in PARAMETERS:
+        raise argparse.ArgumentTypeError('unknown parameter {} (one of {})'.format(name, ', '.join(PARAMETERS)))
+    kind = int if name in INTEGER_PARAMETERS else float
+    if ':' in values:
+        low, high = values.split(':')
+        return name, (kind(low), kind(high))
+    return name, [kind(value) for value in values.split(',')]
+
+
+def grid_points(params):
+    """
+    Returns every combination of the values of each parameter.
+    """
+    names = list(params)
+    return [dict(zip(names, values)) for values in itertools.product(*(params[name] for name in names))]
+
+
+def random_points(params, count, seed):
+    """
+    Returns count combinations with each parameter drawn uniformly
+    from its range (or from its list of values).
+    """
+    rng = random.Random(seed)
+    points = []
+    for n in range(count):
+        point = {}
+        for name, values in params.items():
+            if isinstance(values, list):
+                point[name] = rng.choice(values)
+            elif name in INTEGER_PARAMETERS:
+                point[name] = rng.randint(*values)
+            else:
+                point[name] = round(rng.uniform(*values), 3)
+        points.append(point)
+    return points
+
+
+def play_game(task):
+    """
+    Plays one autopiloted game with the parameters of a task
+    (point number, parameters, seed, board size, max frames,
+    paddle step, continuous collisions) and returns its result as a dictionary.
+    """
+    point, params, seed, size, max_frames, paddle_step, continuous = task
+    rows, cols = size
+    # The serves and the autopilot's aim each get their own generator, seeded differently.
+    aim = random.Random('aim {}'.format(seed))
+    state = BreakoutState(brick_rows=rows, brick_cols=cols, extended=True, continuous=continuous,
+                          rng=random.Random(seed), **params)
+    driver = HeadlessDriver(state, serve=True)
+    lives = state.lives
+    state.set_ball_velocity()
+    frames = 0
+    while frames < max_frames and driver.check():
+        # Move the paddle towards the ball, but only so fast.
+        center = state.paddle.x + state.paddle_width / 2
+        target = state.ball.x + state.ball_radius + aim.uniform(-JITTER, JITTER)
+        driver.play_frame(center + max(-paddle_step, min(paddle_step, target - center)))
+        frames += 1
+
+    cleared = state.no_more_blocks()
+    result = {'point': point, 'seed': seed, 'score': state.score, 'lives_lost': lives - state.lives,
+              'frames': frames, 'cleared': cleared, 'frames_to_clear': frames if cleared else None}
+    for name in PARAMETERS:
+        result[name] = params.get(name, getattr(state, name))
+    return result
+
+
+class CsvWriter:
+    """
+    Writes results to a CSV file, one row at a time.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        """
+        Writes the result of one game.
+        """
+        self.writer.writerow(result)
+        self.file.flush()
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Writes results to a Parquet file in batches (needs pyarrow).
+    """
+
+    BATCH = 1000
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit('Writing Parquet needs pyarrow (pip install pyarrow), or use a .csv file.')
+        self.pyarrow = pyarrow
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema())
+        self.rows = []
+
+    def schema(self):
+        """
+        Returns the columns of the file and their types.
+        """
+        types = {'point': self.pyarrow.int64(), 'seed': self.pyarrow.int64(), 'cleared': self.pyarrow.bool_()}
+        return self.pyarrow.schema([(field, types.get(field, self.pyarrow.float64())) for field in FIELDS])
+
+    def write(self, result):
+        """
+        Adds the result of one game (written with the next batch).
+        """
+        self.rows.append(result)
+        if len(self.rows) >= self.BATCH:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the results waiting in the batch.
+        """
+        if self.rows:
+            self.writer.write_table(self.pyarrow.Table.from_pylist(self.rows, schema=self.writer.schema))
+            self.rows = []
+
+    def close(self):
+        """
+        Writes the last batch and closes the file.
+        """
+        self.flush()
+        self.writer.close()
+
+
+def summarize(results, points):
+    """
+    Prints the average result of every combination.
+    """
+    print('point', ' '.join('{:>10}'.format(name[:10]) for name in points[0]),
+          '     score  lives_lost  cleared  frames_to_clear')
+    by_point = {}
+    for result in results:
+        by_point.setdefault(result['point'], []).append(result)
+    for n, point in enumerate(points):
+        games = by_point[n]
+        cleared = [result['frames_to_clear'] for result in games if result['cleared']]
+        print('{:5}'.format(n), ' '.join('{:>10}'.format(value) for value in point.values()),
+              '{:10.1f}  {:10.2f}  {:7.0%}  {:>15}'.format(
+                  sum(result['score'] for result in games) / len(games),
+                  sum(result['lives_lost'] for result in games) / len(games),
+                  len(cleared) / len(games),
+                  round(sum(cleared) / len(cleared)) if cleared else '-'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep the gameplay constants of Breakout over autopiloted games.')
+    parser.add_argument('--param', action='append', type=parse_param, default=[],
+                        help='NAME=V1,V2,... for a grid or NAME=LOW:HIGH for --random (repeatable)')
+    parser.add_argument('--random', type=int, metavar='N', help='draw N random combinations instead of a grid')
+    parser.add_argument('--games', type=int, default=GAMES, help='games per combination (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=SEED, help='first seed (default: %(default)s)')
+    parser.add_argument('--size', default='10x10', help='board size as ROWSxCOLS (default: %(default)s)')
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES, help='frames before a game is stopped')
+    parser.add_argument('--paddle-step', type=float, default=PADDLE_STEP, help='autopilot paddle pixels per frame')
+    parser.add_argument('--continuous', action='store_true', help='sweep the ball (continuous collisions)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes (default: all cores)')
+    parser.add_argument('--out', default='sweep.csv', help='results file, .csv or .parquet (default: %(default)s)')
+    args = parser.parse_args()
+
+    params = dict(args.param) if args.param else DEFAULT_GRID
+    if args.random is not None:
+        points = random_points(params, args.random, args.seed)
+    else:
+        if any(isinstance(values, tuple) for values in params.values()):
+            parser.error('ranges (LOW:HIGH) need --random')
+        points = grid_points(params)
+    size = tuple(int(n) for n in args.size.split('x'))
+    tasks = [(n, point, args.seed + game, size, args.max_frames, args.paddle_step, args.continuous)
+             for n, point in enumerate(points) for game in range(args.games)]
+    print('Playing {} games ({} combinations) on {} processes'.format(len(tasks), len(points), args.workers))
+
+    # Games are handed out in chunks, so each process stays busy without waiting on the others.
+    writer = ParquetWriter(args.out) if args.out.endswith('.parquet') else CsvWriter(args.out)
+    results = []
+    chunk = max(1, len(tasks) // (args.workers * 8))
+    with ProcessPoolExecutor(args.workers) as executor:
+        for result in executor.map(play_game, tasks, chunksize=chunk):
+            writer.write(result)
+            results.append(result)
+    writer.close()
+    summarize(results, points)
+    print('Results written to', args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Shared fixtures for the tests. campy opens real Tk windows, so the
+window tests swap it for a small in-memory stand-in with the same
+GObject attributes, and keep the mouse listeners the game registers
+so a test can send it mouse events.
+"""
+import os
+import sys
+import types
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class GObject:
+
+    def __init__(self, width=0, height=0, x=0, y=0):
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self.filled = False
+        self.fill_color = 'black'
+
+    @property
+    def location(self):
+        return self.x, self.y
+
+    @location.setter
+    def location(self, location):
+        self.x, self.y = location
+
+
+class GRect(GObject):
+
+    def __init__(self, width, height, x=0, y=0):
+        super().__init__(width, height, x, y)
+
+
+class GOval(GRect):
+    pass
+
+
+class GLabel(GObject):
+
+    def __init__(self, text='', x=0, y=0):
+        super().__init__(0, 12, x, y)
+        self.text = text
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        self.width = 7 * len(text)
+
+
+class GWindow:
+
+    def __init__(self, width=500, height=500, title=''):
+        self.width = width
+        self.height = height
+        self.objects = []
+
+    def add(self, obj, x=None, y=None):
+        if x is not None:
+            obj.location = x, y
+        self.objects.append(obj)
+
+    def remove(self, obj):
+        self.objects.remove(obj)
+
+
+class Mouse:
+    """
+    The mouse listeners the game registered, and a way to send
+    them events.
+    """
+
+    def __init__(self):
+        self.listeners = {}
+
+    def click(self, x=0, y=0):
+        self.listeners['click'](types.SimpleNamespace(x=x, y=y))
+
+    def move(self, x, y=0):
+        self.listeners['move'](types.SimpleNamespace(x=x, y=y))
+
+
+@pytest.fixture
+def mouse(monkeypatch):
+    """
+    Replaces campy with the stand-in above and returns the Mouse
+    that the game's listeners end up in.
+    """
+    mouse = Mouse()
+    modules = {
+        'campy': types.ModuleType('campy'),
+        'campy.graphics': types.ModuleType('campy.graphics'),
+        'campy.graphics.gwindow': types.ModuleType('campy.graphics.gwindow'),
+        'campy.graphics.gobjects': types.ModuleType('campy.graphics.gobjects'),
+        'campy.gui': types.ModuleType('campy.gui'),
+        'campy.gui.events': types.ModuleType('campy.gui.events'),
+        'campy.gui.events.mouse': types.ModuleType('campy.gui.events.mouse'),
+        'campy.gui.events.timer': types.ModuleType('campy.gui.events.timer'),
+    }
+    modules['campy.graphics.gwindow'].GWindow = GWindow
+    gobjects = modules['campy.graphics.gobjects']
+    gobjects.GObject, gobjects.GRect, gobjects.GOval, gobjects.GLabel = GObject, GRect, GOval, GLabel
+    events = modules['campy.gui.events.mouse']
+    events.onmouseclicked = lambda listener: mouse.listeners.__setitem__('click', listener)
+    events.onmousemoved = lambda listener: mouse.listeners.__setitem__('move', listener)
+    modules['campy.gui.events.timer'].pause = lambda ms: None
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    return mouse
@@ -0,0 +1,19 @@
+import benchmark
+
+
+def test_startup_runs_from_another_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(benchmark, 'STARTUP_RUNS', 1)
+    result = benchmark.bench_startup('2x2')
+    assert result['campy_loaded'] is False
+    assert result['process_ms'] > 0
+
+
+def test_games_are_compared_exactly_and_timings_are_not():
+    result = {'frames_per_sec': 1000, 'hit_tests_per_sec': 1000, 'clear_seconds': None,
+              'clear_frames': None, 'clear_score': 120, 'bricks_left': 7}
+    games = benchmark.games_of({'extendedbreakoutgraphics 50x50': result})
+    slower = dict(result, frames_per_sec=10, hit_tests_per_sec=10)
+    assert benchmark.compare_games({'extendedbreakoutgraphics 50x50': slower}, games) == []
+    other = dict(result, bricks_left=6)
+    assert len(benchmark.compare_games({'extendedbreakoutgraphics 50x50': other}, games)) == 1
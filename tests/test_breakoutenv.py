@@ -0,0 +1,48 @@
+import numpy as np
+from breakoutenv import OBSERVATION_SIZE, BreakoutEnv, follow_ball
+
+
+def play(env, seed, steps):
+    observation, info = env.reset(seed)
+    rewards = []
+    done = False
+    while not done and len(rewards) < steps:
+        observation, reward, done, info = env.step(follow_ball(observation))
+        rewards.append(reward)
+    return rewards, done, info
+
+
+def test_reset_serves_a_new_game():
+    env = BreakoutEnv(brick_rows=3, brick_cols=5)
+    observation, info = env.reset(1)
+    assert observation.shape == (OBSERVATION_SIZE,) and observation.dtype == np.float32
+    assert observation[3] != 0      # The ball is already moving.
+    assert observation[6] == 1      # Every brick is standing.
+    assert info == {'score': 0, 'counter': 15, 'lives': 3}
+
+
+def test_rewards_add_up_and_seeds_replay():
+    env = BreakoutEnv(brick_rows=3, brick_cols=5)
+    rewards, done, info = play(env, 2, 3000)
+    assert sum(rewards) == 15 - info['counter'] > 0
+    assert play(BreakoutEnv(brick_rows=3, brick_cols=5), 2, 3000) == (rewards, done, info)
+
+    env = BreakoutEnv(extended=True, brick_rows=3, brick_cols=5)
+    rewards, done, info = play(env, 2, 3000)
+    assert sum(rewards) == info['score'] > 0
+
+
+def test_game_is_done_when_the_lives_or_frames_run_out():
+    env = BreakoutEnv(lives=2, brick_rows=3, brick_cols=5)
+    env.reset(3)
+    done = False
+    steps = 0
+    while not done:
+        observation, reward, done, info = env.step(0.0)   # The paddle stays in the corner.
+        steps += 1
+    assert info['lives'] == 0 and steps < 1000
+    assert env.done()
+
+    env = BreakoutEnv(max_frames=10, brick_rows=3, brick_cols=5)
+    rewards, done, info = play(env, 3, 100)
+    assert done and len(rewards) == 10 and info['lives'] == 3
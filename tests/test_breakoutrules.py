@@ -0,0 +1,18 @@
+from breakoutgraphics import BreakoutGraphics
+from breakoutrules import EXTENDED_RULES
+
+
+def lives_shown(graphics):
+    renderer = graphics.renderer
+    return [renderer.colors[key] for key in sorted(key for key in renderer.shown if key[0] == 'life')]
+
+
+def test_lives_shown_follow_the_lives(mouse):
+    graphics = BreakoutGraphics(lives=5, seed=1, brick_rows=2, brick_cols=4, rules=EXTENDED_RULES)
+    assert lives_shown(graphics) == ['green'] * 5
+    assert 'You have 5 lives' in graphics.renderer.get('intro').text
+    shown = []
+    while graphics.lose_life() > 0:
+        shown.append(lives_shown(graphics))
+    shown.append(lives_shown(graphics))
+    assert shown == [['green'] * 4, ['green'] * 3, ['yellow'] * 2, ['red'], []]
@@ -0,0 +1,15 @@
+from breakoutstate import BreakoutState
+
+
+def test_bricks_left_are_counted_from_the_masks():
+    state = BreakoutState(brick_rows=3, brick_cols=4)
+    assert state.counter == len(state.bricks) == 12
+    snapshot = state.snapshot()
+    for brick in list(state.bricks)[:5]:
+        state.break_brick(brick)
+    assert state.counter == sum(mask.bit_count() for mask in state.bricks.masks()) == 7
+    state.restore(snapshot)
+    assert state.counter == 12
+    for brick in list(state.bricks):
+        state.break_brick(brick)
+    assert state.counter == 0 and state.no_more_blocks()
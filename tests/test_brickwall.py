@@ -0,0 +1,38 @@
+from autopilot import Autopilot
+from breakout import play_frame
+from breakoutgraphics import BreakoutGraphics
+from levelfile import Level
+
+LEVEL = """
+R R R O O O Y Y
+G G . G B B B B
+S S S S S S S S
+Y O R . R O Y G
+"""
+
+
+def test_strips_match_the_standing_bricks(mouse):
+    graphics = BreakoutGraphics(seed=2, level=Level.parse_text(LEVEL), strips=True)
+    autopilot = Autopilot(graphics.state)
+    grid = graphics.state.bricks
+    registry = graphics.state.registry
+    bricks = len(grid)
+    frames = 0
+    while frames < 3000 and len(grid) > bricks - 10 and play_frame(graphics, autopilot):
+        frames += 1
+    assert len(grid) <= bricks - 10
+
+    strips = 0
+    for row, row_strips in enumerate(graphics.wall.row_strips):
+        drawn = 0
+        for first, last in row_strips.items():
+            drawn |= (1 << last + 1) - (1 << first)
+            # A strip is one GRect in the window, over bricks of one color.
+            assert len({registry.color(row, col) for col in range(first, last + 1)}) == 1
+            strip = graphics.renderer.get(('strip', row, first))
+            assert strip in graphics.window.objects
+            assert strip.x == first * grid.x_step
+            assert strip.fill_color == registry.color(row, first)
+            strips += 1
+        assert drawn == grid.standing[row]
+    assert sum(key[0] == 'strip' for key in graphics.renderer.shown) == strips
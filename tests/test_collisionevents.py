@@ -0,0 +1,34 @@
+from collisionevents import BrickHit, EventBus, PaddleHit, WallHit
+
+
+def test_flush_hands_each_subscriber_its_events_in_order():
+    bus = EventBus()
+    calls = []
+    bus.on(BrickHit, lambda event: calls.append(('rule', event.brick)))
+    bus.subscribe(lambda batch: calls.append(('bricks', [event.brick for event in batch])), BrickHit)
+    bus.subscribe(lambda batch: calls.append(('bounces', [type(event) for event in batch])), PaddleHit, WallHit)
+
+    bus.publish(BrickHit(None, 1, True))
+    bus.publish(WallHit(None, 'x'))
+    bus.publish(BrickHit(None, 2, False))
+    bus.publish(PaddleHit(None))
+    bus.publish(BrickHit(None, 3, True))
+    # Rules run as the events happen, subscribers only once the frame is flushed.
+    assert calls == [('rule', 1), ('rule', 2), ('rule', 3)]
+
+    bus.flush()
+    assert calls[3:] == [('bricks', [1, 2, 3]), ('bounces', [WallHit, PaddleHit])]
+
+    # The next frame starts empty, and subscribers with no events aren't called.
+    bus.publish(WallHit(None, 'y'))
+    bus.flush()
+    bus.flush()
+    assert calls[5:] == [('bounces', [WallHit])]
+
+
+def test_events_nobody_subscribed_to_are_not_kept():
+    bus = EventBus()
+    bus.subscribe(lambda batch: None, BrickHit)
+    bus.publish(PaddleHit(None))
+    bus.publish(WallHit(None, 'x'))
+    assert bus.pending == []
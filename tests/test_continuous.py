@@ -0,0 +1,16 @@
+from breakoutgraphics import BreakoutGraphics
+
+
+def test_fast_ball_cannot_pass_through_a_brick(mouse):
+    for continuous in (False, True):
+        graphics = BreakoutGraphics(seed=1, brick_rows=1, brick_cols=4, continuous=continuous)
+        state = graphics.state
+        # A ball moving up faster than a brick is tall, lined up with the middle of a brick.
+        ball = state.ball
+        ball.x = state.brick_width / 2 - state.ball_radius
+        ball.y = state.brick_offset + state.brick_height + 2
+        ball.vx = 0
+        ball.vy = -(state.brick_height + 2 * state.ball_radius + 4)
+        graphics.step()
+        assert (state.counter == 3) == continuous
+        assert state.continuous == continuous
@@ -0,0 +1,26 @@
+import json
+from breakoutgraphics import BreakoutGraphics
+from frameprofiler import FrameProfiler
+
+
+def test_corner_click_switches_the_profiler(mouse, tmp_path):
+    profiler = FrameProfiler()
+    graphics = BreakoutGraphics(seed=1, brick_rows=2, brick_cols=4, profiler=profiler)
+    graphics.step()
+    assert profiler.frames == 0
+
+    mouse.click(5, 5)
+    for n in range(3):
+        graphics.step()
+    assert profiler.enabled and profiler.frames == 3
+    # The corner click doesn't serve the ball.
+    assert graphics.state.vx == 0 and graphics.state.vy == 0
+
+    mouse.click(5, 5)
+    graphics.step()
+    assert not profiler.enabled and profiler.frames == 3
+
+    path = str(tmp_path / 'profile.json')
+    profiler.export(path)
+    with open(path) as file:
+        assert json.load(file)['frames'] == 3
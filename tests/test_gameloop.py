@@ -0,0 +1,59 @@
+from autopilot import Autopilot
+from breakout import play_frame
+from breakoutgraphics import BreakoutGraphics
+from breakoutrules import EXTENDED_RULES
+from gameloop import FixedStepLoop
+
+FRAME_RATE = 1000 / 120
+
+
+class Clock:
+    """
+    A clock that moves on by one frame every time it's read.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += FRAME_RATE / 1000
+        return self.now
+
+
+def test_stops_at_the_frame_that_ends_it():
+    calls = []
+
+    def update():
+        calls.append('update')
+        return calls.count('update') < 5
+
+    loop = FixedStepLoop(FRAME_RATE, sleep=lambda ms: None, clock=Clock())
+    loop.run(update, lambda: calls.append('render'))
+    assert calls[-1] == 'update'
+    assert loop.frames == 5
+
+
+def test_counts_every_frame_of_the_last_catch_up():
+    updates = []
+
+    def update():
+        updates.append('update')
+        return len(updates) < 10
+
+    ticks = iter([0.0] + [n * 4 * FRAME_RATE / 1000 for n in range(1, 10)])
+    # Every read of the clock owes four frames, and the game ends partway through the third batch.
+    loop = FixedStepLoop(FRAME_RATE, sleep=lambda ms: None, clock=lambda: next(ticks))
+    loop.run(update)
+    assert len(updates) == 10
+    assert loop.frames == 10
+
+
+def test_game_played_to_a_win(mouse):
+    for rules in ((), EXTENDED_RULES):
+        graphics = BreakoutGraphics(seed=1, brick_rows=2, brick_cols=4, rules=rules)
+        autopilot = Autopilot(graphics.state)
+        loop = FixedStepLoop(FRAME_RATE, sleep=lambda ms: None, clock=Clock())
+        loop.run(lambda: play_frame(graphics, autopilot), graphics.draw_ball)
+        assert graphics.no_more_blocks()
+        assert graphics.renderer.get('message').text == 'YOU WIN. CONGRATULATIONS!'
+        assert not any(key[0] == 'ball' for key in graphics.renderer.shown if isinstance(key, tuple))
@@ -0,0 +1,85 @@
+import pytest
+import random
+from autopilot import Autopilot
+from breakout import play_frame
+from breakoutgraphics import BreakoutGraphics
+from breakoutrules import EXTENDED_RULES
+from breakoutstate import BreakoutState
+from inputlog import CONTINUOUS, KEYFRAMES_SUFFIX, HeadlessDriver, InputLog, Replayer, replay, seek
+from keyframeindex import KeyframeIndex
+from levelfile import Level
+
+LEVEL = """
+R R R R R R
+S S . . S S
+. B B B B .
+"""
+
+
+def test_level_game_replays_on_its_level(mouse, tmp_path):
+    level = Level.parse_text(LEVEL)
+    graphics = BreakoutGraphics(seed=3, level=level, rules=EXTENDED_RULES)
+    autopilot = Autopilot(graphics.state)
+    while play_frame(graphics, autopilot):
+        pass
+    path = str(tmp_path / 'session.breakout')
+    graphics.recorder.save(path, graphics.state)
+
+    log = InputLog.load(path)
+    assert log.level.masks == level.masks
+    assert log.level.hit_points == level.hit_points
+    state = replay(log)
+    assert (state.score, state.counter, state.lives) == (log.score, log.counter, log.lives_left)
+
+
+def test_recording_leaves_the_random_module_alone(mouse, tmp_path):
+    random.seed(5)
+    before = random.getstate()
+    graphics = BreakoutGraphics(seed=3, brick_rows=2, brick_cols=4, rules=EXTENDED_RULES)
+    autopilot = Autopilot(graphics.state)
+    while play_frame(graphics, autopilot):
+        random.random()   # Anything else using the random module while the game is played.
+    assert random.getstate() != before
+    path = str(tmp_path / 'session.breakout')
+    graphics.recorder.save(path, graphics.state)
+
+    random.seed(5)
+    log = InputLog.load(path)
+    state = replay(log)
+    assert (state.score, state.counter, state.lives) == (log.score, log.counter, log.lives_left)
+    assert random.getstate() == before
+
+
+def test_headless_driver_serves_again_until_the_lives_run_out():
+    state = BreakoutState(lives=2, rng=random.Random(1))
+    driver = HeadlessDriver(state, serve=True)
+    state.set_ball_velocity()
+    lives = []
+    while driver.check():
+        lives.append(state.lives)
+        driver.play_frame(0)   # The paddle stays in the corner, so every ball is missed.
+    assert lives[0] == 2 and lives[-1] == 1
+    assert state.lives == 0 and driver.over
+
+
+@pytest.mark.parametrize('continuous', [False, True])
+def test_seek_matches_a_full_replay(mouse, tmp_path, continuous):
+    graphics = BreakoutGraphics(seed=4, brick_rows=3, brick_cols=6, rules=EXTENDED_RULES, continuous=continuous)
+    graphics.recorder.keyframes.interval = 50
+    autopilot = Autopilot(graphics.state)
+    while play_frame(graphics, autopilot):
+        pass
+    path = str(tmp_path / 'session.breakout')
+    graphics.recorder.save(path, graphics.state)
+
+    log = InputLog.load(path)
+    assert bool(log.flags & CONTINUOUS) == continuous
+    keyframes = KeyframeIndex.load(path + KEYFRAMES_SUFFIX)
+    assert len(keyframes) > 2
+    full = Replayer(log)
+    for frame in [0, 1, 49, 50, 51, 120, log.frames // 2, log.frames - 1, log.frames]:
+        full.play(frame)
+        seeked = seek(log, keyframes, frame)
+        assert seeked.frame == full.frame == frame
+        assert seeked.state.snapshot() == full.state.snapshot()
+        assert seeked.state.random.getstate() == full.state.random.getstate()
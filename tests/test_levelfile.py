@@ -0,0 +1,31 @@
+from levelfile import CACHE_SUFFIX, Level, load_level
+
+
+def test_spaced_and_unspaced_rows_can_be_mixed():
+    level = Level.parse_text('R R R R\nS..S\nB B\n')
+    assert level.cols == 4
+    assert [[level.has_brick(r, c) for c in range(4)] for r in range(3)] == [
+        [True, True, True, True],
+        [True, False, False, True],
+        [True, True, False, False],
+    ]
+    # A row with bricks next to each other keeps its spaces as holes.
+    level = Level.parse_text('RR R\n')
+    assert [level.has_brick(0, c) for c in range(4)] == [True, True, False, True]
+
+
+def test_level_is_loaded_from_its_cache(tmp_path):
+    path = str(tmp_path / 'level.txt')
+    with open(path, 'w') as file:
+        file.write('X = PURPLE 25 3\nR X R\nS . S\n')
+    first = load_level(path)
+    assert (tmp_path / ('level.txt' + CACHE_SUFFIX)).exists()
+    cached = load_level(path)
+    for name in ('rows', 'cols', 'masks', 'palette', 'colors', 'points', 'hit_points'):
+        assert getattr(cached, name) == getattr(first, name)
+    assert cached.count() == 5
+
+    # A cache that doesn't match its level any more is compiled again.
+    with open(path, 'w') as file:
+        file.write('RRRR\n')
+    assert load_level(path).count() == 4
@@ -0,0 +1,51 @@
+import random
+from breakoutrules import EXTENDED_RULES
+from breakoutstate import BreakoutState, step
+
+
+def play(state, frames):
+    for frame in range(frames):
+        state.move_paddle(state.ball.x + 10)
+        step(state)
+
+
+def test_restore_puts_every_ball_back():
+    state = BreakoutState(brick_rows=6, brick_cols=8, rules=EXTENDED_RULES, rng=random.Random(6),
+                          ball_collisions=True)
+    state.set_ball_velocity()
+    for vx, vy in ((-3, -4), (2, -5), (4, -3)):
+        state.add_ball(vx, vy)
+    play(state, 20)
+    snapshot = state.snapshot()
+    generator = state.random.getstate()
+    numbers = [ball.number for ball in state.balls]
+    assert len(numbers) == 4
+
+    play(state, 300)
+    after = state.snapshot()
+    state.restore(snapshot)
+    state.random.setstate(generator)
+    assert state.snapshot() == snapshot
+    assert [ball.number for ball in state.balls] == numbers
+    play(state, 300)
+    assert state.snapshot() == after
+    # Balls added after a restore are numbered after the ones made before the snapshot.
+    assert state.add_ball(1, -5).number == snapshot['balls_made']
+
+
+def test_touching_balls_swap_their_velocities_along_the_line_between_them():
+    state = BreakoutState(ball_collisions=True)
+    a = state.ball
+    b = state.add_ball(0, 0)
+    a.x, a.y, a.vx, a.vy = 100, 200, 3, 1
+    b.x, b.y, b.vx, b.vy = 115, 200, -2, 1
+    state.collide_balls()
+    assert (a.vx, a.vy, b.vx, b.vy) == (-2, 1, 3, 1)
+
+    # Balls moving apart, or not touching, are left alone.
+    state.collide_balls()
+    assert (a.vx, b.vx) == (-2, 3)
+    b.x = 130
+    b.vx = -5
+    state.collide_balls()
+    assert (a.vx, b.vx) == (-2, -5)
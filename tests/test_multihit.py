@@ -0,0 +1,34 @@
+from breakoutstate import BreakoutState, step
+from levelfile import Level
+
+# One silver brick, which takes two hits to break, with room below it.
+LEVEL = """
+. . S . .
+. . . . .
+. . . . .
+. . . . .
+"""
+
+
+def test_one_approach_takes_one_hit():
+    state = BreakoutState(level=Level.parse_text(LEVEL))
+    brick = next(iter(state.bricks))
+    ball = state.ball
+    # Into the side of the brick, moving up slowly, so the ball is still inside it after it bounces.
+    ball.x = brick.x - ball.width - 1
+    ball.y = brick.y + brick.height / 2
+    ball.vx = 3
+    ball.vy = -1
+    for n in range(3 * state.brick_height):
+        step(state)
+    assert state.registry.damage[brick.row * state.brick_cols + brick.col] == 1
+    assert state.counter == 1
+    assert ball.y > brick.y + brick.height
+
+    # A new approach from below hits it again.
+    ball.x = brick.x + brick.width / 2
+    ball.vx = 0
+    ball.vy = -3
+    for n in range(3 * state.brick_height):
+        step(state)
+    assert state.counter == 0
@@ -0,0 +1,77 @@
+import random
+import numpy as np
+from batchbreakout import BatchBreakout
+from breakoutrules import EXTENDED_RULES
+from breakoutgraphics import BreakoutGraphics
+from paddlevelocity import PaddleVelocity, FRAME_NS, WINDOW_MS
+
+
+def test_swipe_from_rest_has_a_speed():
+    velocity = PaddleVelocity()
+    velocity.add(100, 0)
+    velocity.add(140, 60 * FRAME_NS)
+    assert velocity.speed(60 * FRAME_NS) == 40 * 1000 / WINDOW_MS
+
+
+def test_steady_motion():
+    velocity = PaddleVelocity()
+    for frame in range(30):
+        velocity.add(10 * frame, frame * FRAME_NS)
+    assert 1100 < velocity.speed(29 * FRAME_NS) < 1400
+
+
+def test_stopped_paddle_slows_down_to_zero():
+    velocity = PaddleVelocity()
+    velocity.add(0, 0)
+    velocity.add(50, FRAME_NS)
+    assert velocity.speed(FRAME_NS + WINDOW_MS * 1000000) == 0
+
+
+def test_mouse_swipe_bats_the_ball(mouse):
+    graphics = BreakoutGraphics(seed=1, rules=EXTENDED_RULES)
+    state = graphics.state
+    for frame in range(10):
+        mouse.move(60)
+        graphics.step()
+
+    # A quick swipe to the right, with the ball arriving just as it ends.
+    ball = state.ball
+    ball.x = 300 - state.ball_radius
+    ball.y = state.paddle.y - ball.height - 4 * 5 + 3
+    ball.vx = 0
+    ball.vy = 5
+    for x in (120, 180, 240, 300):
+        mouse.move(x)
+        graphics.step()
+    assert state.paddle_speed > state.batting_speed
+    assert ball.bounce_counter > 0
+    assert ball.vy == -5 * 1.25
+
+
+def test_moves_between_frames_are_merged(mouse):
+    graphics = BreakoutGraphics(seed=1)
+    for x in (100, 120, 140):
+        mouse.move(x, 300)
+    graphics.step()
+    mouse.move(160, 300)
+    graphics.step()
+    # The paddle only followed the last move of each frame.
+    assert graphics.merged_moves == 2
+    assert graphics.state.paddle.x == 160 - graphics.state.paddle_width / 2
+
+
+def test_batch_measures_the_same_speeds():
+    batch = BatchBreakout(3, extended=True, auto_serve=False)
+    velocities = [PaddleVelocity() for n in range(3)]
+    rng = random.Random(1)
+    for frame in range(40):
+        if frame == 25:
+            # A new game in the middle forgets its paddle's positions.
+            batch.reset_games(np.array([False, True, False]))
+            velocities[1] = PaddleVelocity()
+        xs = [rng.uniform(-50, batch.width + 50) for n in range(3)]
+        batch.move_paddles(xs)
+        for n, velocity in enumerate(velocities):
+            velocity.add(batch.paddle_x[n], batch.frames[n] * FRAME_NS)
+            assert batch.paddle_speed[n] == velocity.speed(batch.frames[n] * FRAME_NS)
+        batch.frames += 1
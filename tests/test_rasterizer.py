@@ -0,0 +1,29 @@
+import random
+import numpy as np
+from autopilot import Autopilot
+from breakoutstate import BreakoutState
+from inputlog import HeadlessDriver
+from rasterizer import Rasterizer
+
+
+def test_incremental_frames_match_fresh_renders():
+    state = BreakoutState(brick_rows=4, brick_cols=6, extended=True, rng=random.Random(7))
+    autopilot = Autopilot(state)
+    driver = HeadlessDriver(state)
+    rasterizer = Rasterizer(state)
+    state.set_ball_velocity()
+    state.add_ball(-3, -4)
+    frame = 0
+    before = None
+    while frame < 3000 and driver.check():
+        # Some stretches are missed on purpose, so lives are lost (and redrawn) too.
+        pointer_x = 0 if frame % 900 > 700 else autopilot.pointer_x()
+        driver.play_frame(pointer_x, True)
+        frame += 1
+        image = rasterizer.render()
+        # Checked every few frames, and on every frame a brick, the score or the lives changed.
+        if frame % 10 == 0 or (state.counter, state.score, state.lives) != before:
+            assert np.array_equal(image, Rasterizer(state).render()), frame
+        before = (state.counter, state.score, state.lives)
+    assert frame > 500
+    assert state.lives < 3 and state.score > 0
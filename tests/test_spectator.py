@@ -0,0 +1,31 @@
+import asyncio
+from breakoutrules import EXTENDED_RULES
+from breakoutstate import BreakoutState
+from spectator import SpectatorClient, SpectatorServer
+
+
+async def play_and_watch():
+    state = BreakoutState(brick_rows=2, brick_cols=4, rules=EXTENDED_RULES)
+    server = SpectatorServer(state)
+    client = SpectatorClient()
+    await client.connect(*await server.start('localhost', 0))
+    await asyncio.sleep(0.01)
+
+    # The game ends: the last frame is published right before the server closes.
+    state.paddle.x += 10
+    state.score += 1
+    state.lives = 0
+    server.publish()
+    await server.close()
+    try:
+        while True:
+            await client.receive()
+    except asyncio.IncompleteReadError:
+        pass
+    return client
+
+
+def test_spectators_see_the_last_frame():
+    client = asyncio.run(play_and_watch())
+    assert client.frame == 1
+    assert (client.score, client.lives) == (1, 0)